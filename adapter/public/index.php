@@ -75,6 +75,20 @@ function getAccountId($request)
     return $hdr ?: ($params['account'] ?? 'default');
 }
 
+function since($request)
+{
+    $since = $request->getQueryParams()['since'] ?? null;
+    return is_numeric($since) ? (int) $since : null;
+}
+
+function newerThan($items, $since)
+{
+    if ($since === null) {
+        return $items;
+    }
+    return array_values(array_filter($items, fn ($item) => (int) $item['id'] > $since));
+}
+
 function getUser($accountId)
 {
     if (!isset($_SESSION['accounts'][$accountId])) {
@@ -154,7 +168,7 @@ $app->get('/events', function ($request, $response) {
             'time' => ($node->getElementsByTagName('time')->item(0)->getAttribute('datetime') ?? null)
         ];
     }
-    $response->getBody()->write(json_encode($data));
+    $response->getBody()->write(json_encode(newerThan($data, since($request))));
     return $response->withHeader('Content-Type', 'application/json');
 });
 
@@ -210,18 +224,12 @@ $app->get('/events/{id}/attendees', function ($request, $response, $args) {
     return $response->withHeader('Content-Type', 'application/json');
 });
 
-$app->get('/users/{id}/writings', function ($request, $response, $args) {
-    $acct = getAccountId($request);
-    $user = getUser($acct);
-    if (!$user) {
-        $response->getBody()->write(json_encode(['error' => 'not authenticated']));
-        return $response->withStatus(401)->withHeader('Content-Type', 'application/json');
-    }
-    log_json('info', 'writings', ['id' => $args['id']]);
+function fetchWritings($user, $id)
+{
+    log_json('info', 'writings', ['id' => $id]);
     metric_inc('fetlife_requests_total');
-    $writings = $user->getWritingsOf($args['id']);
     $data = [];
-    foreach ($writings as $w) {
+    foreach ($user->getWritingsOf($id) as $w) {
         $data[] = [
             'id' => $w->id,
             'title' => $w->title,
@@ -229,18 +237,11 @@ $app->get('/users/{id}/writings', function ($request, $response, $args) {
             'published' => $w->dt_published,
         ];
     }
-    $response->getBody()->write(json_encode($data));
-    return $response->withHeader('Content-Type', 'application/json');
-});
+    return $data;
+}
 
-$app->get('/groups/{id}/posts', function ($request, $response, $args) {
-    $acct = getAccountId($request);
-    $user = getUser($acct);
-    if (!$user) {
-        $response->getBody()->write(json_encode(['error' => 'not authenticated']));
-        return $response->withStatus(401)->withHeader('Content-Type', 'application/json');
-    }
-    $id = $args['id'];
+function fetchGroupPosts($user, $id)
+{
     log_json('info', 'group_posts', ['id' => $id]);
     metric_inc('fetlife_requests_total');
     $res = $user->connection->doHttpGet("/groups/$id/group_posts");
@@ -259,7 +260,69 @@ $app->get('/groups/{id}/posts', function ($request, $response, $args) {
             'published' => $timeEl ? $timeEl->getAttribute('datetime') : null,
         ];
     }
-    $response->getBody()->write(json_encode($posts));
+    return $posts;
+}
+
+$app->get('/users/{id}/writings', function ($request, $response, $args) {
+    $acct = getAccountId($request);
+    $user = getUser($acct);
+    if (!$user) {
+        $response->getBody()->write(json_encode(['error' => 'not authenticated']));
+        return $response->withStatus(401)->withHeader('Content-Type', 'application/json');
+    }
+    $response->getBody()->write(json_encode(newerThan(fetchWritings($user, $args['id']), since($request))));
+    return $response->withHeader('Content-Type', 'application/json');
+});
+
+$app->get('/groups/{id}/posts', function ($request, $response, $args) {
+    $acct = getAccountId($request);
+    $user = getUser($acct);
+    if (!$user) {
+        $response->getBody()->write(json_encode(['error' => 'not authenticated']));
+        return $response->withStatus(401)->withHeader('Content-Type', 'application/json');
+    }
+    $response->getBody()->write(json_encode(newerThan(fetchGroupPosts($user, $args['id']), since($request))));
+    return $response->withHeader('Content-Type', 'application/json');
+});
+
+$app->post('/batch/{type}', function ($request, $response, $args) {
+    $fetchers = ['writings' => 'fetchWritings', 'group_posts' => 'fetchGroupPosts'];
+    $fetch = $fetchers[$args['type']] ?? null;
+    if (!$fetch) {
+        $response->getBody()->write(json_encode(['error' => 'unknown feed type']));
+        return $response->withStatus(404)->withHeader('Content-Type', 'application/json');
+    }
+    $acct = getAccountId($request);
+    $user = getUser($acct);
+    if (!$user) {
+        $response->getBody()->write(json_encode(['error' => 'not authenticated']));
+        return $response->withStatus(401)->withHeader('Content-Type', 'application/json');
+    }
+    $body = json_decode((string) $request->getBody(), true);
+    $ids = is_array($body['ids'] ?? null) ? $body['ids'] : [];
+    $since = is_array($body['since'] ?? null) ? $body['since'] : [];
+    if (!$ids || count($ids) > 50) {
+        $response->getBody()->write(json_encode(['error' => 'expected 1 to 50 ids']));
+        return $response->withStatus(400)->withHeader('Content-Type', 'application/json');
+    }
+    $results = [];
+    $errors = [];
+    foreach ($ids as $id) {
+        try {
+            $mark = $since[(string) $id] ?? null;
+            $results[(string) $id] = newerThan(
+                $fetch($user, $id),
+                is_numeric($mark) ? (int) $mark : null
+            );
+        } catch (Throwable $e) {
+            log_json('error', 'batch_target_failed', ['type' => $args['type'], 'id' => $id]);
+            $errors[(string) $id] = ['status' => 502, 'error' => $e->getMessage()];
+        }
+    }
+    $response->getBody()->write(json_encode([
+        'results' => (object) $results,
+        'errors' => (object) $errors,
+    ]));
     return $response->withHeader('Content-Type', 'application/json');
 });
 
@@ -291,7 +354,7 @@ $app->get('/messages', function ($request, $response) {
             'sent' => $timeEl ? $timeEl->getAttribute('datetime') : null,
         ];
     }
-    $response->getBody()->write(json_encode($messages));
+    $response->getBody()->write(json_encode(newerThan($messages, since($request))));
     return $response->withHeader('Content-Type', 'application/json');
 });
 
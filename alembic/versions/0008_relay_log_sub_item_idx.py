@@ -0,0 +1,20 @@
+"""Add composite relay_log index for batch dedupe"""
+
+from alembic import op
+
+revision = "0008_relay_log_sub_item_idx"
+down_revision = "0007_add_welcome_configs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_relay_log_subscription_item",
+        "relay_log",
+        ["subscription_id", "item_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_relay_log_subscription_item", table_name="relay_log")
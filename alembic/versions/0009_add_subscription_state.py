@@ -0,0 +1,32 @@
+"""Add subscription_state table for persisted backoff"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_add_subscription_state"
+down_revision = "0008_relay_log_sub_item_idx"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "subscription_state",
+        sa.Column(
+            "subscription_id",
+            sa.Integer,
+            sa.ForeignKey("subscriptions.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("failures", sa.Integer, server_default="0", nullable=False),
+        sa.Column("backoff", sa.Integer, nullable=True),
+        sa.Column("paused_until", sa.DateTime, nullable=True),
+        sa.Column("notified", sa.Boolean, server_default=sa.text("0"), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime, server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("subscription_state")
@@ -0,0 +1,19 @@
+"""Add adaptive poll interval to subscription_state"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_sub_state_interval"
+down_revision = "0009_add_subscription_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("subscription_state") as batch_op:
+        batch_op.add_column(sa.Column("interval", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("subscription_state") as batch_op:
+        batch_op.drop_column("interval")
@@ -0,0 +1,39 @@
+"""Add digest schedule to subscriptions and the digest item buffer"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_add_digests"
+down_revision = "0010_sub_state_interval"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("subscriptions") as batch_op:
+        batch_op.add_column(sa.Column("digest", sa.String(), nullable=True))
+    op.create_table(
+        "digest_items",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "subscription_id",
+            sa.Integer(),
+            sa.ForeignKey("subscriptions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("item_id", sa.String(), nullable=False),
+        sa.Column("payload_json", sa.JSON(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_digest_items_subscription_id", "digest_items", ["subscription_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_digest_items_subscription_id", table_name="digest_items")
+    op.drop_table("digest_items")
+    with op.batch_alter_table("subscriptions") as batch_op:
+        batch_op.drop_column("digest")
@@ -0,0 +1,19 @@
+"""Add high-watermark item ID to cursors"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012_cursor_high_watermark"
+down_revision = "0011_add_digests"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("cursors") as batch_op:
+        batch_op.add_column(sa.Column("high_watermark", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("cursors") as batch_op:
+        batch_op.drop_column("high_watermark")
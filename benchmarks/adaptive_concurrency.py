@@ -0,0 +1,80 @@
+"""Compare fixed and AIMD concurrency against a simulated upstream.
+
+Run with ``python benchmarks/adaptive_concurrency.py [seconds]``. The fake
+upstream serves up to ``CAPACITY`` requests at base latency; beyond that
+latency grows with the queue, and above twice the capacity it answers 503.
+Workers issue requests back to back through each limiter. Prints
+throughput, 503 rate and the final limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.concurrency import AIMDLimiter  # noqa: E402
+
+CAPACITY = 12
+BASE_LATENCY = 0.02
+WORKERS = 64
+
+
+class Upstream:
+    def __init__(self) -> None:
+        self.inflight = 0
+
+    async def call(self) -> bool:
+        self.inflight += 1
+        try:
+            if self.inflight > 2 * CAPACITY:
+                await asyncio.sleep(BASE_LATENCY / 4)
+                return False
+            load = max(1.0, self.inflight / CAPACITY)
+            await asyncio.sleep(BASE_LATENCY * load)
+            return True
+        finally:
+            self.inflight -= 1
+
+
+async def _run(limiter: AIMDLimiter, adaptive: bool, seconds: float):
+    upstream = Upstream()
+    ok = failed = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        nonlocal ok, failed
+        while time.perf_counter() < deadline:
+            async with limiter:
+                start = time.perf_counter()
+                if await upstream.call():
+                    ok += 1
+                    if adaptive:
+                        limiter.on_success(time.perf_counter() - start)
+                else:
+                    failed += 1
+                    if adaptive:
+                        limiter.on_overload()
+
+    await asyncio.gather(*(worker() for _ in range(WORKERS)))
+    return ok / seconds, failed / max(ok + failed, 1), limiter.limit
+
+
+def main(seconds: float = 5.0) -> None:
+    for name, limiter, adaptive in (
+        ("fixed 4", AIMDLimiter(initial=4), False),
+        ("fixed 48", AIMDLimiter(initial=48, max_limit=48), False),
+        ("aimd", AIMDLimiter(initial=4, max_limit=64), True),
+    ):
+        rate, errors, limit = asyncio.run(_run(limiter, adaptive, seconds))
+        print(
+            f"{name:9s} {rate:8.1f} ok/s  {errors * 100:5.1f}% 503"
+            f"  final limit {limit:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
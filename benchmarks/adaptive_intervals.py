@@ -0,0 +1,70 @@
+"""Compare adapter requests of fixed and adaptive poll intervals.
+
+Run with ``python benchmarks/adaptive_intervals.py [feeds]``. Simulates a day
+of polling for a mix of feeds: most are dormant profiles with an item every
+few days, some post a few times a day and a few are busy inboxes. Prints the
+number of adapter requests and the mean delay between an item appearing and
+being polled, for all feeds and for the busy ones.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.feeds import IntervalController  # noqa: E402
+
+DAY = 86400
+# (share of feeds, mean seconds between items)
+MIX = ((0.8, 3 * DAY), (0.15, DAY / 4), (0.05, 30.0))
+
+
+def _arrivals(rng: random.Random, gap: float) -> list[float]:
+    times, t = [], rng.expovariate(1 / gap)
+    while t < DAY:
+        times.append(t)
+        t += rng.expovariate(1 / gap)
+    return times
+
+
+def _simulate(arrivals: list[float], controller: IntervalController | None):
+    interval, rate = 60, None
+    clock, polls, delay, pending = 0.0, 0, 0.0, 0
+    while clock < DAY:
+        clock += interval
+        polls += 1
+        new = 0
+        while pending < len(arrivals) and arrivals[pending] <= clock:
+            delay += clock - arrivals[pending]
+            pending += 1
+            new += 1
+        if controller is not None:
+            interval, rate = controller.update(interval, rate, new)
+    return polls, delay, pending
+
+
+def main(feeds: int = 1000) -> None:
+    rng = random.Random(1)
+    feed_gaps = [gap for share, gap in MIX for _ in range(round(feeds * share))]
+    streams = [(gap, _arrivals(rng, gap)) for gap in feed_gaps]
+    for name, controller in (("fixed", None), ("adaptive", IntervalController())):
+        totals = {"all": [0, 0.0, 0], "busy": [0, 0.0, 0]}
+        for gap, arrivals in streams:
+            polls, delay, items = _simulate(arrivals, controller)
+            for group in ("all", "busy") if gap == MIX[-1][1] else ("all",):
+                totals[group][0] += polls
+                totals[group][1] += delay
+                totals[group][2] += items
+        print(name)
+        for group, (polls, delay, items) in totals.items():
+            print(
+                f"  {group:4s} requests/day {polls:8d}"
+                f"  mean item delay {delay / max(items, 1):7.1f} s"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
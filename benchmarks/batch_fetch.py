@@ -0,0 +1,70 @@
+"""Count adapter requests of single-target and batched feed fetches.
+
+Run with ``python benchmarks/batch_fetch.py [targets]``. Starts the mock
+adapter from ``tests/integration`` on a free port, polls the group posts of
+every target once per mode and prints the HTTP requests the adapter served
+and the wall time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests" / "integration"))
+
+import mock_adapter  # noqa: E402
+from bot import adapter_client  # noqa: E402
+from bot.feeds import FeedBatcher  # noqa: E402
+
+
+async def _single(base_url: str, targets: list[str]) -> None:
+    await asyncio.gather(
+        *(adapter_client.fetch_group_posts(base_url, t) for t in targets)
+    )
+
+
+async def _batched(base_url: str, targets: list[str]) -> None:
+    async def fetch_batch(sub_type, ids, account_id, since):
+        return await adapter_client.fetch_batch(
+            base_url, sub_type, ids, account_id, since=since
+        )
+
+    batcher = FeedBatcher(fetch_batch, window=0.05)
+    await asyncio.gather(*(batcher.fetch("group_posts", t) for t in targets))
+
+
+def main(targets: int = 500) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mock_adapter.Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    ids = [str(i) for i in range(targets)]
+    try:
+        for name, run in (("single", _single), ("batched", _batched)):
+            mock_adapter.REQUESTS["count"] = 0
+
+            async def once() -> float:
+                start = time.perf_counter()
+                try:
+                    await run(base_url, ids)
+                finally:
+                    await adapter_client.close_session()
+                return time.perf_counter() - start
+
+            elapsed = asyncio.run(once())
+            print(
+                f"{name:8s} {mock_adapter.REQUESTS['count']:5d} requests"
+                f"  {elapsed * 1000:8.1f} ms for {targets} targets"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,75 @@
+"""Measure bytes and client CPU saved by conditional GETs against the mock adapter.
+
+Run with ``python benchmarks/conditional_get.py [polls] [items]``. The mock
+adapter from ``tests/integration`` is started in-process on a free port and
+serves an inbox of ``items`` messages; the same feed is then polled
+``polls`` times with and without ``If-None-Match`` validators.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bot import adapter_client  # noqa: E402
+
+spec = importlib.util.spec_from_file_location(
+    "mock_adapter", ROOT / "tests" / "integration" / "mock_adapter.py"
+)
+assert spec and spec.loader
+mock_adapter = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mock_adapter)
+
+
+class CountingHandler(mock_adapter.Handler):
+    body_bytes = 0
+
+    def send_header(self, keyword: str, value: str) -> None:
+        if keyword == "Content-Length":
+            CountingHandler.body_bytes += int(value)
+        super().send_header(keyword, value)
+
+
+async def poll(base_url: str, polls: int, conditional: bool) -> float:
+    start = time.process_time()
+    for _ in range(polls):
+        if not conditional:
+            adapter_client._validators.clear()
+        await adapter_client.fetch_messages(base_url, account_id=1)
+    elapsed = time.process_time() - start
+    await adapter_client.close_session()
+    return elapsed
+
+
+def main(polls: int = 200, items: int = 500) -> None:
+    mock_adapter.MESSAGES[:] = [
+        {"id": i, "sender": "alice", "text": "hello " * 20, "sent": "2025-08-12"}
+        for i in range(items)
+    ]
+    server = HTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        for conditional in (False, True):
+            CountingHandler.body_bytes = 0
+            cpu = asyncio.run(poll(base_url, polls, conditional))
+            label = "conditional" if conditional else "full"
+            print(
+                f"{label:12s} polls={polls} client_cpu={cpu * 1e3:8.1f} ms "
+                f"body_bytes={CountingHandler.body_bytes}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,83 @@
+"""Measure event-loop lag while storage queries run on sync and async sessions.
+
+Run with ``python benchmarks/event_loop_lag.py [queries]``. A ticker sleeps
+in 10 ms steps while ``queries`` slow SQLite queries run concurrently, first
+on a sync ``Session`` and then on an ``AsyncSession`` through
+``storage.run``. Prints the worst and mean lag seen by the ticker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot import storage  # noqa: E402
+
+TICK = 0.01
+# A recursive CTE keeps SQLite busy for a while without needing any data.
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 300000)"
+    " SELECT count(*) FROM c"
+)
+
+
+def _slow(db) -> int:
+    return int(db.execute(SLOW_QUERY).scalar())
+
+
+async def _measure(db: storage.Database, queries: int) -> list[float]:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    async def worker() -> None:
+        async with storage.session_scope(db) as session:
+            await storage.run(session, _slow)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK)
+    await asyncio.gather(*(worker() for _ in range(queries)))
+    done.set()
+    await tick
+    return lags
+
+
+def _report(name: str, lags: list[float]) -> None:
+    print(
+        f"{name:6s} max lag {max(lags) * 1e3:8.2f} ms"
+        f"  mean lag {statistics.mean(lags) * 1e3:8.2f} ms"
+    )
+
+
+def main(queries: int = 8) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        sync_db = storage.init_db(url)
+        _report("sync", asyncio.run(_measure(sync_db, queries)))
+
+        async def run_async() -> list[float]:
+            sessions = storage.init_async_db(url)
+            try:
+                return await _measure(sessions, queries)
+            finally:
+                await sessions.kw["bind"].dispose()
+
+        _report("async", asyncio.run(run_async()))
+        sync_db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,79 @@
+"""Measure items per second through the subscription filter stage.
+
+Run with ``python benchmarks/filter_matching.py [items] [keywords]``. Builds
+``items`` synthetic events and a filter of ``keywords`` keywords, alone and
+with city and min_attendees, then times the previous per-call haystack
+matcher against the compiled matcher ``relay_new_items`` applies.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from bot.filters import matcher_for  # noqa: E402
+
+WORDS = "rope munch social workshop consent shibari play party meetup class".split()
+
+
+def haystack_matches(item: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """The matcher before compilation: rebuilds the haystack on every call."""
+    keywords = filters.get("keywords", [])
+    if keywords:
+        haystack = " ".join(str(v) for v in item.values()).lower()
+        if not any(k.lower() in haystack for k in keywords):
+            return False
+    city = filters.get("city")
+    if city and item.get("city", "").lower() != str(city).lower():
+        return False
+    min_attendees = filters.get("min_attendees")
+    if isinstance(min_attendees, int) and int(item.get("attendees", 0)) < min_attendees:
+        return False
+    return True
+
+
+def make_items(count: int) -> list[Dict[str, Any]]:
+    rng = random.Random(0)
+    return [
+        {
+            "id": str(i),
+            "title": " ".join(rng.choices(WORDS, k=4)).title(),
+            "description": " ".join(rng.choices(WORDS, k=40)),
+            "link": f"https://fetlife.com/events/{i}",
+            "city": rng.choice(["Berlin", "NYC", "London"]),
+            "attendees": rng.randint(0, 50),
+        }
+        for i in range(count)
+    ]
+
+
+def rate(name: str, match: Callable[[Dict[str, Any]], bool], items: list) -> None:
+    start = time.perf_counter()
+    kept = sum(1 for item in items if match(item))
+    elapsed = time.perf_counter() - start
+    print(f"{name:9s} kept={kept} items/s={len(items) / elapsed:12,.0f}")
+
+
+def main(count: int = 100_000, keywords: int = 20) -> None:
+    items = make_items(count)
+    # Mostly misses, so each item is searched in full.
+    words = [f"kw{i}" for i in range(keywords - 1)] + ["shibari workshop"]
+    for label, filters in (
+        ("keywords", {"keywords": words}),
+        ("all", {"keywords": words, "city": "berlin", "min_attendees": 10}),
+    ):
+        matcher = matcher_for(filters)
+        assert matcher is not None
+        print(f"filters={label}")
+        rate("haystack", lambda item: haystack_matches(item, filters), items)
+        rate("compiled", matcher, items)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
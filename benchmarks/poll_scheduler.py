@@ -0,0 +1,53 @@
+"""Compare rescheduling cost of APScheduler and ``PollScheduler``.
+
+Run with ``python benchmarks/poll_scheduler.py [subscriptions]``. Schedules
+one job per subscription, then reschedules every job once the way
+``poll_adapter`` does at the end of a cycle, including the queue depth read.
+Prints the mean cost per reschedule.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore[import-untyped]
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot.poll_scheduler import PollScheduler  # noqa: E402
+
+
+async def _job() -> None:
+    pass
+
+
+def _reschedule(sched, n: int, depth) -> float:
+    run_date = datetime.utcnow() + timedelta(hours=1)
+    for i in range(n):
+        sched.add_job(_job, args=[], id=str(i), run_date=run_date)
+    start = time.perf_counter()
+    for i in range(n):
+        sched.add_job(
+            _job, args=[], id=str(i), replace_existing=True, run_date=run_date
+        )
+        depth(sched)
+    return (time.perf_counter() - start) / n
+
+
+async def _main(n: int) -> None:
+    aps = AsyncIOScheduler()
+    aps.start(paused=True)
+    aps_time = _reschedule(aps, n, lambda s: len(s.get_jobs()))
+    aps.shutdown(wait=False)
+    heap_time = _reschedule(PollScheduler(), n, lambda s: s.depth)
+    print(f"subscriptions={n}")
+    print(f"APScheduler:   {aps_time * 1e6:10.1f} us per reschedule")
+    print(f"PollScheduler: {heap_time * 1e6:10.1f} us per reschedule")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
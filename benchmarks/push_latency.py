@@ -0,0 +1,117 @@
+"""Measure item creation to Discord send latency with polling and with push.
+
+Run with ``python benchmarks/push_latency.py [items] [interval]``. Starts the
+mock adapter from ``tests/integration`` on a free port and publishes
+``items`` inbox messages at random times. In poll mode the bot only finds
+them by polling every ``interval`` seconds; in push mode the mock adapter
+also posts each one to the bot's ``/ingest`` route, and polls only
+reconcile. Prints the latency from publishing an item to its send.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests" / "integration"))
+
+import mock_adapter  # noqa: E402
+from bot import adapter_client, feeds, main, storage  # noqa: E402
+from bot.circuit_breaker import CircuitBreakerRegistry  # noqa: E402
+from bot.poll_scheduler import PollScheduler  # noqa: E402
+
+TOKEN = "bench-token"
+
+
+class Channel:
+    """Record when each relayed message is sent."""
+
+    def __init__(self) -> None:
+        self.sent: dict[str, float] = {}
+
+    async def send(self, embed: Any = None, embeds: Any = None) -> None:
+        now = time.perf_counter()
+        for e in embeds or [embed]:
+            self.sent[e.description] = now
+
+
+async def run(base_url: str, push: bool, items: int, interval: int) -> list[float]:
+    mock_adapter.MESSAGES[:] = []
+    main.ADAPTER_BASE_URL = base_url
+    main.interval_controller = feeds.IntervalController(interval, interval)
+    main.push_tracker = feeds.PushTracker(reconcile_interval=3600)
+    main.feed_coalescer.clear()
+    main.bot.poller = PollScheduler()
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "messages", "inbox")
+    channel = Channel()
+    main.bot.get_channel = lambda _id: channel  # type: ignore[method-assign]
+
+    runner = None
+    mock_adapter.PUSH["url"] = None
+    if push:
+        main.INGEST_TOKEN = TOKEN
+        runner = web.AppRunner(
+            main.create_management_app(db, CircuitBreakerRegistry(3, 300))
+        )
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        mock_adapter.PUSH.update(url=f"http://127.0.0.1:{port}/ingest", token=TOKEN)
+
+    main.bot.poller.add_job(
+        main.poll_adapter, args=[db, sub_id, {"interval": interval}]
+    )
+    main.bot.poller.start()
+    created: dict[str, float] = {}
+    try:
+        for i in range(1, items + 1):
+            await asyncio.sleep(random.uniform(0, interval))
+            item = {"id": i, "sender": "alice", "text": str(i), "sent": "now"}
+            created[str(i)] = time.perf_counter()
+            await asyncio.to_thread(mock_adapter.publish, "messages", item)
+        deadline = time.perf_counter() + 2 * interval + 5
+        while len(channel.sent) < items and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+    finally:
+        main.bot.poller.shutdown()
+        if runner is not None:
+            await runner.cleanup()
+        await adapter_client.close_session()
+    return [channel.sent[i] - created[i] for i in created if i in channel.sent]
+
+
+def report(items: int = 20, interval: int = 5) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mock_adapter.Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        for mode, push in (("poll", False), ("push", True)):
+            latencies = asyncio.run(run(base_url, push, items, interval))
+            if not latencies:
+                print(f"{mode:5s} no items delivered")
+                continue
+            print(
+                f"{mode:5s} delivered={len(latencies)}/{items}"
+                f" mean={statistics.mean(latencies) * 1e3:8.1f} ms"
+                f" p50={statistics.median(latencies) * 1e3:8.1f} ms"
+                f" max={max(latencies) * 1e3:8.1f} ms"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    report(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,56 @@
+"""Compare per-item ``has_relayed`` lookups with batched ``filter_unrelayed``.
+
+Run with ``python benchmarks/relay_dedupe.py [items]``. Prints the number of
+``relay_log`` round trips and wall time per poll cycle for both paths.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot import storage  # noqa: E402
+
+
+def main(n: int = 200) -> None:
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "attendees", "event:1")
+    ids = [str(i) for i in range(n)]
+    for item_id in ids[: n // 2]:
+        storage.record_relay(db, sub_id, item_id)
+
+    queries = 0
+
+    def count(*_args: object) -> None:
+        nonlocal queries
+        queries += 1
+
+    event.listen(db.get_bind(), "before_cursor_execute", count)
+
+    start = time.perf_counter()
+    per_item = [i for i in ids if not storage.has_relayed(db, sub_id, i)]
+    per_item_time = time.perf_counter() - start
+    per_item_queries, queries = queries, 0
+
+    start = time.perf_counter()
+    batched = storage.filter_unrelayed(db, sub_id, ids)
+    batched_time = time.perf_counter() - start
+    batched_queries = queries
+
+    assert per_item == batched
+    print(f"items={n} unseen={len(batched)}")
+    print(
+        f"has_relayed:      {per_item_queries:5d} queries {per_item_time * 1e3:8.2f} ms"
+    )
+    print(
+        f"filter_unrelayed: {batched_queries:5d} queries {batched_time * 1e3:8.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,56 @@
+"""Compare whole-list ``jsonschema.validate`` with cached per-item validators.
+
+Run with ``python benchmarks/schema_validation.py [items]``. Prints wall time
+per response for the old path, which builds an array schema and checks it on
+every call, and for ``adapter_client._validate_list``.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+from jsonschema import validate
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot import adapter_client  # noqa: E402
+
+ROUNDS = 20
+
+
+def _old(data: list[dict], schema_name: str) -> list[dict]:
+    schema = adapter_client._load_schema(schema_name)
+    array_schema = (
+        schema if schema.get("type") == "array" else {"type": "array", "items": schema}
+    )
+    validate(data, array_schema)
+    return data
+
+
+def main(n: int = 500) -> None:
+    data = [
+        {"id": i, "title": f"Event {i}", "time": "2024-01-01", "link": f"l{i}"}
+        for i in range(n)
+    ]
+    adapter_client._validate_list(data, "event.json", "link")
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        _old(data, "event.json")
+    old_time = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        new = adapter_client._validate_list(data, "event.json", "link")
+    new_time = (time.perf_counter() - start) / ROUNDS
+
+    assert new == data
+    print(f"items={n}")
+    print(f"jsonschema.validate: {old_time * 1e3:8.2f} ms")
+    print(f"_validate_list:      {new_time * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,76 @@
+"""Soak test a shared ``Session`` against per-task sessions.
+
+Run with ``python benchmarks/session_soak.py [interactions]``. Each simulated
+interaction runs in its own task, as discord.py and aiohttp do. It reads and
+updates the settings of one of 500 channels and keeps the loaded channel alive
+for a while, the way a command holds on to it across awaits. Prints traced
+memory and the size of the identity maps at regular checkpoints.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bot import models, storage  # noqa: E402
+
+CHANNELS = 500
+CHECKPOINTS = 5
+# Interactions in flight at once; each holds a pooled connection until it ends.
+CONCURRENCY = 10
+
+
+async def _interaction(db, channel_id: int, held: list) -> None:
+    storage.get_channel_settings(db, channel_id)
+    held.append(db.get(models.Channel, channel_id))
+    await asyncio.sleep(0)
+    storage.set_channel_settings(db, channel_id, autodelete=channel_id)
+
+
+async def _soak(db, interactions: int) -> None:
+    held: list = []
+    step = interactions // CHECKPOINTS
+    for start in range(0, interactions, step):
+        for wave in range(start, start + step, CONCURRENCY):
+            await asyncio.gather(
+                *(
+                    asyncio.create_task(_interaction(db, i % CHANNELS, held))
+                    for i in range(wave, wave + CONCURRENCY)
+                )
+            )
+        # Keep only the most recent interactions' objects alive.
+        del held[:-CHANNELS]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        if isinstance(db, storage.TaskScopedSession):
+            mapped = sum(len(s.identity_map) for s in db._sessions.values())
+        else:
+            mapped = len(db.identity_map)
+        print(
+            f"  {start + step:7d} interactions  {current / 1024:9.1f} KiB"
+            f"  identity map {mapped:6d}"
+        )
+
+
+def main(interactions: int = 20000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/soak.db"
+        for name, db in (
+            ("shared", storage.init_db(url)),
+            ("scoped", storage.init_scoped_db(url)),
+        ):
+            print(name)
+            tracemalloc.start()
+            asyncio.run(_soak(db, interactions))
+            tracemalloc.stop()
+            db.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,90 @@
+"""Compare peak memory of full and streamed decoding of a large adapter response.
+
+Run with ``python benchmarks/stream_decode.py [items]``. Starts the mock
+adapter from ``tests/integration`` in a child process serving an inbox of
+``items`` messages, then reads it once with ``fetch_messages`` and once with
+``stream_feed`` in chunks of 200 items, printing the peak Python heap
+allocated by each and the wall time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tests" / "integration"))
+
+import mock_adapter  # noqa: E402
+from bot import adapter_client  # noqa: E402
+
+CHUNK = 200
+
+
+async def full(base_url: str) -> int:
+    items = await adapter_client.fetch_messages(base_url)
+    return len(items)
+
+
+async def streamed(base_url: str) -> int:
+    count = 0
+    chunk: list[dict[str, Any]] = []
+    async for item in adapter_client.stream_feed(base_url, "messages", ""):
+        chunk.append(item)
+        if len(chunk) >= CHUNK:
+            count += len(chunk)
+            chunk = []
+    return count + len(chunk)
+
+
+def measure(read: Callable[[str], Awaitable[int]], base_url: str) -> None:
+    async def once() -> int:
+        try:
+            return await read(base_url)
+        finally:
+            await adapter_client.close_session()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = asyncio.run(once())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{read.__name__:8s} items={count} peak={peak / 2**20:8.2f} MiB"
+        f" time={elapsed * 1e3:8.1f} ms"
+    )
+
+
+def serve(items: int, ports: Any) -> None:
+    # Out of process, so the server's copy of the body is not measured.
+    mock_adapter.MESSAGES[:] = [
+        {"id": i, "sender": "alice", "text": "hello " * 20, "sent": "2025-08-12"}
+        for i in range(items)
+    ]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mock_adapter.Handler)
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+def main(items: int = 50_000) -> None:
+    ports: Any = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(items, ports), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{ports.get()}"
+    try:
+        for read in (full, streamed):
+            measure(read, base_url)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
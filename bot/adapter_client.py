@@ -1,14 +1,32 @@
 from __future__ import annotations
 
-from typing import Any
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    cast,
+)
+import asyncio
+import codecs
 import json
 import logging
 import os
+import time
 from functools import lru_cache
 from pathlib import Path
 
-from aiohttp import ClientSession, ClientTimeout
-from jsonschema import ValidationError, validate
+from aiohttp import ClientResponseError, ClientSession, ClientTimeout
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+from prometheus_client import Counter
 
 from .utils import get_correlation_id
 
@@ -20,6 +38,188 @@ SCHEMAS = Path(__file__).resolve().parents[1] / "schemas"
 DEFAULT_TIMEOUT = ClientTimeout(total=30)
 _session: ClientSession | None = None
 
+cache_hits = Counter("adapter_cache_hits_total", "Adapter responses served from cache")
+cache_misses = Counter(
+    "adapter_cache_misses_total", "Adapter requests not served from cache"
+)
+cache_evictions = Counter(
+    "adapter_cache_evictions_total", "Adapter cache entries evicted by LRU limits"
+)
+not_modified = Counter(
+    "adapter_not_modified_total", "Adapter responses answered 304 Not Modified"
+)
+batch_requests_saved = Counter(
+    "adapter_batch_requests_saved_total",
+    "Adapter requests saved by fetching several targets in one batch request",
+)
+
+
+@dataclass
+class RequestOutcome:
+    """How the adapter calls made under :func:`track_request` were answered.
+
+    ``reused`` is set when a response came from the cache, a shared in-flight
+    request or a ``304 Not Modified``, so its latency is not the adapter's.
+    """
+
+    reused: bool = False
+
+
+_outcome: ContextVar[RequestOutcome | None] = ContextVar(
+    "adapter_request_outcome", default=None
+)
+
+
+@contextmanager
+def track_request() -> Iterator[RequestOutcome]:
+    """Collect the :class:`RequestOutcome` of the adapter calls in the block."""
+    outcome = RequestOutcome()
+    token = _outcome.set(outcome)
+    try:
+        yield outcome
+    finally:
+        _outcome.reset(token)
+
+
+def _mark_reused() -> None:
+    outcome = _outcome.get()
+    if outcome is not None:
+        outcome.reused = True
+
+
+class ResponseCache:
+    """In-process LRU cache of adapter GET responses with per-endpoint TTLs.
+
+    Entries are keyed by URL, query params and ``X-Account-ID``. Endpoints
+    without a TTL are never stored, but concurrent identical requests still
+    share one in-flight call.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float],
+        max_entries: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task[Any]] = {}
+
+    async def get_or_fetch(
+        self,
+        endpoint: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[tuple[Any, int]]],
+    ) -> Any:
+        cached = self.lookup(key)
+        if cached is not None:
+            _mark_reused()
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            cache_hits.inc()
+            _mark_reused()
+            return await asyncio.shield(pending)
+        cache_misses.inc()
+        # The fetch runs in its own task: cancelling the caller that started
+        # it must not fail the others waiting for the same key.
+        task = asyncio.get_running_loop().create_task(self._fetch(endpoint, key, fetch))
+        task.add_done_callback(_retrieve_exception)
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        endpoint: str,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[tuple[Any, int]]],
+    ) -> Any:
+        try:
+            value, size = await fetch()
+        finally:
+            del self._inflight[key]
+        self.put(endpoint, key, value, size)
+        return value
+
+    def lookup(self, key: Hashable) -> Any | None:
+        """Return the fresh cached value for *key*, or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        cache_hits.inc()
+        return value
+
+    def put(self, endpoint: str, key: Hashable, value: Any, size: int = 0) -> None:
+        """Store *value* if *endpoint* has a TTL."""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl > 0:
+            if key in self._entries:
+                self._remove(key)
+            self._store(
+                key, time.monotonic() + ttl, size or _estimate_size(value), value
+            )
+
+    def _store(self, key: Hashable, expires_at: float, size: int, value: Any) -> None:
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (expires_at, size, value)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            cache_evictions.inc()
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+
+def _retrieve_exception(task: asyncio.Task[Any]) -> None:
+    # Every caller may have given up; do not warn about an unread exception.
+    if not task.cancelled():
+        task.exception()
+
+
+def _estimate_size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+_cache: ResponseCache | None = None
+
+
+def configure_cache(
+    ttls: dict[str, float] | None,
+    max_entries: int = 1024,
+    max_bytes: int = 8 * 1024 * 1024,
+) -> ResponseCache | None:
+    """Enable the response cache with per-endpoint TTLs, or disable it with ``None``."""
+    global _cache
+    _cache = ResponseCache(ttls, max_entries, max_bytes) if ttls is not None else None
+    return _cache
+
+
+def parse_cache_ttls(spec: str) -> dict[str, float]:
+    """Parse ``"events=60,attendees=300"`` into a TTL mapping."""
+    ttls: dict[str, float] = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        endpoint, seconds = part.split("=", 1)
+        ttls[endpoint.strip()] = float(seconds)
+    return ttls
+
 
 def _get_session(session: ClientSession | None = None) -> ClientSession:
     global _session
@@ -36,22 +236,72 @@ def _load_schema(name: str) -> dict[str, Any]:
         return json.load(f)
 
 
+@lru_cache
+def _item_validator(name: str) -> Validator:
+    """Return a compiled validator for one item of schema *name*.
+
+    The schema is checked once and the validator reused for every response.
+    """
+    schema = _load_schema(name)
+    item_schema = schema["items"] if schema.get("type") == "array" else schema
+    cls: Any = validator_for(schema)
+    cls.check_schema(item_schema)
+    return cast(Validator, cls(item_schema))
+
+
 def _validate_list(
     data: list[dict[str, Any]], schema_name: str, fallback_key: str
 ) -> list[dict[str, Any]]:
-    schema = _load_schema(schema_name)
-    array_schema = (
-        schema if schema.get("type") == "array" else {"type": "array", "items": schema}
-    )
-    try:
-        validate(data, array_schema)
-        return data
-    except ValidationError:
+    if not isinstance(data, list):
         logger.warning(
             "adapter_schema_mismatch",
             extra={"schema": schema_name, "correlation_id": get_correlation_id()},
         )
-        return [{fallback_key: item.get(fallback_key)} for item in data]
+        return []
+    validator = _item_validator(schema_name)
+    items: list[dict[str, Any]] = []
+    invalid = 0
+    for item in data:
+        if validator.is_valid(item):
+            items.append(item)
+        else:
+            invalid += 1
+            value = item.get(fallback_key) if isinstance(item, dict) else None
+            items.append({fallback_key: value})
+    if invalid:
+        logger.warning(
+            "adapter_schema_mismatch",
+            extra={
+                "schema": schema_name,
+                "invalid_items": invalid,
+                "correlation_id": get_correlation_id(),
+            },
+        )
+    return items
+
+
+_validation_thread_threshold = 0
+
+
+def configure_validation(thread_threshold: int) -> None:
+    """Validate responses with at least *thread_threshold* items off the event loop.
+
+    ``0`` keeps all validation on the event loop.
+    """
+    global _validation_thread_threshold
+    _validation_thread_threshold = thread_threshold
+
+
+async def _validate_async(
+    data: list[dict[str, Any]], schema_name: str, fallback_key: str
+) -> list[dict[str, Any]]:
+    if (
+        _validation_thread_threshold
+        and isinstance(data, list)
+        and len(data) >= _validation_thread_threshold
+    ):
+        return await asyncio.to_thread(_validate_list, data, schema_name, fallback_key)
+    return _validate_list(data, schema_name, fallback_key)
 
 
 def _headers(extra: dict[str, str] | None = None) -> dict[str, str]:
@@ -88,21 +338,118 @@ async def login(
         return await resp.json()
 
 
+class FeedPage(list):  # type: ignore[type-arg]
+    """Validated adapter items plus the HTTP validator they were served with.
+
+    ``version`` is the response ``ETag`` (or ``Last-Modified``) and
+    ``not_modified`` is set when the adapter answered ``304`` and the items
+    were reused from the previous response without parsing or validation.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[dict[str, Any]] = (),
+        version: str | None = None,
+        not_modified: bool = False,
+    ) -> None:
+        super().__init__(items)
+        self.version = version
+        self.not_modified = not_modified
+
+
+@dataclass
+class _Validator:
+    etag: str | None
+    last_modified: str | None
+    page: FeedPage
+    since: str | None = None
+
+
+_validators: dict[Hashable, _Validator] = {}
+
+
+async def _get_list(
+    session: ClientSession | None,
+    endpoint: str,
+    url: str,
+    schema_name: str,
+    fallback_key: str,
+    account_id: int | None = None,
+    params: dict[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
+    query = sorted((params or {}).items())
+    key = (url, tuple(query), extra.get("X-Account-ID"))
+    # One validator is kept per feed, with the ``since`` watermark it was
+    # issued for. It is only sent while the watermark stays put, and the
+    # next page after the watermark moves replaces it.
+    since = (params or {}).get("since")
+    feed = (url, tuple(p for p in query if p[0] != "since"), extra.get("X-Account-ID"))
+
+    async def fetch() -> tuple[list[dict[str, Any]], int]:
+        headers = _headers(extra)
+        validator = _validators.get(feed)
+        if validator and validator.since != since:
+            validator = None
+        if validator:
+            if validator.etag:
+                headers["If-None-Match"] = validator.etag
+            if validator.last_modified:
+                headers["If-Modified-Since"] = validator.last_modified
+        sess = _get_session(session)
+        async with sess.get(url, params=params, headers=headers) as resp:
+            if resp.status == 304 and validator:
+                not_modified.inc()
+                _mark_reused()
+                page = FeedPage(validator.page, validator.page.version, True)
+                return page, 0
+            resp.raise_for_status()
+            data = await resp.json()
+            size = resp.content_length or 0
+            etag = resp.headers.get("ETag")
+            last_modified = resp.headers.get("Last-Modified")
+            page = FeedPage(
+                await _validate_async(data, schema_name, fallback_key),
+                etag or last_modified,
+            )
+            if etag or last_modified:
+                _validators[feed] = _Validator(etag, last_modified, page, since)
+            else:
+                _validators.pop(feed, None)
+            return page, size
+
+    if _cache is None:
+        items, _ = await fetch()
+        return items
+    return await _cache.get_or_fetch(endpoint, key, fetch)
+
+
+def _since_params(
+    since: int | None, params: dict[str, str] | None = None
+) -> dict[str, str] | None:
+    """Add the ``since`` high-watermark to query *params* when set."""
+    if since is None:
+        return params
+    return {**(params or {}), "since": str(since)}
+
+
 async def fetch_events(
     base_url: str,
     location: str,
     account_id: int | None = None,
     session: ClientSession | None = None,
+    since: int | None = None,
 ) -> list[dict[str, Any]]:
     """Fetch events from the adapter service."""
-    extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
-    session = _get_session(session)
-    async with session.get(
-        f"{base_url}/events", params={"location": location}, headers=_headers(extra)
-    ) as resp:
-        resp.raise_for_status()
-        data = await resp.json()
-        return _validate_list(data, "event.json", "link")
+    return await _get_list(
+        session,
+        "events",
+        f"{base_url}/events",
+        "event.json",
+        "link",
+        account_id=account_id,
+        params=_since_params(since, {"location": location}),
+    )
 
 
 async def fetch_writings(
@@ -110,16 +457,18 @@ async def fetch_writings(
     user_id: str,
     account_id: int | None = None,
     session: ClientSession | None = None,
+    since: int | None = None,
 ) -> list[dict[str, Any]]:
     """Fetch writings for a user from the adapter service."""
-    extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
-    session = _get_session(session)
-    async with session.get(
-        f"{base_url}/users/{user_id}/writings", headers=_headers(extra)
-    ) as resp:
-        resp.raise_for_status()
-        data = await resp.json()
-        return _validate_list(data, "writing.json", "link")
+    return await _get_list(
+        session,
+        "writings",
+        f"{base_url}/users/{user_id}/writings",
+        "writing.json",
+        "link",
+        account_id=account_id,
+        params=_since_params(since),
+    )
 
 
 async def fetch_attendees(
@@ -129,14 +478,14 @@ async def fetch_attendees(
     session: ClientSession | None = None,
 ) -> list[dict[str, Any]]:
     """Fetch attendees for an event from the adapter service."""
-    extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
-    session = _get_session(session)
-    async with session.get(
-        f"{base_url}/events/{event_id}/attendees", headers=_headers(extra)
-    ) as resp:
-        resp.raise_for_status()
-        data = await resp.json()
-        return _validate_list(data, "event_attendees.json", "id")
+    return await _get_list(
+        session,
+        "attendees",
+        f"{base_url}/events/{event_id}/attendees",
+        "event_attendees.json",
+        "id",
+        account_id=account_id,
+    )
 
 
 async def fetch_group_posts(
@@ -144,34 +493,345 @@ async def fetch_group_posts(
     group_id: str,
     account_id: int | None = None,
     session: ClientSession | None = None,
+    since: int | None = None,
 ) -> list[dict[str, Any]]:
     """Fetch posts for a group from the adapter service."""
-    extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
-    session = _get_session(session)
-    async with session.get(
-        f"{base_url}/groups/{group_id}/posts", headers=_headers(extra)
-    ) as resp:
-        resp.raise_for_status()
-        data = await resp.json()
-        return _validate_list(data, "group_post.json", "link")
+    return await _get_list(
+        session,
+        "group_posts",
+        f"{base_url}/groups/{group_id}/posts",
+        "group_post.json",
+        "link",
+        account_id=account_id,
+        params=_since_params(since),
+    )
 
 
 async def fetch_messages(
     base_url: str,
     account_id: int | None = None,
     session: ClientSession | None = None,
+    since: int | None = None,
 ) -> list[dict[str, Any]]:
     """Fetch direct messages from the adapter service."""
+    return await _get_list(
+        session,
+        "messages",
+        f"{base_url}/messages",
+        "message.json",
+        "id",
+        account_id=account_id,
+        params=_since_params(since),
+    )
+
+
+# Feed types the adapter can fetch for many targets in one request, with the
+# single-target path, item schema and fallback key of each.
+BATCH_TYPES: dict[str, tuple[str, str, str]] = {
+    "writings": ("users/{}/writings", "writing.json", "link"),
+    "group_posts": ("groups/{}/posts", "group_post.json", "link"),
+}
+
+# Most targets the adapter accepts in one batch request.
+MAX_BATCH_SIZE = 50
+
+BatchResults = dict[str, "list[dict[str, Any]] | Exception"]
+
+# Item schema and fallback key of every feed type, for pushed items.
+ITEM_SCHEMAS: dict[str, tuple[str, str]] = {
+    "events": ("event.json", "link"),
+    "writings": ("writing.json", "link"),
+    "attendees": ("event_attendees.json", "id"),
+    "group_posts": ("group_post.json", "link"),
+    "messages": ("message.json", "id"),
+}
+
+_batch_supported = True
+
+
+async def _fetch_each(
+    base_url: str,
+    sub_type: str,
+    target_ids: list[str],
+    account_id: int | None,
+    session: ClientSession | None,
+    since: dict[str, int],
+) -> BatchResults:
+    fetch_one = {"writings": fetch_writings, "group_posts": fetch_group_posts}[sub_type]
+    pages = await asyncio.gather(
+        *(
+            fetch_one(
+                base_url,
+                target,
+                account_id=account_id,
+                session=session,
+                since=since.get(target),
+            )
+            for target in target_ids
+        ),
+        return_exceptions=True,
+    )
+    return {
+        target: cast("list[dict[str, Any]] | Exception", page)
+        for target, page in zip(target_ids, pages)
+    }
+
+
+def _batch_body(target_ids: list[str], since: dict[str, int]) -> dict[str, Any]:
+    body: dict[str, Any] = {"ids": target_ids}
+    watermarks = {t: since[t] for t in target_ids if t in since}
+    if watermarks:
+        body["since"] = watermarks
+    return body
+
+
+async def fetch_batch(
+    base_url: str,
+    sub_type: str,
+    target_ids: Iterable[str],
+    account_id: int | None = None,
+    session: ClientSession | None = None,
+    since: dict[str, int] | None = None,
+) -> BatchResults:
+    """Fetch items of many targets of one feed type with ``POST /batch/{type}``.
+
+    Returns each target's validated items, or the error the adapter
+    reported for it as a :class:`ClientResponseError`. *since* maps targets
+    to their high-watermark. Targets with a fresh cached response are not
+    requested again. A single target, or an adapter without the batch
+    endpoint, is fetched with the plain GET.
+    """
+    global _batch_supported
+    path, schema_name, fallback_key = BATCH_TYPES[sub_type]
+    since = since or {}
     extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
-    session = _get_session(session)
-    async with session.get(f"{base_url}/messages", headers=_headers(extra)) as resp:
+    keys = {
+        target: (
+            f"{base_url}/{path.format(target)}",
+            tuple(sorted((_since_params(since.get(target)) or {}).items())),
+            extra.get("X-Account-ID"),
+        )
+        for target in dict.fromkeys(target_ids)
+    }
+    results: BatchResults = {}
+    missing: list[str] = []
+    for target, key in keys.items():
+        cached = _cache.lookup(key) if _cache is not None else None
+        if cached is not None:
+            results[target] = cached
+        else:
+            missing.append(target)
+    if not missing:
+        return results
+    if len(missing) == 1 or not _batch_supported:
+        results.update(
+            await _fetch_each(base_url, sub_type, missing, account_id, session, since)
+        )
+        return results
+    sess = _get_session(session)
+    try:
+        async with sess.post(
+            f"{base_url}/batch/{sub_type}",
+            json=_batch_body(missing, since),
+            headers=_headers(extra),
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+            request_info, history = resp.request_info, resp.history
+    except ClientResponseError as exc:
+        if exc.status not in (404, 405):
+            raise
+        logger.warning(
+            "adapter_batch_unsupported",
+            extra={"correlation_id": get_correlation_id()},
+        )
+        _batch_supported = False
+        results.update(
+            await _fetch_each(base_url, sub_type, missing, account_id, session, since)
+        )
+        return results
+    batch_requests_saved.inc(len(missing) - 1)
+    found = data.get("results", {}) if isinstance(data, dict) else {}
+    errors = data.get("errors", {}) if isinstance(data, dict) else {}
+    for target in missing:
+        if target in found:
+            page = FeedPage(
+                await _validate_async(found[target], schema_name, fallback_key)
+            )
+            results[target] = page
+            if _cache is not None:
+                _cache.put(sub_type, keys[target], page)
+        else:
+            error = errors.get(target) or {}
+            results[target] = ClientResponseError(
+                request_info,
+                history,
+                status=int(error.get("status", 502)),
+                message=str(error.get("error", "missing from batch response")),
+            )
+    return results
+
+
+async def validate_items(sub_type: str, data: Any) -> list[dict[str, Any]]:
+    """Validate items pushed for a *sub_type* feed like a fetched page."""
+    schema_name, fallback_key = ITEM_SCHEMAS[sub_type]
+    return await _validate_async(data, schema_name, fallback_key)
+
+
+# Bytes read from a streamed response at a time.
+STREAM_READ_SIZE = 64 * 1024
+# Largest undecoded rest a streamed response may buffer, i.e. one item.
+MAX_STREAM_ITEM_CHARS = 1024 * 1024
+
+
+class ArrayDecoder:
+    """Decode the elements of a top-level JSON array from text fed in pieces.
+
+    Only the undecoded rest of the text is kept between calls, so memory is
+    bounded by the largest element instead of the whole array. Raises
+    ``ValueError`` on malformed input or an element over ``max_pending``
+    characters.
+    """
+
+    def __init__(self, max_pending: int = MAX_STREAM_ITEM_CHARS) -> None:
+        self.max_pending = max_pending
+        self._decoder = json.JSONDecoder()
+        self._rest = ""
+        self._state = "start"
+
+    @property
+    def started(self) -> bool:
+        """Whether the opening ``[`` has been seen."""
+        return self._state != "start"
+
+    def feed(self, text: str, final: bool = False) -> list[Any]:
+        """Return the elements completed by *text*; *final* marks the end."""
+        buf = self._rest + text
+        end = len(buf)
+        pos = 0
+        items: list[Any] = []
+        while True:
+            while pos < end and buf[pos] in " \t\n\r":
+                pos += 1
+            if pos == end:
+                break
+            char = buf[pos]
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError("expected a JSON array")
+                self._state = "first"
+                pos += 1
+            elif self._state == "sep" or (self._state == "first" and char == "]"):
+                if char == "]":
+                    self._state = "end"
+                elif char == "," and self._state == "sep":
+                    self._state = "value"
+                else:
+                    raise ValueError(f"unexpected {char!r} in JSON array")
+                pos += 1
+            elif self._state in ("first", "value"):
+                try:
+                    value, stop = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                if stop == end and not final and char not in '{["':
+                    # A number or literal may go on in the next piece.
+                    break
+                items.append(value)
+                self._state = "sep"
+                pos = stop
+            else:
+                raise ValueError("data after JSON array")
+        self._rest = buf[pos:]
+        if len(self._rest) > self.max_pending:
+            raise ValueError("JSON array element too large")
+        if final and self._state != "end":
+            raise ValueError("truncated JSON array")
+        return items
+
+
+def _feed_request(
+    base_url: str, sub_type: str, target_id: str, since: int | None
+) -> tuple[str, dict[str, str] | None]:
+    if sub_type == "events":
+        return f"{base_url}/events", _since_params(since, {"location": target_id})
+    if sub_type == "messages":
+        return f"{base_url}/messages", _since_params(since)
+    path = {
+        "writings": "users/{}/writings",
+        "attendees": "events/{}/attendees",
+        "group_posts": "groups/{}/posts",
+    }[sub_type]
+    return f"{base_url}/{path.format(target_id)}", _since_params(since)
+
+
+async def stream_feed(
+    base_url: str,
+    sub_type: str,
+    target_id: str,
+    account_id: int | None = None,
+    session: ClientSession | None = None,
+    since: int | None = None,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Yield the validated items of a feed while its response is being read.
+
+    Unlike the ``fetch_*`` functions the body is never held in full: items
+    are decoded one at a time from the response stream, so memory does not
+    grow with the size of the response. Streams bypass the response cache
+    and conditional GETs.
+    """
+    schema_name, fallback_key = ITEM_SCHEMAS[sub_type]
+    url, params = _feed_request(base_url, sub_type, target_id, since)
+    extra = {"X-Account-ID": str(account_id)} if account_id is not None else {}
+    validator = _item_validator(schema_name)
+    decoder = ArrayDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    invalid = 0
+    sess = _get_session(session)
+    async with sess.get(url, params=params, headers=_headers(extra)) as resp:
         resp.raise_for_status()
-        data = await resp.json()
-        return _validate_list(data, "message.json", "id")
+        chunks = resp.content.iter_chunked(STREAM_READ_SIZE)
+        final = False
+        while not final:
+            chunk = await anext(chunks, None)
+            final = chunk is None
+            try:
+                items = decoder.feed(text.decode(chunk or b"", final), final)
+            except ValueError:
+                if decoder.started:
+                    raise
+                logger.warning(
+                    "adapter_schema_mismatch",
+                    extra={
+                        "schema": schema_name,
+                        "correlation_id": get_correlation_id(),
+                    },
+                )
+                return
+            for item in items:
+                if validator.is_valid(item):
+                    yield item
+                else:
+                    invalid += 1
+                    value = item.get(fallback_key) if isinstance(item, dict) else None
+                    yield {fallback_key: value}
+    if invalid:
+        logger.warning(
+            "adapter_schema_mismatch",
+            extra={
+                "schema": schema_name,
+                "invalid_items": invalid,
+                "correlation_id": get_correlation_id(),
+            },
+        )
 
 
 async def close_session() -> None:
-    global _session
+    global _session, _batch_supported
     if _session and not _session.closed:
         await _session.close()
     _session = None
+    _validators.clear()
+    _batch_supported = True
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from collections.abc import Awaitable, Callable
 from functools import wraps
-from typing import Any, Protocol
+from typing import Any, Protocol, TypeVar, cast
 
 from sqlalchemy.orm import Session
 
@@ -16,12 +16,13 @@ class InteractionLike(Protocol):
     user: Any
 
 
-def log_action(
-    action: str, target_param: str | None = None
-) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def log_action(action: str, target_param: str | None = None) -> Callable[[F], F]:
     """Decorator to log a management action to the audit log."""
 
-    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    def decorator(func: F) -> F:
         @wraps(func)
         async def wrapper(
             interaction: InteractionLike, *args: Any, **kwargs: Any
@@ -46,6 +47,6 @@ def log_action(
                 session.close()
             return result
 
-        return wrapper
+        return cast(F, wrapper)
 
     return decorator
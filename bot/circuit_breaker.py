@@ -1,5 +1,9 @@
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Iterator, TypeVar
+
+K = TypeVar("K", bound=Hashable)
 
 
 class CircuitBreakerOpen(Exception):
@@ -8,29 +12,108 @@ class CircuitBreakerOpen(Exception):
 
 @dataclass
 class CircuitBreaker:
+    """Stop calling a failing dependency for ``reset_timeout`` seconds.
+
+    After the timeout the breaker is half open: up to ``half_open_max``
+    probe calls go through. A successful probe closes it, a failed one
+    opens it for another timeout.
+    """
+
     max_failures: int
     reset_timeout: int
+    half_open_max: int = 1
     failures: int = 0
     opened_at: float | None = None
+    probes: int = 0
 
-    def before_call(self) -> None:
+    @property
+    def state(self) -> str:
         if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
             return
-        if time.time() - self.opened_at >= self.reset_timeout:
-            self.failures = 0
-            self.opened_at = None
-        else:
+        if state == "open" or self.probes >= self.half_open_max:
             raise CircuitBreakerOpen()
+        self.probes += 1
+
+    def release(self) -> None:
+        """Give back a probe whose call ended without a result."""
+        self.probes = max(0, self.probes - 1)
 
     @property
     def is_open(self) -> bool:
-        return self.opened_at is not None
+        return self.state == "open"
 
     def record_success(self) -> None:
         self.failures = 0
         self.opened_at = None
+        self.probes = 0
 
     def record_failure(self) -> None:
         self.failures += 1
-        if self.failures >= self.max_failures:
+        if self.opened_at is not None or self.failures >= self.max_failures:
             self.opened_at = time.time()
+            self.probes = 0
+
+
+class CircuitBreakerRegistry(Generic[K]):
+    """One :class:`CircuitBreaker` per key, such as ``(account_id, endpoint)``.
+
+    Breakers are created closed on first use and kept, so their state can
+    be listed on the health pages. With *max_breakers* set, the least
+    recently used closed breakers are dropped beyond that many, and
+    *on_evict* is called with each dropped key. Open and half-open breakers
+    are never dropped, so eviction cannot reset one.
+    """
+
+    def __init__(
+        self,
+        max_failures: int,
+        reset_timeout: int,
+        half_open_max: int = 1,
+        max_breakers: int | None = None,
+        on_evict: Callable[[K], None] | None = None,
+    ) -> None:
+        self.max_failures = max_failures
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.max_breakers = max_breakers
+        self.on_evict = on_evict
+        self._breakers: OrderedDict[K, CircuitBreaker] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._breakers)
+
+    def get(self, key: K) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is not None:
+            self._breakers.move_to_end(key)
+            return breaker
+        breaker = CircuitBreaker(
+            self.max_failures, self.reset_timeout, self.half_open_max
+        )
+        self._breakers[key] = breaker
+        if self.max_breakers is not None:
+            self._evict(len(self._breakers) - self.max_breakers)
+        return breaker
+
+    def _evict(self, excess: int) -> None:
+        # The newest breaker is never a candidate: it is about to be used.
+        for key in list(self._breakers)[:-1]:
+            if excess <= 0:
+                break
+            if self._breakers[key].state != "closed":
+                continue
+            del self._breakers[key]
+            excess -= 1
+            if self.on_evict is not None:
+                self.on_evict(key)
+
+    def items(self) -> Iterator[tuple[K, CircuitBreaker]]:
+        return iter(list(self._breakers.items()))
@@ -0,0 +1,112 @@
+"""Adaptive concurrency limits."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from types import TracebackType
+
+from prometheus_client import Gauge
+
+adapter_concurrency_limit = Gauge(
+    "adapter_concurrency_limit", "Current adaptive limit of concurrent adapter requests"
+)
+
+
+class AIMDLimiter:
+    """Limit concurrent calls with additive increase, multiplicative decrease.
+
+    Every successful call within the latency tolerance grows the limit by
+    ``increase / limit``, so about ``increase`` per round of ``limit`` calls.
+    An overload signal (a timeout, a 5xx or 429, or a recent latency more
+    than ``tolerance`` times the long-run baseline) multiplies it by
+    ``decrease``, at most once per recent latency so one burst of failures
+    from calls already in flight counts once. Waiting callers are admitted
+    first in, first out.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        tolerance: float = 2.0,
+        gauge: Gauge | None = None,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.tolerance = tolerance
+        self.limit = float(initial)
+        self.inflight = 0
+        self.baseline: float | None = None
+        self.recent: float | None = None
+        self._last_decrease = float("-inf")
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._gauge = gauge
+        self._publish()
+
+    async def __aenter__(self) -> AIMDLimiter:
+        if self.inflight >= int(self.limit) or self._waiters:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # Admitted just before the cancellation: pass the slot on.
+                    self.inflight -= 1
+                    self._wake()
+                raise
+        else:
+            self.inflight += 1
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.inflight -= 1
+        self._wake()
+
+    def on_success(self, latency: float) -> None:
+        """Record a successful call that took *latency* seconds."""
+        self.recent = (
+            latency if self.recent is None else 0.7 * self.recent + 0.3 * latency
+        )
+        self.baseline = (
+            latency if self.baseline is None else 0.99 * self.baseline + 0.01 * latency
+        )
+        if self.recent > self.tolerance * self.baseline:
+            self.on_overload()
+            return
+        self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        self._publish()
+        self._wake()
+
+    def on_overload(self) -> None:
+        """Record a timeout, 5xx, 429 or latency spike."""
+        now = time.monotonic()
+        if now - self._last_decrease < (self.recent or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self._publish()
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < int(self.limit):
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.inflight += 1
+            future.set_result(None)
+
+    def _publish(self) -> None:
+        if self._gauge is not None:
+            self._gauge.set(self.limit)
@@ -1,7 +1,14 @@
+import asyncio
 import os
 import hashlib
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Hashable
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 from argon2.low_level import hash_secret, Type
 
 
@@ -26,6 +33,12 @@ engine = create_engine(DATABASE_URL, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+# Engines whose tables init_db() has already created.
+_schema_created: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+# Async drivers used for each sync dialect when building the async engine.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
 
 def hash_credentials(username: str, password: str) -> str:
     pepper = os.getenv("CREDENTIAL_SALT", "")
@@ -48,5 +61,96 @@ def init_db(url: str | None = None):
     if url:
         engine = create_engine(url, future=True)
         SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-    Base.metadata.create_all(bind=engine)
+    if engine not in _schema_created:
+        Base.metadata.create_all(bind=engine)
+        _schema_created.add(engine)
+    return SessionLocal()
+
+
+def get_session() -> Session:
+    """Return a new session on the current engine without touching the schema."""
     return SessionLocal()
+
+
+def async_url(url: str) -> str:
+    """Return *url* rewritten to use the async driver for its dialect."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(
+        drivername=f"{parsed.get_backend_name()}+{driver}"
+    ).render_as_string(hide_password=False)
+
+
+def async_sessions(url: str | None = None) -> async_sessionmaker[AsyncSession]:
+    """Return a session factory on an async engine for *url*.
+
+    Defaults to the URL of the current sync engine. Queries issued through
+    these sessions run on aiosqlite/asyncpg and do not block the event loop.
+    """
+    target = async_url(url or engine.url.render_as_string(hide_password=False))
+    kwargs: dict = {}
+    if make_url(target).database in (None, "", ":memory:"):
+        # Keep a single connection so every session sees the same database.
+        kwargs["poolclass"] = StaticPool
+    async_engine = create_async_engine(target, **kwargs)
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+if TYPE_CHECKING:
+    # Typed as a Session, whose whole interface the proxy forwards.
+    _SessionProxy = Session
+else:
+    _SessionProxy = object
+
+
+class TaskScopedSession(_SessionProxy):
+    """Session proxy that gives each asyncio task its own session.
+
+    Attribute access is forwarded to the session of the current task, so a
+    single handle can be shared by commands, event handlers, HTTP routes and
+    scheduled jobs while each of them works in its own unit of work. The
+    session is closed when its task finishes; code running outside a task
+    gets one session per thread until :meth:`remove` is called.
+    """
+
+    def __init__(self, factory: sessionmaker[Session]) -> None:
+        self.factory = factory
+        self._sessions: dict[Hashable, Session] = {}
+
+    @staticmethod
+    def _scope() -> Hashable:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return task if task is not None else threading.get_ident()
+
+    @property
+    def session(self) -> Session:
+        key = self._scope()
+        session = self._sessions.get(key)
+        if session is None:
+            session = self.factory()
+            self._sessions[key] = session
+            if isinstance(key, asyncio.Task):
+                key.add_done_callback(self._release)
+        return session
+
+    def _release(self, key: Hashable) -> None:
+        session = self._sessions.pop(key, None)
+        if session is not None:
+            session.close()
+
+    def remove(self) -> None:
+        """Close and forget the session of the current task or thread."""
+        self._release(self._scope())
+
+    @property
+    def active(self) -> int:
+        """Number of sessions currently open."""
+        return len(self._sessions)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
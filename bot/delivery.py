@@ -0,0 +1,144 @@
+"""Per-channel ordered delivery of Discord sends and embed batching."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Sequence
+
+from prometheus_client import Gauge, Histogram
+
+Send = Callable[[], Awaitable[Any]]
+
+# Discord limits for embeds in a single message.
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+send_queue_depth = Gauge(
+    "discord_send_queue_depth",
+    "Sends waiting in a channel's delivery queue",
+    ["channel"],
+)
+send_latency = Histogram(
+    "discord_send_latency_seconds",
+    "Latency of individual Discord sends by channel",
+    ["channel"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+def embeds_per_message(settings: Dict[str, Any]) -> int:
+    """Return a channel's ``embeds_per_message`` setting clamped to 1-10."""
+    try:
+        value = int(settings.get("embeds_per_message", 1))
+    except (TypeError, ValueError):
+        return 1
+    return max(1, min(MAX_EMBEDS, value))
+
+
+def pack_embeds(sizes: Sequence[int], per_message: int) -> list[range]:
+    """Group consecutive embeds of *sizes* characters into messages.
+
+    Each group holds at most *per_message* embeds and, where possible,
+    ``MAX_EMBED_CHARS`` characters; an oversized embed gets its own message.
+    """
+    groups: list[range] = []
+    start, chars = 0, 0
+    for index, size in enumerate(sizes):
+        if index > start and (
+            index - start >= per_message or chars + size > MAX_EMBED_CHARS
+        ):
+            groups.append(range(start, index))
+            start, chars = index, 0
+        chars += size
+    if sizes:
+        groups.append(range(start, len(sizes)))
+    return groups
+
+
+@dataclass
+class _Batch:
+    sends: Sequence[Send]
+    done: asyncio.Future[int]
+
+
+@dataclass
+class _Channel:
+    batches: deque[_Batch] = field(default_factory=deque)
+    pending: int = 0
+    worker: asyncio.Task[None] | None = None
+
+
+class ChannelSender:
+    """Deliver batches of sends with one ordered queue per channel.
+
+    Every channel with queued work gets its own worker task, so channels
+    deliver concurrently while sends to one channel keep the order they were
+    queued in, across batches and subscriptions. At most ``concurrency``
+    sends are in flight at once. A batch stops at its first failing send and
+    later batches for the channel still run. Workers exit once their queue
+    is empty.
+    """
+
+    def __init__(self, concurrency: int = 8) -> None:
+        self._channels: dict[Hashable, _Channel] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def depth(self, channel_id: Hashable) -> int:
+        """Number of sends queued or in flight for *channel_id*."""
+        state = self._channels.get(channel_id)
+        return state.pending if state else 0
+
+    async def deliver(self, channel_id: Hashable, sends: Sequence[Send]) -> int:
+        """Queue *sends* for *channel_id* and wait until they were made.
+
+        Returns the number of sends made. If one fails, the remaining sends of
+        the batch are skipped and its exception is raised.
+        """
+        if not sends:
+            return 0
+        state = self._channels.setdefault(channel_id, _Channel())
+        batch = _Batch(sends, asyncio.get_running_loop().create_future())
+        state.batches.append(batch)
+        state.pending += len(sends)
+        send_queue_depth.labels(str(channel_id)).set(state.pending)
+        if state.worker is None:
+            state.worker = asyncio.create_task(self._run(channel_id, state))
+        return await batch.done
+
+    async def _run(self, channel_id: Hashable, state: _Channel) -> None:
+        label = str(channel_id)
+        try:
+            while state.batches:
+                batch = state.batches[0]
+                sent = 0
+                try:
+                    for send in batch.sends:
+                        async with self._slots:
+                            start = time.perf_counter()
+                            try:
+                                await send()
+                            finally:
+                                send_latency.labels(label).observe(
+                                    time.perf_counter() - start
+                                )
+                        sent += 1
+                        state.pending -= 1
+                        send_queue_depth.labels(label).set(state.pending)
+                except Exception as exc:
+                    if not batch.done.done():
+                        batch.done.set_exception(exc)
+                else:
+                    if not batch.done.done():
+                        batch.done.set_result(sent)
+                state.batches.popleft()
+                state.pending -= len(batch.sends) - sent
+                send_queue_depth.labels(label).set(state.pending)
+        finally:
+            # Only reached with batches left if the worker was cancelled.
+            for batch in state.batches:
+                batch.done.cancel()
+            send_queue_depth.labels(label).set(0)
+            del self._channels[channel_id]
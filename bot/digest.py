@@ -0,0 +1,76 @@
+"""Digest delivery windows and summary embeds."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Sequence
+
+import discord
+
+# Discord's limit for an embed description.
+MAX_DESCRIPTION = 4096
+
+_INTERVAL = re.compile(r"(\d+)([mh])")
+_DAILY = re.compile(r"([01]?\d|2[0-3]):([0-5]\d)")
+
+
+def parse_window(spec: str) -> str:
+    """Validate and normalize a digest schedule.
+
+    ``<n>m`` or ``<n>h`` flushes every *n* minutes or hours, aligned to the
+    epoch; ``HH:MM`` flushes once a day at that UTC time.
+    """
+    spec = spec.strip().lower()
+    if match := _INTERVAL.fullmatch(spec):
+        if int(match.group(1)) <= 0:
+            raise ValueError("digest interval must be positive")
+        return f"{int(match.group(1))}{match.group(2)}"
+    if match := _DAILY.fullmatch(spec):
+        return f"{int(match.group(1)):02d}:{match.group(2)}"
+    raise ValueError(f"invalid digest schedule: {spec!r}")
+
+
+def window_start(spec: str, now: datetime) -> datetime:
+    """Return the start of the window containing *now* (naive UTC).
+
+    Items buffered before it belong to a finished window and are due.
+    """
+    if match := _INTERVAL.fullmatch(spec):
+        size = int(match.group(1)) * (60 if match.group(2) == "m" else 3600)
+        elapsed = (now - datetime(1970, 1, 1)).total_seconds()
+        return datetime(1970, 1, 1) + timedelta(seconds=elapsed - elapsed % size)
+    hour, minute = (int(part) for part in spec.split(":"))
+    start = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    return start if start <= now else start - timedelta(days=1)
+
+
+def _line(sub_type: str, item: Dict[str, Any]) -> str:
+    if sub_type == "attendees":
+        status = f" ({item['status']})" if item.get("status") else ""
+        return f"{item.get('nickname', '')}{status}"
+    if sub_type == "messages":
+        sender = f"{item['sender']}: " if item.get("sender") else ""
+        return f"{sender}{str(item.get('text', ''))[:80]}"
+    title = item.get("title", "") or item.get("id", "")
+    line = f"[{title}]({item['link']})" if item.get("link") else str(title)
+    if sub_type == "events" and item.get("time"):
+        line += f" – {item['time']}"
+    return line
+
+
+def render(sub_type: str, items: Sequence[Dict[str, Any]]) -> discord.Embed:
+    """Summarize *items* in one embed, one line per item."""
+    lines: list[str] = []
+    used = 0
+    for index, item in enumerate(items):
+        line = f"• {_line(sub_type, item)}"
+        more = f"… and {len(items) - index} more"
+        if used + len(line) + 1 + len(more) > MAX_DESCRIPTION:
+            lines.append(more)
+            break
+        lines.append(line)
+        used += len(line) + 1
+    return discord.Embed(
+        title=f"{len(items)} new {sub_type}", description="\n".join(lines)
+    )
@@ -0,0 +1,363 @@
+"""Coalesce and batch adapter fetches across subscriptions."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+
+from prometheus_client import Counter
+
+
+FeedKey = Tuple[str, str, "int | None"]
+FetchResult = Tuple[list[dict[str, Any]], bool]
+BatchKey = Tuple[str, "int | None"]
+BatchFetch = Callable[
+    [str, list[str], "int | None", Dict[str, int]],
+    Awaitable[Dict[str, "list[dict[str, Any]] | Exception"]],
+]
+
+feed_fetches_coalesced = Counter(
+    "feed_fetches_coalesced_total",
+    "Subscription polls served from another subscription's fetch of the same feed",
+)
+
+
+def feed_key(sub_type: str, target_id: str, account_id: int | None) -> FeedKey:
+    """Return the key identifying the adapter feed behind a subscription."""
+    # The inbox does not depend on the target, only on the account.
+    return (sub_type, "" if sub_type == "messages" else target_id, account_id)
+
+
+# Feeds whose item IDs grow over time, so the highest ID relayed so far is a
+# high-watermark: the adapter only returns newer items after it.
+WATERMARK_TYPES = frozenset({"events", "writings", "group_posts", "messages"})
+
+
+def item_number(item_id: Any) -> int | None:
+    """Return *item_id* as a number, or ``None`` if it is not numeric."""
+    try:
+        return int(item_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def next_watermark(
+    since: int | None, handled: Iterable[str], missed: Iterable[str]
+) -> int | None:
+    """Advance *since* over the *handled* item IDs.
+
+    Only IDs below every *missed* one count, so an item whose send failed is
+    fetched again on the next poll.
+    """
+    limit = min(
+        (n for n in map(item_number, missed) if n is not None),
+        default=None,
+    )
+    for number in map(item_number, handled):
+        if number is None or (limit is not None and number >= limit):
+            continue
+        if since is None or number > since:
+            since = number
+    return since
+
+
+def phase_offset(key: FeedKey, interval: float) -> float:
+    """Return a stable offset in ``[0, interval)`` for polling *key*.
+
+    Subscriptions of the same feed share the offset, so their first polls
+    line up and are served by one coalesced fetch.
+    """
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64 * interval
+
+
+def stagger_report(
+    starts: Iterable[float], capacity: float, rate: float
+) -> Tuple[float, int]:
+    """Estimate the startup burst for feeds first polled at *starts* seconds.
+
+    Replays the first fetch of every feed through a token bucket of
+    *capacity* and *rate*. Returns the time until every feed has been
+    fetched once and the most polls waiting on the adapter at one time.
+    """
+    ordered = sorted(starts)
+    tokens, clock = float(capacity), 0.0
+    issued: list[float] = []
+    for start in ordered:
+        if start > clock:
+            tokens = min(capacity, tokens + (start - clock) * rate)
+            clock = start
+        if tokens < 1:
+            clock += (1 - tokens) / rate
+            tokens = 1.0
+        tokens -= 1
+        issued.append(clock)
+    peak, first = 0, 0
+    for last, start in enumerate(ordered):
+        # Issue times never decrease, so polls still waiting form a suffix.
+        while issued[first] < start:
+            first += 1
+        peak = max(peak, last - first + 1)
+    return (issued[-1] if issued else 0.0), peak
+
+
+@dataclass(frozen=True)
+class IntervalController:
+    """Adapt a subscription's poll interval to the rate of new items.
+
+    Keeps an EWMA of new items per second and picks the longest interval
+    expected to see about ``target`` new items per poll. Intervals are
+    ``min_interval`` times a power of two, capped at ``max_interval``, and at
+    most double per poll: quiet feeds back off gradually while a burst of
+    items tightens the interval on the next poll. The coarse steps also mean
+    the persisted interval rarely changes.
+    """
+
+    min_interval: int = 60
+    max_interval: int = 3600
+    target: float = 1.0
+    alpha: float = 0.3
+
+    def update(
+        self, interval: float, rate: float | None, new_items: int
+    ) -> Tuple[int, float]:
+        """Return the next interval and item rate after a successful poll."""
+        sample = new_items / max(interval, 1)
+        rate = sample if rate is None else self.alpha * sample + (1 - self.alpha) * rate
+        desired = self.target / rate if rate > 0 else float(self.max_interval)
+        limit = min(desired, interval * 2, self.max_interval)
+        if limit >= self.max_interval:
+            return self.max_interval, rate
+        step = self.min_interval
+        while step * 2 <= limit:
+            step *= 2
+        return step, rate
+
+
+class PushTracker:
+    """Remember which feeds have items pushed to the bot.
+
+    A feed counts as pushed while its last push is less than ``ttl`` seconds
+    old (twice the reconcile interval by default). Polls of pushed feeds only
+    reconcile every ``reconcile_interval`` seconds; once pushes stop, the
+    feed goes back to its adaptive interval.
+    """
+
+    def __init__(self, reconcile_interval: float = 900, ttl: float | None = None):
+        self.reconcile_interval = reconcile_interval
+        self.ttl = 2 * reconcile_interval if ttl is None else ttl
+        self._pushed: dict[FeedKey, float] = {}
+
+    def record(self, key: FeedKey, now: float | None = None) -> None:
+        self._pushed[key] = time.monotonic() if now is None else now
+
+    def active(self, key: FeedKey, now: float | None = None) -> bool:
+        pushed = self._pushed.get(key)
+        if pushed is None:
+            return False
+        if (time.monotonic() if now is None else now) - pushed < self.ttl:
+            return True
+        del self._pushed[key]
+        return False
+
+    def interval(
+        self, key: FeedKey, interval: float, now: float | None = None
+    ) -> float:
+        """Return the poll interval of *key*, stretched while it is pushed."""
+        if self.active(key, now):
+            return max(interval, self.reconcile_interval)
+        return interval
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    since: int | None
+    items: list[dict[str, Any]]
+    consumers: set[int] = field(default_factory=set)
+
+
+def _covers(fetched: int | None, wanted: int | None) -> bool:
+    """Return whether a fetch after *fetched* holds every item after *wanted*."""
+    return fetched is None or (wanted is not None and fetched <= wanted)
+
+
+class FeedCoalescer:
+    """Share one fetch of a feed with the subscriptions polling it together.
+
+    A result is handed to every subscription of the same feed that polls
+    within ``window`` seconds of the fetch, but at most once per
+    subscription, so a subscription polling again always triggers a fresh
+    fetch. Concurrent polls of the same feed share a single in-flight
+    request. A fetch after a ``since`` watermark only serves subscriptions
+    at or above it; they filter out the items they already relayed.
+    """
+
+    def __init__(self, window: float = 30.0) -> None:
+        self.window = window
+        self._entries: dict[Hashable, _Entry] = {}
+        # (expires_at, sequence, key); stale rows are skipped when popped.
+        self._expiry: list[tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._inflight: dict[
+            Hashable, tuple[int | None, asyncio.Future[FetchResult]]
+        ] = {}
+
+    async def fetch(
+        self,
+        key: Hashable,
+        consumer: int,
+        fetcher: Callable[[], Awaitable[FetchResult]],
+        since: int | None = None,
+    ) -> FetchResult:
+        now = time.monotonic()
+        self._prune(now)
+        entry = self._entries.get(key)
+        if entry and consumer not in entry.consumers and _covers(entry.since, since):
+            entry.consumers.add(consumer)
+            feed_fetches_coalesced.inc()
+            return entry.items, True
+        inflight = self._inflight.get(key)
+        if inflight is not None and _covers(inflight[0], since):
+            coalesced = await asyncio.shield(inflight[1])
+            feed_fetches_coalesced.inc()
+            if (shared := self._entries.get(key)) is not None:
+                shared.consumers.add(consumer)
+            return coalesced
+        # A fetch in flight after a higher watermark misses items this
+        # subscription needs, so it fetches on its own.
+        pending: asyncio.Future[FetchResult] | None = None
+        if inflight is None:
+            pending = asyncio.get_running_loop().create_future()
+            self._inflight[key] = (since, pending)
+        result: FetchResult = ([], False)
+        try:
+            result = await fetcher()
+        finally:
+            if pending is not None:
+                del self._inflight[key]
+            items, ok = result
+            if ok:
+                self._store(key, _Entry(0.0, since, items, {consumer}))
+            if pending is not None:
+                pending.set_result(result)
+        return result
+
+    def _store(self, key: Hashable, entry: _Entry) -> None:
+        entry.expires_at = time.monotonic() + self.window
+        self._entries[key] = entry
+        self._sequence += 1
+        heapq.heappush(self._expiry, (entry.expires_at, self._sequence, key))
+
+    def _prune(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            # The key may have been fetched again since this row was pushed.
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiry.clear()
+
+
+class FeedBatcher:
+    """Group fetches of one feed type and account into batch requests.
+
+    A fetch waits up to ``window`` seconds for fetches of other targets to
+    join it; a group is sent as soon as it holds ``max_size`` targets, so
+    ``max_size=1`` disables batching. Each caller gets the items of its own
+    target or the error reported for it. Callers of one target with
+    different ``since`` watermarks share the lowest, and filter the rest.
+    """
+
+    def __init__(
+        self, fetch_batch: BatchFetch, window: float = 0.5, max_size: int = 25
+    ) -> None:
+        self.fetch_batch = fetch_batch
+        self.window = window
+        self.max_size = max_size
+        self._pending: dict[BatchKey, dict[str, asyncio.Future[Any]]] = {}
+        self._since: dict[BatchKey, dict[str, int | None]] = {}
+        self._timers: dict[BatchKey, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def fetch(
+        self,
+        sub_type: str,
+        target_id: str,
+        account_id: int | None = None,
+        since: int | None = None,
+    ) -> list[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Groups of a previous event loop can never be sent.
+            self._pending.clear()
+            self._since.clear()
+            self._timers.clear()
+            self._loop = loop
+        key = (sub_type, account_id)
+        group = self._pending.setdefault(key, {})
+        watermarks = self._since.setdefault(key, {})
+        future = group.get(target_id)
+        if future is not None:
+            known = watermarks[target_id]
+            if known is not None and (since is None or since < known):
+                watermarks[target_id] = since
+        else:
+            watermarks[target_id] = since
+            future = loop.create_future()
+            group[target_id] = future
+            if len(group) >= self.max_size:
+                self._flush(key)
+            elif len(group) == 1:
+                self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return await asyncio.shield(future)
+
+    def _flush(self, key: BatchKey) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(key, None)
+        watermarks = self._since.pop(key, {})
+        if group:
+            since = {t: s for t, s in watermarks.items() if s is not None}
+            task = asyncio.get_running_loop().create_task(self._send(key, group, since))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(
+        self,
+        key: BatchKey,
+        group: dict[str, asyncio.Future[Any]],
+        since: dict[str, int],
+    ) -> None:
+        sub_type, account_id = key
+        try:
+            try:
+                results = await self.fetch_batch(
+                    sub_type, list(group), account_id, since
+                )
+            except Exception as exc:
+                results = {target: exc for target in group}
+            for target, future in group.items():
+                result = results.get(target)
+                if result is None:
+                    result = LookupError(f"{sub_type} {target} missing from batch")
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                    # Callers may have given up; do not warn about the exception.
+                    future.exception()
+                else:
+                    future.set_result(result)
+        finally:
+            # A cancelled send must not leave its callers waiting forever.
+            for future in group.values():
+                if not future.done():
+                    future.cancel()
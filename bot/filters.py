@@ -0,0 +1,103 @@
+"""Compile subscription filters into item matchers."""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable
+
+
+def keyword_pattern(keywords: Iterable[str]) -> re.Pattern[str] | None:
+    """Return one regex matching any of *keywords* in lowercased text.
+
+    The keywords are merged into a trie first, so a shared prefix is only
+    tried once per position: ``rope``, ``ropes`` and ``rose`` become
+    ``ro(?:pe(?:s)?|se)``.
+    """
+    trie: Dict[str, Any] = {}
+    for word in {k.lower() for k in keywords if k}:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    if not trie:
+        return None
+    return re.compile(_trie_regex(trie))
+
+
+def _trie_regex(node: Dict[str, Any]) -> str:
+    branches = [
+        re.escape(c) + _trie_regex(child) for c, child in sorted(node.items()) if c
+    ]
+    if not branches:
+        return ""
+    if "" in node:
+        return "(?:" + "|".join(branches) + ")?"
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+@dataclass(frozen=True)
+class FilterMatcher:
+    """Decide whether an item passes a subscription's filters.
+
+    Field predicates run first as they are cheapest. Keywords are found with
+    one search per lowercased item value rather than a scan per keyword, so
+    no haystack is built and a keyword never spans two values. Lowercasing
+    a value is cheaper than searching it with ``re.IGNORECASE``.
+    """
+
+    keywords: re.Pattern[str] | None = None
+    city: str | None = None
+    min_attendees: int | None = None
+
+    def __call__(self, item: Dict[str, Any]) -> bool:
+        if self.city is not None and str(item.get("city") or "").lower() != self.city:
+            return False
+        if self.min_attendees is not None:
+            try:
+                attendees = int(item.get("attendees") or 0)
+            except (TypeError, ValueError):
+                return False
+            if attendees < self.min_attendees:
+                return False
+        if self.keywords is not None:
+            search = self.keywords.search
+            return any(
+                search((v if isinstance(v, str) else str(v)).lower())
+                for v in item.values()
+            )
+        return True
+
+
+def compile_filters(filters: Dict[str, Any]) -> FilterMatcher | None:
+    """Build the matcher of *filters*, or ``None`` if they filter nothing.
+
+    Supported filters: keywords (list or str), city (str), min_attendees (int).
+    """
+    keywords = filters.get("keywords") or []
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    city = filters.get("city")
+    min_attendees = filters.get("min_attendees")
+    matcher = FilterMatcher(
+        keyword_pattern(str(k) for k in keywords),
+        str(city).lower() if city else None,
+        min_attendees if isinstance(min_attendees, int) else None,
+    )
+    return None if matcher == FilterMatcher() else matcher
+
+
+@lru_cache(maxsize=4096)
+def _compile_spec(spec: str) -> FilterMatcher | None:
+    return compile_filters(json.loads(spec))
+
+
+def matcher_for(filters: Dict[str, Any] | None) -> FilterMatcher | None:
+    """Return the matcher of *filters*, compiled once per distinct filter set."""
+    if not filters:
+        return None
+    return _compile_spec(json.dumps(filters, sort_keys=True, default=str))
@@ -1,5 +1,7 @@
 import asyncio
 import base64
+import contextlib
+import functools
 import hashlib
 import hmac
 import json
@@ -8,13 +10,20 @@ import time
 import logging
 import random
 import re
+import weakref
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, Optional, Callable, Awaitable, cast
+from typing import Any, Dict, Optional, Callable, Awaitable, Tuple, TypeVar, cast
 
 import discord
 import discord.abc
-from aiohttp import web, ClientError, ClientSession
+from aiohttp import (
+    web,
+    ClientError,
+    ClientResponseError,
+    ClientSession,
+    ServerTimeoutError,
+)
 from jinja2 import Environment, FileSystemLoader
 from urllib.parse import urlencode
 from apscheduler.schedulers.asyncio import AsyncIOScheduler  # type: ignore[import-untyped]
@@ -36,15 +45,21 @@ from . import (
     models,
     tasks,
     birthday,
+    feeds,
+    delivery,
+    digest,
     polling,
     moderation,
     welcome,
 )
-from .circuit_breaker import CircuitBreaker, CircuitBreakerOpen
+from .circuit_breaker import CircuitBreaker, CircuitBreakerOpen, CircuitBreakerRegistry
+from .concurrency import AIMDLimiter, adapter_concurrency_limit
+from .filters import matcher_for
 from .utils import get_correlation_id, new_correlation_id
 from .audit import log_action
 from .config import get_channel_config, get_guild_config, load_config, save_config
-from .rate_limit import TokenBucket
+from .poll_scheduler import PollScheduler
+from .rate_limit import LearnedRateLimits, Priority, TokenBucket, discord_trace
 from .telegram_bridge import TelegramBridge
 
 
@@ -52,13 +67,14 @@ TOKEN = ""
 ADAPTER_BASE_URL = "https://adapter:8000"
 TELEGRAM_API_ID: Optional[str] = None
 TELEGRAM_API_HASH: Optional[str] = None
-bot: Optional["FLBot"] = None
+bot: "FLBot"
 MGMT_PORT = 8000
 SESSION_SECRET = ""
 ADMIN_IDS: set[str] = set()
 DISCORD_CLIENT_ID = ""
 DISCORD_CLIENT_SECRET = ""
 OAUTH_REDIRECT_URI = ""
+INGEST_TOKEN = ""
 
 
 class JsonFormatter(logging.Formatter):
@@ -133,7 +149,8 @@ async def auth_middleware(
         data = verify_session(cookie)
         if data and str(data.get("id")) in ADMIN_IDS:
             request["user"] = data
-    if request.path in {"/login", "/oauth/callback", "/metrics", "/ready"}:
+    # /ingest authenticates producers with its own bearer token.
+    if request.path in {"/login", "/oauth/callback", "/metrics", "/ready", "/ingest"}:
         return await handler(request)
     if not request["user"]:
         raise web.HTTPFound("/login")
@@ -147,6 +164,9 @@ poll_cycle = Summary("poll_cycle_seconds", "Duration of poll cycles")
 duplicates_suppressed = Counter(
     "duplicates_suppressed_total", "Duplicate messages not relayed"
 )
+items_filtered = Counter(
+    "items_filtered_total", "Items dropped by subscription filters"
+)
 adapter_tokens = Gauge(
     "adapter_rate_limit_tokens", "Tokens currently available for adapter"
 )
@@ -162,37 +182,161 @@ adapter_latency = Histogram(
 )
 bot_latency = Histogram("bot_request_latency_seconds", "Discord request latency")
 queue_depth = Gauge("internal_queue_depth", "Scheduled job count")
+items_pushed = Counter("items_pushed_total", "Items received on the ingestion route")
+relay_embeds = Histogram(
+    "discord_embeds_per_message",
+    "Relayed items per Discord message; count/sum is messages per item",
+    buckets=(1, 2, 3, 4, 5, 6, 7, 8, 9, 10),
+)
 
-adapter_bucket = TokenBucket(5, 1)
-bot_bucket = TokenBucket(5, 1)
+adapter_bucket = TokenBucket(5, 1, name="adapter")
+# Discord's global limit of 50 requests per second. Relays queue at low priority
+# so interaction responses are not stuck behind them.
+bot_bucket = TokenBucket(50, 50, name="bot")
+# Per-channel message budgets learned from Discord's rate-limit headers.
+channel_limits = LearnedRateLimits(5, 1, name="bot_channel")
 
 breaker_state = Gauge(
     "adapter_circuit_breaker_state",
-    "Adapter circuit breaker state (0=closed,1=open)",
+    "Adapter circuit breaker state (0=closed,1=open,2=half_open)",
+    ["account", "endpoint"],
 )
+BREAKER_STATES = {"closed": 0, "open": 1, "half_open": 2}
 MAX_FAILURES = 3
 PAUSE_COOLDOWN = 300
-adapter_breaker = CircuitBreaker(MAX_FAILURES, PAUSE_COOLDOWN)
+# Probe calls let through while a breaker is half open.
+HALF_OPEN_PROBES = 1
+# Seconds before the earliest first poll after startup.
+STARTUP_DELAY = 1
+# Seconds between writes of changed backoff state to the database.
+STATE_FLUSH_INTERVAL = 30
+# Seconds between checks for digests whose window has ended.
+DIGEST_CHECK_INTERVAL = 60
+# Seconds buffered digest items wait for a missing channel before they are dropped.
+DIGEST_ORPHAN_AGE = 24 * 3600
+# Most adapter breakers kept; the least recently used closed ones go first.
+MAX_BREAKERS = 1024
+# Breakers are keyed by (account_id, endpoint).
+BreakerKey = Tuple[Optional[int], str]
+
+
+def unpublish_breaker(key: BreakerKey) -> None:
+    account, endpoint = key
+    breaker_state.remove("none" if account is None else str(account), endpoint)
+
+
+adapter_breakers: CircuitBreakerRegistry[BreakerKey] = CircuitBreakerRegistry(
+    MAX_FAILURES,
+    PAUSE_COOLDOWN,
+    HALF_OPEN_PROBES,
+    max_breakers=MAX_BREAKERS,
+    on_evict=unpublish_breaker,
+)
+adapter_concurrency = AIMDLimiter(gauge=adapter_concurrency_limit)
+feed_coalescer = feeds.FeedCoalescer()
+interval_controller = feeds.IntervalController()
+channel_sender = delivery.ChannelSender()
+subscription_states = storage.SubscriptionStates()
+push_tracker = feeds.PushTracker()
+# Feed types read from streamed responses, and items relayed per chunk.
+stream_feeds: frozenset[str] = frozenset()
+STREAM_CHUNK = 200
+# Polls and pushes of one subscription go through the pipeline one at a time.
+subscription_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def publish_breaker(key: BreakerKey, breaker: CircuitBreaker) -> None:
+    account, endpoint = key
+    breaker_state.labels("none" if account is None else str(account), endpoint).set(
+        BREAKER_STATES[breaker.state]
+    )
 
 
-async def adapter_request(fn, *args, fallback=None, **kwargs):
+async def adapter_request(
+    fn, *args, fallback=None, endpoint=None, limited=True, **kwargs
+):
+    """Call *fn* through the breaker of its account and endpoint.
+
+    *endpoint* defaults to the function name. Unless *limited* is false the
+    call also takes a slot of the adaptive concurrency limit, and its latency
+    feeds the limit unless the response was reused from the cache or a 304.
+    Returns the result, or *fallback*, and whether the call succeeded.
+    """
+    key: BreakerKey = (
+        kwargs.get("account_id"),
+        endpoint or getattr(fn, "__name__", "adapter"),
+    )
+    breaker = adapter_breakers.get(key)
+    probe = breaker.state == "half_open"
     try:
-        adapter_breaker.before_call()
+        breaker.before_call()
     except CircuitBreakerOpen:
-        breaker_state.set(1)
+        publish_breaker(key, breaker)
         return fallback, False
+    publish_breaker(key, breaker)
     try:
-        result = await fn(*args, **kwargs)
-        adapter_breaker.record_success()
-        breaker_state.set(0)
-        return result, True
+        async with adapter_concurrency if limited else contextlib.nullcontext():
+            start = time.perf_counter()
+            try:
+                with adapter_client.track_request() as outcome:
+                    result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if limited and is_overload(exc):
+                    adapter_concurrency.on_overload()
+                adapter_errors.inc()
+                breaker.record_failure()
+                return fallback, False
+            # Cache hits and 304s would drag the latency baseline down.
+            if limited and not outcome.reused:
+                adapter_concurrency.on_success(time.perf_counter() - start)
+            breaker.record_success()
+            return result, True
     except asyncio.CancelledError:
+        if probe:
+            breaker.release()
         raise
-    except Exception:
-        adapter_errors.inc()
-        adapter_breaker.record_failure()
-        breaker_state.set(1 if adapter_breaker.is_open else 0)
-        return fallback, False
+    finally:
+        publish_breaker(key, breaker)
+
+
+async def fetch_feed_batch(
+    sub_type: str, target_ids: list[str], account_id: int | None, since: dict[str, int]
+) -> adapter_client.BatchResults:
+    """Send one batch of :data:`feed_batcher` under the adapter limits."""
+    await adapter_bucket.acquire()
+    adapter_tokens.set(adapter_bucket.get_tokens())
+    async with adapter_concurrency:
+        start = time.perf_counter()
+        try:
+            results = await adapter_client.fetch_batch(
+                ADAPTER_BASE_URL,
+                sub_type,
+                target_ids,
+                account_id=account_id,
+                since=since,
+            )
+        except Exception as exc:
+            if is_overload(exc):
+                adapter_concurrency.on_overload()
+            raise
+        adapter_concurrency.on_success(time.perf_counter() - start)
+    return results
+
+
+feed_batcher = feeds.FeedBatcher(fetch_feed_batch)
+
+
+def is_overload(exc: Exception) -> bool:
+    """Return whether *exc* means the adapter or FetLife is struggling."""
+    if isinstance(exc, (asyncio.TimeoutError, ServerTimeoutError)):
+        return True
+    return isinstance(exc, ClientResponseError) and (
+        exc.status >= 500 or exc.status == 429
+    )
 
 
 fl_group = app_commands.Group(name="fl", description="FetLife commands")
@@ -222,91 +366,230 @@ async def admin_rate_limit(interaction: discord.Interaction) -> bool:
     command_name = interaction.command.qualified_name if interaction.command else ""
     key = (interaction.guild_id or 0, command_name)
     mapping = bot.admin_cooldowns.get(key)
-    if not mapping or mapping._cooldown.rate != rate or mapping._cooldown.per != per:
+    cooldown = mapping._cooldown if mapping else None
+    if not mapping or not cooldown or cooldown.rate != rate or cooldown.per != per:
         mapping = commands.CooldownMapping.from_cooldown(
             rate, per, commands.BucketType.guild
         )
         bot.admin_cooldowns[key] = mapping
-    bucket = mapping.get_bucket(interaction)
+    bucket = cast(commands.Cooldown, mapping.get_bucket(interaction))
     retry_after = bucket.update_rate_limit()
     if retry_after:
-        raise app_commands.CommandOnCooldown(mapping._cooldown, retry_after)
+        raise app_commands.CommandOnCooldown(
+            cast(commands.Cooldown, mapping._cooldown), retry_after
+        )
     return True
 
 
-def admin_cooldown() -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+CommandT = TypeVar("CommandT")
+
+
+def admin_cooldown() -> Callable[[CommandT], CommandT]:
     return app_commands.check(admin_rate_limit)
 
 
-async def poll_adapter(db, sub_id: int, data: Dict[str, Any]):
-    """Poll adapter with jitter and backoff, caching cursor and deduping."""
-    new_correlation_id()
-    cycle_start = time.perf_counter()
-    queue_depth.set(len(bot.scheduler.get_jobs()))
-    await adapter_bucket.acquire()
-    adapter_tokens.set(adapter_bucket.get_tokens())
-    success = True
-    channel = None
+def build_embed(sub_type: str, item: Dict[str, Any]) -> discord.Embed:
+    """Render a relayed adapter item as a Discord embed."""
+    if sub_type == "attendees":
+        embed = discord.Embed(
+            title=item.get("nickname", ""),
+            description=item.get("comment") or "",
+        )
+        if item.get("status"):
+            embed.add_field(name="Status", value=item["status"])
+    elif sub_type == "messages":
+        embed = discord.Embed(description=item.get("text", ""))
+        if item.get("sender"):
+            embed.set_author(name=item["sender"])
+        if item.get("sent"):
+            embed.add_field(name="Sent", value=item["sent"])
+    else:
+        embed = discord.Embed(title=item.get("title", ""), url=item.get("link"))
+        if sub_type == "events" and item.get("time"):
+            embed.add_field(name="Start", value=item["time"])
+        if sub_type in ("writings", "group_posts") and item.get("published"):
+            embed.add_field(name="Published", value=item["published"])
+    return embed
+
+
+async def fetch_feed(
+    sub_type: str, target_id: str, account_id: int | None, since: int | None = None
+) -> tuple[list[dict[str, Any]], bool]:
+    """Fetch one adapter feed, returning its items and whether the call succeeded.
+
+    *since* asks the adapter for items after that high-watermark ID only.
+    """
+    if sub_type not in adapter_client.BATCH_TYPES:
+        # Batched feeds take one token per batch request instead.
+        await adapter_bucket.acquire()
+        adapter_tokens.set(adapter_bucket.get_tokens())
+    items: list[dict[str, Any]] = []
+    # One breaker per feed, so a bad target only pauses itself. The
+    # registry is bounded by MAX_BREAKERS, and so are the metric series.
+    endpoint = f"{sub_type}/{target_id}"
+    req_start = time.perf_counter()
+    if sub_type == "events":
+        items, ok = await adapter_request(
+            adapter_client.fetch_events,
+            ADAPTER_BASE_URL,
+            target_id,
+            account_id=account_id,
+            since=since,
+            endpoint=endpoint,
+            fallback=[],
+        )
+    elif sub_type in adapter_client.BATCH_TYPES:
+        items, ok = await adapter_request(
+            feed_batcher.fetch,
+            sub_type,
+            target_id,
+            account_id=account_id,
+            endpoint=endpoint,
+            since=since,
+            fallback=[],
+            limited=False,
+        )
+    elif sub_type == "attendees":
+        items, ok = await adapter_request(
+            adapter_client.fetch_attendees,
+            ADAPTER_BASE_URL,
+            target_id,
+            account_id=account_id,
+            endpoint=endpoint,
+            fallback=[],
+        )
+    elif sub_type == "messages":
+        items, ok = await adapter_request(
+            adapter_client.fetch_messages,
+            ADAPTER_BASE_URL,
+            account_id=account_id,
+            since=since,
+            endpoint=endpoint,
+            fallback=[],
+        )
+    else:
+        ok = False
+    if ok:
+        adapter_latency.observe(time.perf_counter() - req_start)
+        fetlife_requests.inc()
+    return items, ok
+
+
+def pause_channel_on_rate_limit(channel_id: int, exc: Exception) -> None:
+    """Hold back sends to *channel_id* if *exc* carries a Discord retry-after."""
+    retry_after: float | None = None
+    if isinstance(exc, discord.RateLimited):
+        retry_after = exc.retry_after
+    elif isinstance(exc, discord.HTTPException) and exc.status == 429:
+        header = getattr(exc.response, "headers", {}).get("Retry-After")
+        retry_after = float(header) if header else None
+    if retry_after is not None:
+        channel_limits.pause(channel_id, retry_after)
+
+
+async def relay_items(
+    channel: Any,
+    sub: models.Subscription,
+    items: list[Tuple[str, Dict[str, Any]]],
+    embeds: list[discord.Embed],
+    batch: storage.RelayBatch,
+) -> None:
+    """Send polled items to their channel in one message and mark them relayed."""
+    await channel_limits.acquire(sub.channel_id, priority=Priority.LOW)
+    await bot_bucket.acquire(priority=Priority.LOW)
+    bot_tokens.set(bot_bucket.get_tokens())
+    send_start = time.perf_counter()
     try:
-        sub = db.get(models.Subscription, sub_id)
-        if not sub:
-            raise RuntimeError("subscription missing")
-        channel = bot.get_channel(sub.channel_id)
-        last_seen, last_ids = storage.get_cursor(db, sub_id)
-        items: list[dict[str, Any]] = []
-        req_start = time.perf_counter()
-        if sub.type == "events":
-            items, ok = await adapter_request(
-                adapter_client.fetch_events,
-                ADAPTER_BASE_URL,
-                sub.target_id,
-                account_id=sub.account_id,
-                fallback=[],
-            )
-        elif sub.type == "writings":
-            items, ok = await adapter_request(
-                adapter_client.fetch_writings,
-                ADAPTER_BASE_URL,
-                sub.target_id,
-                account_id=sub.account_id,
-                fallback=[],
-            )
-        elif sub.type == "group_posts":
-            items, ok = await adapter_request(
-                adapter_client.fetch_group_posts,
-                ADAPTER_BASE_URL,
-                sub.target_id,
-                account_id=sub.account_id,
-                fallback=[],
-            )
-        elif sub.type == "attendees":
-            items, ok = await adapter_request(
-                adapter_client.fetch_attendees,
-                ADAPTER_BASE_URL,
-                sub.target_id,
-                account_id=sub.account_id,
-                fallback=[],
-            )
-        elif sub.type == "messages":
-            items, ok = await adapter_request(
-                adapter_client.fetch_messages,
-                ADAPTER_BASE_URL,
-                account_id=sub.account_id,
-                fallback=[],
-            )
+        messageable = cast(discord.abc.Messageable, channel)
+        if len(embeds) == 1:
+            await messageable.send(embed=embeds[0])
         else:
-            ok = False
-        if ok:
-            adapter_latency.observe(time.perf_counter() - req_start)
-            fetlife_requests.inc()
-        else:
-            success = False
-        new_ids: list[str] = []
+            await messageable.send(embeds=embeds)
+        messages_sent.inc()
+        relay_embeds.observe(len(embeds))
+    except Exception as exc:
+        bot_errors.inc()
+        pause_channel_on_rate_limit(cast(int, sub.channel_id), exc)
+        raise
+    finally:
+        bot_latency.observe(time.perf_counter() - send_start)
+    for item_id, item in items:
+        if sub.type == "messages" and bot.bridge:
+            try:
+                await bot.bridge.send_to_telegram(
+                    cast(int, sub.channel_id), item.get("text", "")
+                )
+            except Exception:  # pragma: no cover - bridge errors
+                logger.exception(
+                    "telegram forward failed",
+                    extra={"correlation_id": get_correlation_id()},
+                )
+        batch.add_relay(item_id)
+
+
+def subscription_lock(sub_id: int) -> asyncio.Lock:
+    """Return the lock serializing the relay pipeline of *sub_id*."""
+    lock = subscription_locks.get(sub_id)
+    if lock is None:
+        lock = subscription_locks[sub_id] = asyncio.Lock()
+    return lock
+
+
+async def relay_new_items(
+    db: Any,
+    sub: models.Subscription,
+    channel: Any,
+    items: list[Dict[str, Any]],
+    data: Dict[str, Any] | None = None,
+) -> storage.RelayBatch:
+    """Filter and dedupe *items*, send the new ones and persist them.
+
+    Items failing the subscription's filters are dropped before the
+    ``relay_log`` query, so they are neither sent nor recorded.
+
+    *data* is the poll state of the subscription; its ``since`` watermark
+    advances over the relayed items, even if a send fails. Pushed items come
+    without it, as they may skip older items the next poll still relays.
+
+    The dedupe query and the final write each use a short session scope on
+    *db*; no connection is held while sending to Discord.
+    """
+    sub_id = cast(int, sub.id)
+    since = data.get("since") if data is not None else None
+    handled: list[str] = []
+    matcher = matcher_for(cast(Optional[Dict[str, Any]], sub.filters_json))
+    if matcher is not None:
+        # Filtered items count as handled, so the watermark moves past them.
+        kept: list[Dict[str, Any]] = []
+        for item in items:
+            if matcher(item):
+                kept.append(item)
+            else:
+                handled.append(str(item.get("id")))
+        items_filtered.inc(len(items) - len(kept))
+        items = kept
+    unseen: set[str] = set()
+    if items:
+        async with storage.session_scope(db) as session:
+            unseen.update(
+                await storage.run(
+                    session,
+                    storage.filter_unrelayed,
+                    sub_id,
+                    [str(i.get("id")) for i in items],
+                )
+            )
+    batch = storage.RelayBatch(sub_id)
+    sendable = isinstance(channel, discord.abc.Messageable) or hasattr(channel, "send")
+    pending: list[Tuple[str, Dict[str, Any]]] = []
+    processed = False
+    try:
         for item in items:
             item_id = str(item.get("id"))
             if not item_id:
                 continue
-            if storage.has_relayed(db, sub_id, item_id):
+            if item_id not in unseen:
+                handled.append(item_id)
                 duplicates_suppressed.inc()
                 logger.info(
                     "duplicate",
@@ -317,6 +600,7 @@ async def poll_adapter(db, sub_id: int, data: Dict[str, Any]):
                     },
                 )
                 continue
+            unseen.discard(item_id)
             if sub.type == "events":
                 start_dt = None
                 if item.get("time"):
@@ -324,71 +608,214 @@ async def poll_adapter(db, sub_id: int, data: Dict[str, Any]):
                         start_dt = datetime.fromisoformat(item["time"])
                     except ValueError:
                         start_dt = None
-                storage.upsert_event(
-                    db,
+                batch.add_event(
                     item_id,
                     item.get("title", ""),
                     start_at=start_dt,
                     permalink=item.get("link"),
                 )
             elif sub.type == "attendees":
-                storage.upsert_profile(db, item_id, item.get("nickname", ""))
-                storage.upsert_rsvp(
-                    db,
-                    sub.target_id,
-                    item_id,
-                    item.get("status", ""),
+                batch.add_profile(item_id, item.get("nickname", ""))
+                batch.add_rsvp(
+                    cast(str, sub.target_id), item_id, item.get("status", "")
                 )
-            storage.record_relay(db, sub_id, item_id)
-            if isinstance(channel, discord.abc.Messageable) or hasattr(channel, "send"):
-                if sub.type == "attendees":
-                    embed = discord.Embed(
-                        title=item.get("nickname", ""),
-                        description=item.get("comment") or "",
+            if sub.digest:
+                # Committed with the relay log, so a restart neither
+                # loses nor re-buffers the item.
+                batch.add_digest(item_id, item)
+            elif sendable:
+                pending.append((item_id, item))
+            else:
+                batch.add_relay(item_id)
+        processed = True
+        sends: list[delivery.Send] = []
+        if pending:
+            async with storage.session_scope(db) as session:
+                settings = await storage.run(
+                    session, storage.get_channel_settings, sub.channel_id
+                )
+            embeds = [build_embed(cast(str, sub.type), i) for _, i in pending]
+            for group in delivery.pack_embeds(
+                [len(e) for e in embeds],
+                delivery.embeds_per_message(settings),
+            ):
+                sends.append(
+                    functools.partial(
+                        relay_items,
+                        channel,
+                        sub,
+                        pending[group.start : group.stop],
+                        embeds[group.start : group.stop],
+                        batch,
                     )
-                    if item.get("status"):
-                        embed.add_field(name="Status", value=item["status"])
-                else:
-                    if sub.type == "messages":
-                        embed = discord.Embed(description=item.get("text", ""))
-                        if item.get("sender"):
-                            embed.set_author(name=item["sender"])
-                        if item.get("sent"):
-                            embed.add_field(name="Sent", value=item["sent"])
-                    else:
-                        embed = discord.Embed(
-                            title=item.get("title", ""), url=item.get("link")
-                        )
-                        if sub.type == "events" and item.get("time"):
-                            embed.add_field(name="Start", value=item["time"])
-                        if sub.type in ("writings", "group_posts") and item.get(
-                            "published"
-                        ):
-                            embed.add_field(name="Published", value=item["published"])
-                await bot_bucket.acquire()
-                bot_tokens.set(bot_bucket.get_tokens())
-                send_start = time.perf_counter()
-                try:
-                    await cast(discord.abc.Messageable, channel).send(embed=embed)
-                    messages_sent.inc()
-                except Exception:
-                    bot_errors.inc()
-                    raise
-                finally:
-                    bot_latency.observe(time.perf_counter() - send_start)
-                if sub.type == "messages" and bot.bridge:
-                    try:
-                        await bot.bridge.send_to_telegram(
-                            sub.channel_id, item.get("text", "")
-                        )
-                    except Exception:  # pragma: no cover - bridge errors
-                        logger.exception(
-                            "telegram forward failed",
-                            extra={"correlation_id": get_correlation_id()},
-                        )
-            new_ids.append(item_id)
-        if new_ids:
-            storage.update_cursor(db, sub_id, datetime.utcnow(), new_ids)
+                )
+        # Sends to this channel keep their order; other channels
+        # deliver concurrently.
+        await channel_sender.deliver(sub.channel_id, sends)
+    finally:
+        watermark = None
+        if processed and data is not None and sub.type in feeds.WATERMARK_TYPES:
+            relayed = set(batch.relays)
+            watermark = feeds.next_watermark(
+                since,
+                handled + batch.relays,
+                [i for i, _ in pending if i not in relayed],
+            )
+        # Commit whatever was delivered, even if a later send failed.
+        async with storage.session_scope(db) as session:
+            await storage.run(
+                session,
+                storage.flush_relay_batch,
+                batch,
+                datetime.utcnow(),
+                watermark if watermark != since else None,
+            )
+        if watermark is not None and data is not None:
+            data["since"] = watermark
+    return batch
+
+
+def skip_below_watermark(
+    items: list[Dict[str, Any]], since: int | None
+) -> list[Dict[str, Any]]:
+    """Drop items at or below the *since* watermark before the dedupe query.
+
+    The adapter should not have returned them, but may ignore ``since``.
+    """
+    if since is None:
+        return items
+    fresh = [
+        i for i in items if (n := feeds.item_number(i.get("id"))) is None or n > since
+    ]
+    duplicates_suppressed.inc(len(items) - len(fresh))
+    return fresh
+
+
+async def relay_stream(
+    db: Any, sub: models.Subscription, channel: Any, data: Dict[str, Any]
+) -> Tuple[int, bool]:
+    """Relay a feed decoded item by item from a streamed adapter response.
+
+    Items go through :func:`relay_new_items` in chunks of ``STREAM_CHUNK``
+    while the body is still being read, so a poll holds one chunk at a time
+    however large the response. The watermark only moves once the whole
+    stream was relayed, as items may arrive in any order. Returns the number
+    of items relayed and whether the adapter call succeeded; relay errors
+    are raised.
+    """
+    await adapter_bucket.acquire()
+    adapter_tokens.set(adapter_bucket.get_tokens())
+    since = data.get("since") if sub.type in feeds.WATERMARK_TYPES else None
+    highest: int | None = None
+    relayed = 0
+    failed: list[Exception] = []
+
+    async def relay(chunk: list[Dict[str, Any]]) -> bool:
+        nonlocal highest, relayed
+        chunk = skip_below_watermark(chunk, since)
+        try:
+            async with subscription_lock(cast(int, sub.id)):
+                batch = await relay_new_items(db, sub, channel, chunk)
+        except Exception as exc:
+            failed.append(exc)
+            return False
+        relayed += len(batch.relays)
+        highest = feeds.next_watermark(highest, [str(i.get("id")) for i in chunk], [])
+        return True
+
+    async def consume(account_id: int | None) -> None:
+        stream = adapter_client.stream_feed(
+            ADAPTER_BASE_URL,
+            cast(str, sub.type),
+            cast(str, sub.target_id),
+            account_id=account_id,
+            since=since,
+        )
+        chunk: list[Dict[str, Any]] = []
+        async with contextlib.aclosing(stream):
+            async for item in stream:
+                chunk.append(item)
+                if len(chunk) >= STREAM_CHUNK:
+                    if not await relay(chunk):
+                        return
+                    chunk = []
+        if chunk:
+            await relay(chunk)
+
+    # Outside the adaptive concurrency limit: the request stays open while
+    # chunks are sent to Discord, which would read as adapter latency.
+    _, ok = await adapter_request(
+        consume,
+        account_id=sub.account_id,
+        endpoint=f"{sub.type}/{sub.target_id}",
+        limited=False,
+    )
+    if failed:
+        raise failed[0]
+    if ok:
+        fetlife_requests.inc()
+        if highest is not None and (since is None or highest > since):
+            async with storage.session_scope(db) as session:
+                await storage.run(
+                    session,
+                    storage.flush_relay_batch,
+                    storage.RelayBatch(cast(int, sub.id)),
+                    None,
+                    highest,
+                )
+            data["since"] = highest
+    return relayed, ok
+
+
+async def poll_adapter(db, sub_id: int, data: Dict[str, Any]):
+    """Poll adapter with jitter and backoff, caching cursor and deduping."""
+    new_correlation_id()
+    cycle_start = time.perf_counter()
+    queue_depth.set(bot.poller.depth)
+    success = True
+    channel = None
+    key: feeds.FeedKey | None = None
+    try:
+        # Sessions stay short: none is open during the fetch or the sends,
+        # so a slow adapter or Discord never holds a pooled connection.
+        async with storage.session_scope(db) as session:
+            sub = await storage.run(session, storage.get_subscription, sub_id)
+        if not sub:
+            raise RuntimeError("subscription missing")
+        sub_type = cast(str, sub.type)
+        target_id = cast(str, sub.target_id)
+        account_id = cast(Optional[int], sub.account_id)
+        channel = bot.get_channel(cast(int, sub.channel_id))
+        key = feeds.feed_key(sub_type, target_id, account_id)
+        since = data.get("since") if sub_type in feeds.WATERMARK_TYPES else None
+        version = None
+        if sub_type in stream_feeds:
+            relayed, ok = await relay_stream(db, sub, channel, data)
+        else:
+            items, ok = await feed_coalescer.fetch(
+                key,
+                sub_id,
+                lambda: fetch_feed(sub_type, target_id, account_id, since),
+                since=since,
+            )
+            version = getattr(items, "version", None)
+            if version is not None and version == data.get("version"):
+                # The adapter answered 304 for a page this subscription
+                # already processed: skip dedupe, persistence and sends.
+                items = []
+            items = skip_below_watermark(items, since)
+            async with subscription_lock(sub_id):
+                batch = await relay_new_items(db, sub, channel, items, data)
+            relayed = len(batch.relays)
+        if not ok:
+            success = False
+        else:
+            data["version"] = version
+            data["interval"], data["item_rate"] = interval_controller.update(
+                data.get("interval", interval_controller.min_interval),
+                data.get("item_rate"),
+                relayed,
+            )
     except ClientError as exc:  # pragma: no cover - network error path
         logger.error(
             "poll_http_error",
@@ -444,38 +871,211 @@ async def poll_adapter(db, sub_id: int, data: Dict[str, Any]):
         bot.sub_status[sub_id] = {
             "failures": failures,
             "paused_until": paused_until,
+            "interval": data.get("interval"),
         }
         run_date = datetime.utcfromtimestamp(paused_until)
     else:
         data.pop("paused_until", None)
         data["notified"] = False
-        bot.sub_status[sub_id] = {"failures": failures}
+        bot.sub_status[sub_id] = {
+            "failures": failures,
+            "interval": data.get("interval"),
+        }
         interval = data.get("interval", 60)
+        if key is not None:
+            # Pushed feeds are only polled to reconcile missed pushes.
+            interval = push_tracker.interval(key, interval)
         backoff = data.get("backoff", interval)
         if success:
             backoff = interval
         else:
-            backoff = min(backoff * 2, interval * 60)
+            # Cap failure backoff as before instead of scaling it with a long
+            # adaptive interval.
+            backoff = min(
+                backoff * 2, max(interval_controller.min_interval * 60, interval)
+            )
         jitter = random.uniform(0, interval * 0.1)
         run_in = backoff + jitter
         data["backoff"] = backoff
         run_date = datetime.utcnow() + timedelta(seconds=run_in)
 
-    bot.scheduler.add_job(
+    subscription_states.record(sub_id, data)
+    bot.poller.add_job(
         poll_adapter,
         args=[db, sub_id, data],
         id=str(sub_id),
         replace_existing=True,
         run_date=run_date,
     )
-    queue_depth.set(len(bot.scheduler.get_jobs()))
+    queue_depth.set(bot.poller.depth)
+
+
+def parse_push(feed: Any) -> Tuple[str, str, int | None, list[Any]]:
+    """Return type, target, account and items of one pushed feed.
+
+    Raises ``ValueError`` if *feed* is malformed.
+    """
+    if not isinstance(feed, dict):
+        raise ValueError("feed must be an object")
+    sub_type = feed.get("type")
+    if sub_type not in adapter_client.ITEM_SCHEMAS:
+        raise ValueError(f"unknown feed type {sub_type!r}")
+    items = feed.get("items")
+    if not isinstance(items, list):
+        raise ValueError("items must be a list")
+    account_id = feed.get("account_id")
+    if account_id is not None and not isinstance(account_id, int):
+        raise ValueError("account_id must be an integer")
+    return sub_type, str(feed.get("target_id", "")), account_id, items
+
+
+async def push_items(db, sub_id: int, items: list[Dict[str, Any]]) -> int:
+    """Run pushed *items* through the relay pipeline of one subscription."""
+    async with storage.session_scope(db) as session:
+        sub = await storage.run(session, storage.get_subscription, sub_id)
+    if not sub:
+        return 0
+    async with subscription_lock(sub_id):
+        channel = bot.get_channel(cast(int, sub.channel_id))
+        batch = await relay_new_items(db, sub, channel, items)
+    return len(batch.relays)
+
+
+async def ingest_feed(
+    db, sub_type: str, target_id: str, account_id: int | None, items: list[Any]
+) -> int:
+    """Relay items pushed for one feed to all of its subscriptions.
+
+    Marks the feed as pushed, so its polls slow down to reconciliation.
+    Returns the number of items relayed across subscriptions.
+    """
+    new_correlation_id()
+    key = feeds.feed_key(sub_type, target_id, account_id)
+    push_tracker.record(key)
+    items_pushed.inc(len(items))
+    valid = await adapter_client.validate_items(sub_type, items)
+    async with storage.session_scope(db) as session:
+        sub_ids = await storage.run(session, storage.list_feed_subscriptions, *key)
+    results = await asyncio.gather(
+        *(push_items(db, sub_id, valid) for sub_id in sub_ids),
+        return_exceptions=True,
+    )
+    relayed = 0
+    for sub_id, result in zip(sub_ids, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                "push_error",
+                extra={
+                    "sub_id": sub_id,
+                    "error": str(result),
+                    "correlation_id": get_correlation_id(),
+                },
+            )
+        else:
+            relayed += result
+    return relayed
+
+
+async def flush_subscription_states() -> None:
+    """Write changed backoff state of all subscriptions in one transaction."""
+    async with storage.session_scope(bot.sessions) as session:
+        await storage.run(session, subscription_states.flush)
+
+
+async def flush_digests(now: datetime | None = None) -> int:
+    """Send one summary per subscription whose digest window has ended.
+
+    Items are removed from the buffer only after their summary was sent, so
+    a failed send is retried on the next check. Items whose channel has been
+    gone for ``DIGEST_ORPHAN_AGE`` are dropped. Returns the digests sent.
+    """
+    now = now or datetime.utcnow()
+    # Sessions stay short: none is open while summaries wait on Discord.
+    async with storage.session_scope(bot.sessions) as session:
+        rows = await storage.run(session, storage.list_digest_items)
+    due: Dict[int, list[Tuple[int, Dict[str, Any], datetime]]] = {}
+    meta: Dict[int, Tuple[int, str]] = {}
+    for row_id, sub_id, channel_id, sub_type, schedule, payload, created in rows:
+        if schedule and created >= digest.window_start(schedule, now):
+            continue
+        due.setdefault(sub_id, []).append((row_id, payload, created))
+        meta[sub_id] = (channel_id, sub_type)
+    orphaned: list[int] = []
+    sent = 0
+    for sub_id, entries in due.items():
+        channel_id, sub_type = meta[sub_id]
+        channel = bot.get_channel(channel_id)
+        if not (
+            isinstance(channel, discord.abc.Messageable) or hasattr(channel, "send")
+        ):
+            # The channel may only be missing from the cache for now.
+            cutoff = now - timedelta(seconds=DIGEST_ORPHAN_AGE)
+            orphaned.extend(i for i, _, created in entries if created < cutoff)
+            continue
+        embed = digest.render(sub_type, [payload for _, payload, _ in entries])
+
+        async def send(
+            channel=channel,
+            channel_id=channel_id,
+            embed=embed,
+            count=len(entries),
+        ) -> None:
+            await channel_limits.acquire(channel_id, priority=Priority.LOW)
+            await bot_bucket.acquire(priority=Priority.LOW)
+            bot_tokens.set(bot_bucket.get_tokens())
+            send_start = time.perf_counter()
+            try:
+                await cast(discord.abc.Messageable, channel).send(embed=embed)
+                messages_sent.inc()
+                relay_embeds.observe(count)
+            except Exception as exc:
+                bot_errors.inc()
+                pause_channel_on_rate_limit(channel_id, exc)
+                raise
+            finally:
+                bot_latency.observe(time.perf_counter() - send_start)
+
+        try:
+            await channel_sender.deliver(channel_id, [send])
+        except Exception as exc:
+            logger.error(
+                "digest_send_failed",
+                extra={
+                    "sub_id": sub_id,
+                    "error": str(exc),
+                    "correlation_id": get_correlation_id(),
+                },
+            )
+            continue
+        async with storage.session_scope(bot.sessions) as session:
+            await storage.run(
+                session, storage.delete_digest_items, [i for i, _, _ in entries]
+            )
+        sent += 1
+    if orphaned:
+        logger.warning("digest_items_dropped", extra={"count": len(orphaned)})
+        async with storage.session_scope(bot.sessions) as session:
+            await storage.run(session, storage.delete_digest_items, orphaned)
+    return sent
 
 
 class FLBot(commands.Bot):
     def __init__(self) -> None:
         intents = discord.Intents.default()
-        super().__init__(command_prefix="/", intents=intents)
-        self.db = storage.init_db()
+        super().__init__(
+            command_prefix="/",
+            intents=intents,
+            http_trace=discord_trace(channel_limits, bot_bucket),
+        )
+        # One session per task: each interaction, event, HTTP request and
+        # scheduled job gets its own unit of work.
+        self.db = storage.init_scoped_db()
+        # Async session factory for the hot paths: poll cycles, reaction
+        # handlers and the management app.
+        self.sessions = storage.init_async_db()
+        # Subscription polls run on a heap scheduler; APScheduler keeps the
+        # cron-style jobs.
+        self.poller = PollScheduler()
         self.scheduler = AsyncIOScheduler()
         self.config = load_config()
         self.bridge: Optional[TelegramBridge] = None
@@ -490,30 +1090,76 @@ class FLBot(commands.Bot):
         self.sub_status: Dict[int, Dict[str, Any]] = {}
         self.admin_cooldowns: Dict[tuple[int, str], commands.CooldownMapping] = {}
 
+    def schedule_subscriptions(self) -> Tuple[float, int]:
+        """Schedule every subscription's first poll, spread over its interval.
+
+        Returns the estimated time until every feed has been polled once and
+        the peak number of polls waiting on the adapter during startup.
+        """
+        now = datetime.utcnow()
+        starts: Dict[feeds.FeedKey, float] = {}
+        subs = storage.list_all_subscriptions(self.db)
+        states = subscription_states.load(self.db)
+        for sub_id, sub_type, target_id, account_id, watermark in subs:
+            data: Dict[str, Any] = {
+                "interval": interval_controller.min_interval,
+                "type": sub_type,
+            }
+            data.update(
+                (k, v) for k, v in states.get(sub_id, {}).items() if v is not None
+            )
+            if watermark is not None:
+                data["since"] = watermark
+            key = feeds.feed_key(sub_type, target_id, account_id)
+            delay = STARTUP_DELAY + feeds.phase_offset(key, data["interval"])
+            if sub_id in states:
+                self.sub_status[sub_id] = {
+                    "failures": data.get("failures", 0),
+                    "paused_until": data.get("paused_until"),
+                    "interval": data["interval"],
+                }
+            if data.get("paused_until"):
+                # Stay paused across restarts instead of retrying right away.
+                delay = max(delay, data["paused_until"] - time.time())
+            else:
+                starts[key] = delay
+            self.poller.add_job(
+                poll_adapter,
+                args=[self.sessions, sub_id, data],
+                id=str(sub_id),
+                replace_existing=True,
+                run_date=now + timedelta(seconds=delay),
+            )
+        steady, peak = feeds.stagger_report(
+            starts.values(), adapter_bucket.capacity, adapter_bucket.refill_rate
+        )
+        logger.info(
+            "startup_schedule",
+            extra={
+                "subscriptions": len(subs),
+                "feeds": len(starts),
+                "steady_state_seconds": round(steady, 1),
+                "peak_adapter_concurrency": peak,
+                "correlation_id": get_correlation_id(),
+            },
+        )
+        return steady, peak
+
     async def setup_hook(self) -> None:
-        channels = [c.id for c in self.db.query(models.Channel.id).all()]
-        for channel_id in channels:
-            for sub_id, sub_type, _target, _acct in storage.list_subscriptions(
-                self.db, channel_id
-            ):
-                self.scheduler.add_job(
-                    poll_adapter,
-                    args=[
-                        self.db,
-                        sub_id,
-                        {"interval": 60, "type": sub_type},
-                    ],
-                    id=str(sub_id),
-                    replace_existing=True,
-                    run_date=datetime.utcnow() + timedelta(seconds=1),
-                )
+        self.schedule_subscriptions()
+        self.scheduler.add_job(
+            flush_subscription_states, "interval", seconds=STATE_FLUSH_INTERVAL
+        )
+        self.scheduler.add_job(flush_digests, "interval", seconds=DIGEST_CHECK_INTERVAL)
         self.tree.add_command(birthday.birthday_group)
         self.tree.add_command(poll_group)
         self.tree.add_command(mod_group)
         self.tree.add_command(welcome_group)
         birthday.schedule(self)
         self.scheduler.start()
+        self.poller.start()
         self.loop.create_task(tasks.delete_expired_messages(self))
+        self.loop.create_task(tasks.monitor_event_loop_lag())
 
 
 bot = FLBot()
@@ -533,7 +1179,7 @@ def main(require_env: bool = True) -> FLBot:
         raise SystemExit(
             f"Missing required environment variables: {', '.join(missing)}"
         )
-    global TOKEN, ADAPTER_BASE_URL, TELEGRAM_API_ID, TELEGRAM_API_HASH, MGMT_PORT, SESSION_SECRET, ADMIN_IDS, DISCORD_CLIENT_ID, DISCORD_CLIENT_SECRET, OAUTH_REDIRECT_URI
+    global TOKEN, ADAPTER_BASE_URL, TELEGRAM_API_ID, TELEGRAM_API_HASH, MGMT_PORT, SESSION_SECRET, ADMIN_IDS, DISCORD_CLIENT_ID, DISCORD_CLIENT_SECRET, OAUTH_REDIRECT_URI, INGEST_TOKEN
     TOKEN = os.getenv("DISCORD_TOKEN", "")
     ADAPTER_BASE_URL = os.getenv("ADAPTER_BASE_URL", ADAPTER_BASE_URL)
     if not os.getenv("MOCK_ADAPTER") and not ADAPTER_BASE_URL.startswith("https://"):
@@ -546,6 +1192,43 @@ def main(require_env: bool = True) -> FLBot:
     DISCORD_CLIENT_ID = os.getenv("DISCORD_CLIENT_ID", "")
     DISCORD_CLIENT_SECRET = os.getenv("DISCORD_CLIENT_SECRET", "")
     OAUTH_REDIRECT_URI = os.getenv("OAUTH_REDIRECT_URI", "")
+    INGEST_TOKEN = os.getenv("INGEST_TOKEN", "")
+    cache_ttls = os.getenv("ADAPTER_CACHE_TTLS")
+    adapter_client.configure_cache(
+        adapter_client.parse_cache_ttls(cache_ttls) if cache_ttls else None,
+        max_entries=int(os.getenv("ADAPTER_CACHE_MAX_ENTRIES", "1024")),
+        max_bytes=int(os.getenv("ADAPTER_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+    )
+    adapter_client.configure_validation(
+        int(os.getenv("ADAPTER_VALIDATION_THREAD_MIN_ITEMS", "0"))
+    )
+    global interval_controller, channel_sender, adapter_concurrency, push_tracker
+    global stream_feeds, STREAM_CHUNK
+    adapter_concurrency = AIMDLimiter(
+        initial=int(os.getenv("ADAPTER_CONCURRENCY_INITIAL", "4")),
+        max_limit=int(os.getenv("ADAPTER_CONCURRENCY_MAX", "32")),
+        gauge=adapter_concurrency_limit,
+    )
+    channel_sender = delivery.ChannelSender(
+        int(os.getenv("DISCORD_SEND_CONCURRENCY", "8"))
+    )
+    interval_controller = feeds.IntervalController(
+        min_interval=int(os.getenv("POLL_INTERVAL_MIN", "60")),
+        max_interval=int(os.getenv("POLL_INTERVAL_MAX", "3600")),
+    )
+    push_tracker = feeds.PushTracker(float(os.getenv("PUSH_RECONCILE_INTERVAL", "900")))
+    stream_feeds = frozenset(
+        t
+        for t in os.getenv("ADAPTER_STREAM_FEEDS", "").split(",")
+        if t in adapter_client.ITEM_SCHEMAS
+    )
+    STREAM_CHUNK = max(1, int(os.getenv("ADAPTER_STREAM_CHUNK", str(STREAM_CHUNK))))
+    feed_coalescer.window = float(os.getenv("FEED_COALESCE_WINDOW", "30"))
+    feed_batcher.window = float(os.getenv("ADAPTER_BATCH_WINDOW", "0.5"))
+    feed_batcher.max_size = max(
+        1,
+        min(adapter_client.MAX_BATCH_SIZE, int(os.getenv("ADAPTER_BATCH_SIZE", "25"))),
+    )
     return bot
 
 
@@ -882,9 +1565,16 @@ async def fl_subscribe(
         account_id=account,
     )
     sub = bot.db.get(models.Subscription, sub_id)
-    bot.scheduler.add_job(
+    bot.poller.add_job(
         poll_adapter,
-        args=[bot.db, sub_id, {"interval": 60, "type": sub.type if sub else sub_type}],
+        args=[
+            bot.sessions,
+            sub_id,
+            {
+                "interval": interval_controller.min_interval,
+                "type": sub.type if sub else sub_type,
+            },
+        ],
         id=str(sub_id),
     )
     await bot_bucket.acquire()
@@ -921,7 +1611,7 @@ async def fl_unsubscribe(interaction: discord.Interaction, sub_id: int) -> None:
         return
     storage.remove_subscription(bot.db, sub_id, channel_id)
     try:
-        bot.scheduler.remove_job(str(sub_id))
+        bot.poller.remove_job(str(sub_id))
     except Exception:
         pass
     await bot_bucket.acquire()
@@ -929,6 +1619,42 @@ async def fl_unsubscribe(interaction: discord.Interaction, sub_id: int) -> None:
     await interaction.response.send_message(f"Unsubscribed {sub_id}")
 
 
+@fl_group.command(name="digest", description="Summarize a subscription periodically")
+@app_commands.describe(
+    sub_id="Subscription ID",
+    schedule="`15m`/`2h` windows, `HH:MM` daily (UTC), or `off`",
+)
+@log_action("digest", target_param="sub_id")
+async def fl_digest(
+    interaction: discord.Interaction, sub_id: int, schedule: str
+) -> None:
+    channel_id = interaction.channel_id
+    if channel_id is None:
+        await interaction.response.send_message("Channel not found")
+        return
+    spec: str | None = None
+    if schedule.strip().lower() != "off":
+        try:
+            spec = digest.parse_window(schedule)
+        except ValueError:
+            await bot_bucket.acquire()
+            bot_tokens.set(bot_bucket.get_tokens())
+            await interaction.response.send_message(
+                "Schedule must look like 15m, 2h, 09:00 or off"
+            )
+            return
+    if not storage.set_subscription_digest(bot.db, sub_id, channel_id, spec):
+        msg = f"Subscription {sub_id} not found"
+    elif spec:
+        when = f"daily at {spec} UTC" if ":" in spec else f"every {spec}"
+        msg = f"Subscription {sub_id} now posts a digest {when}"
+    else:
+        msg = f"Subscription {sub_id} now posts items as they arrive"
+    await bot_bucket.acquire()
+    bot_tokens.set(bot_bucket.get_tokens())
+    await interaction.response.send_message(msg)
+
+
 @fl_group.command(name="test", description="Preview an embed")
 @log_action("test", target_param="sub_id")
 async def fl_test(interaction: discord.Interaction, sub_id: int) -> None:
@@ -978,16 +1704,20 @@ async def fl_health(
     interaction: discord.Interaction, resume: int | None = None
 ) -> None:
     if resume is not None:
-        job = bot.scheduler.get_job(str(resume))
+        job = bot.poller.get_job(str(resume))
         if job:
             data = job.args[2]
             data["failures"] = 0
             data.pop("paused_until", None)
             data["notified"] = False
-            bot.sub_status[resume] = {"failures": 0}
-            bot.scheduler.add_job(
+            bot.sub_status[resume] = {
+                "failures": 0,
+                "interval": data.get("interval"),
+            }
+            subscription_states.record(resume, data)
+            bot.poller.add_job(
                 poll_adapter,
-                args=[bot.db, resume, data],
+                args=[bot.sessions, resume, data],
                 id=str(resume),
                 replace_existing=True,
                 run_date=datetime.utcnow() + timedelta(seconds=1),
@@ -996,7 +1726,7 @@ async def fl_health(
         else:
             msg = f"Subscription {resume} not found"
     else:
-        depth = len(bot.scheduler.get_jobs())
+        depth = bot.poller.depth
         last = (
             datetime.utcfromtimestamp(bot.last_poll).isoformat()
             if bot.last_poll
@@ -1005,6 +1735,8 @@ async def fl_health(
         status_lines = []
         for sid, s in bot.sub_status.items():
             line = f"{sid}: {s['failures']} fails"
+            if s.get("interval"):
+                line += f", every {s['interval']}s"
             if s.get("paused_until"):
                 until = datetime.utcfromtimestamp(s["paused_until"]).isoformat()
                 line += f", paused until {until}"
@@ -1299,7 +2031,7 @@ async def poll_create(
         if duration and duration > 0
         else None
     )
-    db = storage.init_db()
+    db = storage.get_session()
     poll = polling.create_poll(
         db,
         question,
@@ -1327,7 +2059,7 @@ async def poll_create(
                 self.idx = idx
 
             async def callback(self, btn_inter: discord.Interaction) -> None:
-                dbi = storage.init_db()
+                dbi = storage.get_session()
                 try:
                     polling.record_vote(dbi, poll.id, btn_inter.user.id, self.idx)
                 finally:
@@ -1342,7 +2074,7 @@ async def poll_create(
 
         view = PollView()
         await msg.edit(view=view)
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         polling.set_message(db, poll.id, msg.id)
     finally:
@@ -1354,7 +2086,7 @@ async def poll_create(
 
 @poll_group.command(name="close", description="Close a poll")
 async def poll_close(interaction: discord.Interaction, poll_id: int) -> None:
-    db = storage.init_db()
+    db = storage.get_session()
     poll = db.get(polling.Poll, poll_id)
     if not poll:
         db.close()
@@ -1365,7 +2097,9 @@ async def poll_close(interaction: discord.Interaction, poll_id: int) -> None:
     channel = bot.get_channel(poll.channel_id)
     if hasattr(channel, "fetch_message") and poll.message_id:
         try:
-            msg = await channel.fetch_message(poll.message_id)
+            msg = await cast(discord.abc.Messageable, channel).fetch_message(
+                poll.message_id
+            )
             await msg.edit(view=None)
         except Exception:
             pass
@@ -1374,7 +2108,7 @@ async def poll_close(interaction: discord.Interaction, poll_id: int) -> None:
 
 @poll_group.command(name="results", description="Show poll results")
 async def poll_results_cmd(interaction: discord.Interaction, poll_id: int) -> None:
-    db = storage.init_db()
+    db = storage.get_session()
     results = polling.poll_results(db, poll_id)
     db.close()
     if not results:
@@ -1386,7 +2120,7 @@ async def poll_results_cmd(interaction: discord.Interaction, poll_id: int) -> No
 
 @poll_group.command(name="list", description="List active polls")
 async def poll_list(interaction: discord.Interaction) -> None:
-    db = storage.init_db()
+    db = storage.get_session()
     polls = polling.list_polls(db)
     db.close()
     if not polls:
@@ -1412,7 +2146,7 @@ async def mod_warn(
             "Moderate Members permission required", ephemeral=True
         )
         return
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         moderation.add_infraction(
             db,
@@ -1427,7 +2161,7 @@ async def mod_warn(
         db.close()
     if escalate == moderation.InfractionType.MUTE:
         await user.timeout(timedelta(minutes=10), reason="Auto escalation")
-        db2 = storage.init_db()
+        db2 = storage.get_session()
         try:
             moderation.add_infraction(
                 db2,
@@ -1467,7 +2201,7 @@ async def mod_mute(
         )
         return
     await user.timeout(timedelta(minutes=minutes), reason=reason)
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         moderation.add_infraction(
             db,
@@ -1495,7 +2229,7 @@ async def mod_kick(
     reason: str | None = None,
 ) -> None:
     await interaction.guild.kick(user, reason=reason)
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         moderation.add_infraction(
             db,
@@ -1522,7 +2256,7 @@ async def mod_ban(
     reason: str | None = None,
 ) -> None:
     await interaction.guild.ban(user, reason=reason)
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         moderation.add_infraction(
             db,
@@ -1555,7 +2289,7 @@ async def mod_timeout(
         await interaction.response.send_message("minutes must be > 0", ephemeral=True)
         return
     await user.timeout(timedelta(minutes=minutes), reason=reason)
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         moderation.add_infraction(
             db,
@@ -1578,7 +2312,7 @@ async def mod_timeout(
 @app_commands.default_permissions(moderate_members=True)
 @log_action("modlog", target_param="user")
 async def mod_modlog(interaction: discord.Interaction, user: discord.Member) -> None:
-    db = storage.init_db()
+    db = storage.get_session()
     try:
         rows = moderation.list_infractions(db, interaction.guild_id, user.id)
     finally:
@@ -1620,7 +2354,10 @@ async def mod_purge(
 
 @bot.event
 async def on_raw_reaction_add(payload: discord.RawReactionActionEvent) -> None:
-    info = storage.get_reaction_role(bot.db, payload.message_id, str(payload.emoji))
+    async with storage.session_scope(bot.sessions) as session:
+        info = await storage.run(
+            session, storage.get_reaction_role, payload.message_id, str(payload.emoji)
+        )
     if not info or payload.guild_id != info[1]:
         return
     guild = bot.get_guild(info[1])
@@ -1628,7 +2365,7 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent) -> None:
         return
     role = guild.get_role(info[0])
     member = guild.get_member(payload.user_id) if role else None
-    if member is None:
+    if role is None or member is None:
         return
     await bot_bucket.acquire()
     bot_tokens.set(bot_bucket.get_tokens())
@@ -1637,7 +2374,10 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent) -> None:
 
 @bot.event
 async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent) -> None:
-    info = storage.get_reaction_role(bot.db, payload.message_id, str(payload.emoji))
+    async with storage.session_scope(bot.sessions) as session:
+        info = await storage.run(
+            session, storage.get_reaction_role, payload.message_id, str(payload.emoji)
+        )
     if not info or payload.guild_id != info[1]:
         return
     guild = bot.get_guild(info[1])
@@ -1645,7 +2385,7 @@ async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent) -> Non
         return
     role = guild.get_role(info[0])
     member = guild.get_member(payload.user_id) if role else None
-    if member is None:
+    if role is None or member is None:
         return
     await bot_bucket.acquire()
     bot_tokens.set(bot_bucket.get_tokens())
@@ -1656,25 +2396,21 @@ async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent) -> Non
 async def on_reaction_add(reaction: discord.Reaction, user: discord.User) -> None:
     if user.bot:
         return
-    db = storage.init_db()
-    try:
-        poll = (
-            db.query(polling.Poll)
-            .filter_by(message_id=reaction.message.id, closed=False)
-            .first()
-        )
-        if not poll:
-            return
-        choice = (
-            0
-            if str(reaction.emoji) == "👍"
-            else 1 if str(reaction.emoji) == "👎" else None
+    choice = (
+        0 if str(reaction.emoji) == "👍" else 1 if str(reaction.emoji) == "👎" else None
+    )
+    if choice is None:
+        return
+    async with storage.session_scope(bot.sessions) as session:
+        await storage.run(
+            session, _record_reaction_vote, reaction.message.id, user.id, choice
         )
-        if choice is None:
-            return
-        polling.record_vote(db, poll.id, user.id, choice)
-    finally:
-        db.close()
+
+
+def _record_reaction_vote(db, message_id: int, user_id: int, choice: int) -> None:
+    poll = db.query(polling.Poll).filter_by(message_id=message_id, closed=False).first()
+    if poll:
+        polling.record_vote(db, poll.id, user_id, choice)
 
 
 async def login(request: web.Request) -> web.Response:
@@ -1740,8 +2476,18 @@ async def ready_handler(request: web.Request) -> web.Response:
     return web.Response(status=503, text="not ready")
 
 
-def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
+def create_management_app(
+    db,
+    breakers: CircuitBreakerRegistry[BreakerKey],
+    sessions: storage.Database | None = None,
+) -> web.Application:
+    """Build the management app.
+
+    Routes that only touch the database run on *sessions* when given, one
+    session per request; moderation routes keep using the sync *db*.
+    """
     app = web.Application(middlewares=[auth_middleware])
+    store = sessions if sessions is not None else db
     templates = Environment(
         loader=FileSystemLoader(Path(__file__).parent / "templates"),
         autoescape=True,
@@ -1753,15 +2499,37 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
             content_type="text/html",
         )
 
+    async def query(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        async with storage.session_scope(store) as session:
+            return await storage.run(session, fn, *args, **kwargs)
+
+    def breaker_rows() -> list[dict[str, Any]]:
+        return [
+            {
+                "account": account,
+                "endpoint": endpoint,
+                "state": breaker.state,
+                "failures": breaker.failures,
+            }
+            for (account, endpoint), breaker in breakers.items()
+        ]
+
+    def overall_state(rows: list[dict[str, Any]]) -> str:
+        states = {row["state"] for row in rows}
+        for state in ("open", "half_open"):
+            if state in states:
+                return state
+        return "closed"
+
     async def index(request: web.Request) -> web.Response:
-        state = "open" if breaker.is_open else "closed"
-        return render("index.html", breaker_state=state)
+        rows = breaker_rows()
+        return render("index.html", breaker_state=overall_state(rows), breakers=rows)
 
     async def health_page(request: web.Request) -> web.Response:
         return render("health.html")
 
     async def health_status(request: web.Request) -> web.Response:
-        depth = len(bot.scheduler.get_jobs())
+        depth = bot.poller.depth
         last = (
             datetime.utcfromtimestamp(bot.last_poll).isoformat()
             if bot.last_poll
@@ -1770,18 +2538,24 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
         status_lines = []
         for sid, s in bot.sub_status.items():
             line = f"{sid}: {s['failures']} fails"
+            if s.get("interval"):
+                line += f", every {s['interval']}s"
             if s.get("paused_until"):
                 until = datetime.utcfromtimestamp(s["paused_until"]).isoformat()
                 line += f", paused until {until}"
             status_lines.append(line)
         status = "; ".join(status_lines) if status_lines else "ok"
-        breaker_state = "open" if breaker.is_open else "closed"
+        rows = breaker_rows()
         return web.json_response(
             {
                 "last_poll": last,
                 "queue_depth": depth,
                 "status": status,
-                "breaker": breaker_state,
+                "intervals": {
+                    str(sid): s.get("interval") for sid, s in bot.sub_status.items()
+                },
+                "breaker": overall_state(rows),
+                "breakers": rows,
             }
         )
 
@@ -1799,58 +2573,79 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
         return web.json_response({"adapter": "ok" if ok else "error"})
 
     async def breaker_toggle(request: web.Request) -> web.Response:
-        if breaker.is_open:
-            breaker.record_success()
-        else:
-            breaker.opened_at = time.time()
-        state = "open" if breaker.is_open else "closed"
-        return web.json_response({"state": state})
+        """Close every tripped breaker, or trip them all if none is."""
+        tripped = overall_state(breaker_rows()) != "closed"
+        for key, breaker in breakers.items():
+            if tripped:
+                breaker.record_success()
+            else:
+                breaker.opened_at = time.time()
+            publish_breaker(key, breaker)
+        return web.json_response({"state": overall_state(breaker_rows())})
+
+    async def ingest(request: web.Request) -> web.Response:
+        """Relay items pushed by the adapter or another producer.
+
+        Expects ``{"feeds": [{"type", "target_id", "account_id", "items"}]}``
+        with ``Authorization: Bearer <INGEST_TOKEN>``.
+        """
+        if not INGEST_TOKEN:
+            return web.json_response({"error": "push ingestion disabled"}, status=404)
+        auth = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(auth, f"Bearer {INGEST_TOKEN}".encode()):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        try:
+            body = await request.json()
+            pushed = [parse_push(feed) for feed in body["feeds"]]
+        except (ValueError, KeyError, TypeError):
+            return web.json_response({"error": "invalid request"}, status=400)
+        relayed = await asyncio.gather(*(ingest_feed(store, *feed) for feed in pushed))
+        return web.json_response({"feeds": len(pushed), "relayed": sum(relayed)})
 
     async def accounts_page(request: web.Request) -> web.Response:
-        accounts = storage.list_accounts(db)
+        accounts = await query(storage.list_accounts)
         return render("accounts.html", accounts=accounts)
 
     async def accounts_post(request: web.Request) -> web.Response:
         data = await request.post()
         remove_id = data.get("remove")
         if remove_id:
-            storage.remove_account(db, int(remove_id))
+            await query(storage.remove_account, int(remove_id))
         else:
             username = data.get("username", "").strip()
             password = data.get("password", "")
             if not username or not password:
                 return web.Response(status=400, text="invalid request")
-            storage.add_account(db, username, password)
+            await query(storage.add_account, username, password)
         raise web.HTTPFound("/accounts")
 
     async def subscriptions_page(request: web.Request) -> web.Response:
-        subs = db.query(models.Subscription).all()
+        subs = await query(lambda s: s.query(models.Subscription).all())
         return render("subscriptions.html", subs=subs)
 
     async def subscription_delete(request: web.Request) -> web.Response:
         sub_id = int(request.match_info["sub_id"])
-        db.query(models.Subscription).filter(models.Subscription.id == sub_id).delete()
-        db.commit()
+        await query(storage.delete_subscription, sub_id)
         raise web.HTTPFound("/subscriptions")
 
     async def birthdays_page(request: web.Request) -> web.Response:
-        rows = db.query(birthday.Birthday).all()
+        rows = await query(lambda s: s.query(birthday.Birthday).all())
         return render("birthdays.html", rows=rows)
 
     async def roles_page(request: web.Request) -> web.Response:
-        roles = db.query(models.ReactionRole).all()
+        roles = await query(lambda s: s.query(models.ReactionRole).all())
         return render("roles.html", roles=roles)
 
     async def roles_remove(request: web.Request) -> web.Response:
         data = await request.post()
         message_id = int(data.get("message_id", 0))
         emoji = data.get("emoji", "")
-        storage.remove_reaction_role(db, message_id, emoji)
+        await query(storage.remove_reaction_role, message_id, emoji)
         raise web.HTTPFound("/roles")
 
     async def audit_page(request: web.Request) -> web.Response:
-        logs = (
-            db.query(models.AuditLog)
+        logs = await query(
+            lambda s: s.query(models.AuditLog)
             .order_by(models.AuditLog.id.desc())
             .limit(100)
             .all()
@@ -1858,7 +2653,7 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
         return render("audit.html", logs=logs)
 
     async def channels_page(request: web.Request) -> web.Response:
-        channels = db.query(models.Channel).all()
+        channels = await query(lambda s: s.query(models.Channel).all())
         channels_data = [
             {
                 "id": c.id,
@@ -1878,15 +2673,12 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
             )
         except Exception:
             return web.Response(status=400, text="invalid settings")
-        channel = db.get(models.Channel, channel_id)
-        if not channel:
+        if not await query(storage.replace_channel_settings, channel_id, settings):
             return web.Response(status=404, text="not found")
-        channel.settings_json = settings
-        db.commit()
         raise web.HTTPFound("/channels")
 
     async def polls_page(request: web.Request) -> web.Response:
-        polls = polling.list_polls(db, active_only=False)
+        polls = await query(polling.list_polls, active_only=False)
         return render("polls.html", polls=polls)
 
     async def poll_create(request: web.Request) -> web.Response:
@@ -1906,8 +2698,8 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
         user_id = int(request["user"]["id"]) if request.get("user") else 0
         if not question or not channel_id:
             return web.Response(status=400, text="invalid poll")
-        poll = polling.create_poll(
-            db,
+        poll = await query(
+            polling.create_poll,
             question,
             poll_type,
             options,
@@ -1921,19 +2713,20 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
 
     async def poll_close(request: web.Request) -> web.Response:
         poll_id = int(request.match_info["poll_id"])
-        polling.close_poll(db, poll_id)
+        await query(polling.close_poll, poll_id)
         raise web.HTTPFound("/polls")
 
     async def poll_results_page(request: web.Request) -> web.Response:
         poll_id = int(request.match_info["poll_id"])
-        results = polling.poll_results(db, poll_id)
-        poll = db.get(polling.Poll, poll_id)
+        async with storage.session_scope(store) as session:
+            results = await storage.run(session, polling.poll_results, poll_id)
+            poll = await storage.run(session, lambda s: s.get(polling.Poll, poll_id))
         if not poll:
             return web.Response(status=404, text="not found")
         return render("poll_results.html", poll=poll, results=results)
 
     async def timers_page(request: web.Request) -> web.Response:
-        rows = db.query(models.TimedMessage).all()
+        rows = await query(lambda s: s.query(models.TimedMessage).all())
         return render("timers.html", rows=rows)
 
     async def timers_create(request: web.Request) -> web.Response:
@@ -1950,17 +2743,12 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
         bot_tokens.set(bot_bucket.get_tokens())
         sent = await channel.send(message)
         delete_at = datetime.utcnow() + timedelta(seconds=seconds)
-        db.add(
-            models.TimedMessage(
-                message_id=sent.id, channel_id=channel_id, delete_at=delete_at
-            )
-        )
-        db.commit()
+        await query(storage.add_timed_message, sent.id, channel_id, delete_at)
         messages_scheduled.inc()
         raise web.HTTPFound("/timers")
 
     async def autodelete_page(request: web.Request) -> web.Response:
-        channels = db.query(models.Channel).all()
+        channels = await query(lambda s: s.query(models.Channel).all())
         channels_data = [
             {
                 "id": c.id,
@@ -1980,11 +2768,11 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
             return web.Response(status=400, text="invalid seconds")
         if not channel_id:
             return web.Response(status=400, text="invalid channel")
-        storage.set_channel_settings(db, channel_id, autodelete=seconds)
+        await query(storage.set_channel_settings, channel_id, autodelete=seconds)
         raise web.HTTPFound("/autodelete")
 
     async def welcome_page(request: web.Request) -> web.Response:
-        rows = db.query(welcome.WelcomeConfig).all()
+        rows = await query(lambda s: s.query(welcome.WelcomeConfig).all())
         return render("welcome.html", rows=rows)
 
     async def welcome_set(request: web.Request) -> web.Response:
@@ -1996,7 +2784,7 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
         verify_role_id = int(verify_role) if verify_role else None
         if not guild_id or not channel_id or not message:
             return web.Response(status=400, text="invalid config")
-        welcome.set_config(db, guild_id, channel_id, message, verify_role_id)
+        await query(welcome.set_config, guild_id, channel_id, message, verify_role_id)
         raise web.HTTPFound("/welcome")
 
     async def welcome_preview(request: web.Request) -> web.Response:
@@ -2085,6 +2873,7 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
     app.router.add_get("/ops/health", health_status)
     app.router.add_post("/ops/health-check", trigger_health_check)
     app.router.add_post("/ops/breaker/toggle", breaker_toggle)
+    app.router.add_post("/ingest", ingest)
     app.router.add_get("/accounts", accounts_page)
     app.router.add_post("/accounts", accounts_post)
     app.router.add_get("/subscriptions", subscriptions_page)
@@ -2127,7 +2916,7 @@ def create_management_app(db, breaker: CircuitBreaker) -> web.Application:
 async def run_bot() -> None:
     if not TOKEN:
         raise RuntimeError("DISCORD_TOKEN is not set")
-    app = create_management_app(bot.db, adapter_breaker)
+    app = create_management_app(bot.db, adapter_breakers, sessions=bot.sessions)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, "0.0.0.0", MGMT_PORT)
@@ -2139,8 +2928,10 @@ async def run_bot() -> None:
     finally:
         if bot.bridge:
             await bot.bridge.stop()
+        await flush_subscription_states()
         await runner.cleanup()
         await adapter_client.close_session()
+        await storage.dispose_async_db(bot.sessions)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ from sqlalchemy import (
     JSON,
     BigInteger,
     ForeignKey,
+    Index,
     func,
 )
 
@@ -55,6 +56,7 @@ class Subscription(Base):
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     active = Column(Boolean, server_default="1", nullable=False)
     account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
+    digest = Column(String, nullable=True)
 
 
 class Cursor(Base):
@@ -62,11 +64,42 @@ class Cursor(Base):
     subscription_id = Column(Integer, ForeignKey("subscriptions.id"), primary_key=True)
     last_seen_at = Column(DateTime, nullable=True)
     last_item_ids_json = Column(JSON, nullable=True)
+    # Highest item ID relayed with no earlier item left unsent.
+    high_watermark = Column(BigInteger, nullable=True)
     updated_at = Column(
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
 
+class SubscriptionState(Base):
+    __tablename__ = "subscription_state"
+    subscription_id = Column(
+        Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), primary_key=True
+    )
+    failures = Column(Integer, server_default="0", nullable=False)
+    backoff = Column(Integer, nullable=True)
+    paused_until = Column(DateTime, nullable=True)
+    notified = Column(Boolean, server_default="0", nullable=False)
+    interval = Column(Integer, nullable=True)
+    updated_at = Column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class DigestItem(Base):
+    __tablename__ = "digest_items"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    subscription_id = Column(
+        Integer,
+        ForeignKey("subscriptions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    item_id = Column(String, nullable=False)
+    payload_json = Column(JSON, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
 class RelayLog(Base):
     __tablename__ = "relay_log"
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -81,6 +114,10 @@ class RelayLog(Base):
     item_hash = Column(String, nullable=True)
     relayed_at = Column(DateTime, server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_relay_log_subscription_item", "subscription_id", "item_id"),
+    )
+
 
 class Profile(Base):
     __tablename__ = "profiles"
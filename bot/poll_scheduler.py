@@ -0,0 +1,160 @@
+"""Min-heap scheduler for subscription polls."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Coroutine, Sequence
+
+from prometheus_client import Histogram
+
+from .utils import get_correlation_id
+
+logger = logging.getLogger(__name__)
+
+poll_lateness = Histogram(
+    "poll_schedule_lateness_seconds",
+    "Actual minus planned start time of scheduled polls",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 30, 60, 300),
+)
+
+
+@dataclass
+class Job:
+    id: str
+    func: Callable[..., Coroutine[Any, Any, Any]]
+    args: Sequence[Any]
+    run_at: float
+    generation: int
+
+
+class PollScheduler:
+    """Run one-shot coroutine jobs at planned times from a binary heap.
+
+    Jobs are keyed by id like APScheduler date jobs: adding a job with an
+    existing id replaces it, and a job is dropped once it has been started.
+    Rescheduling pushes a new heap entry and leaves the old one to be
+    skipped when popped, so both adding and running a job are O(log n).
+    Cron-style jobs stay on APScheduler.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, Job] = {}
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+        self._generation = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._runner: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[Any]] = set()
+
+    @property
+    def depth(self) -> int:
+        """Number of scheduled jobs."""
+        return len(self._jobs)
+
+    def add_job(
+        self,
+        func: Callable[..., Coroutine[Any, Any, Any]],
+        args: Sequence[Any] = (),
+        id: str | None = None,
+        run_date: datetime | None = None,
+        replace_existing: bool = True,
+    ) -> Job:
+        """Schedule ``func(*args)`` at *run_date* (naive UTC), or now."""
+        job_id = id if id is not None else str(next(self._seq))
+        if not replace_existing and job_id in self._jobs:
+            raise ValueError(f"job {job_id} already scheduled")
+        delay = (run_date - datetime.utcnow()).total_seconds() if run_date else 0.0
+        job = Job(job_id, func, args, time.monotonic() + delay, next(self._generation))
+        self._jobs[job_id] = job
+        heapq.heappush(
+            self._heap, (job.run_at, next(self._seq), job_id, job.generation)
+        )
+        self._compact()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def get_job(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def get_jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def remove_job(self, job_id: str) -> None:
+        # The heap entry becomes stale and is skipped when it comes up.
+        del self._jobs[job_id]
+
+    def start(self) -> None:
+        """Start dispatching due jobs on the running event loop."""
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.get_running_loop().create_task(self._run(self._wakeup))
+
+    def shutdown(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+
+    def _compact(self) -> None:
+        # Rebuild once stale entries outnumber live ones; amortized O(log n).
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._heap = [
+                (job.run_at, next(self._seq), job.id, job.generation)
+                for job in self._jobs.values()
+            ]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, job_id: str, generation: int) -> bool:
+        job = self._jobs.get(job_id)
+        return job is not None and job.generation == generation
+
+    def _next_delay(self) -> float | None:
+        while self._heap and not self._is_current(*self._heap[0][2:]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return self._heap[0][0] - time.monotonic()
+
+    def run_due(self) -> int:
+        """Start every job whose planned time has passed; return how many."""
+        now = time.monotonic()
+        started = 0
+        while self._heap and self._heap[0][0] <= now:
+            run_at, _, job_id, generation = heapq.heappop(self._heap)
+            if not self._is_current(job_id, generation):
+                continue
+            job = self._jobs.pop(job_id)
+            poll_lateness.observe(now - run_at)
+            task = asyncio.get_running_loop().create_task(job.func(*job.args))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+            started += 1
+        return started
+
+    def _finished(self, task: asyncio.Task[Any]) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "scheduled_job_failed",
+                exc_info=task.exception(),
+                extra={"correlation_id": get_correlation_id()},
+            )
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while True:
+            wakeup.clear()
+            delay = self._next_delay()
+            if delay is None:
+                await wakeup.wait()
+            elif delay > 0:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                self.run_due()
@@ -1,26 +1,154 @@
-import asyncio  # Used for locking and sleep
+"""Fair asynchronous token buckets with priorities."""
+
+import asyncio
+import re
 import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import IntEnum
+from types import SimpleNamespace
+from typing import Hashable, cast
+
+import aiohttp
+from prometheus_client import Histogram
+
+rate_limit_wait = Histogram(
+    "rate_limit_wait_seconds",
+    "Time spent waiting for rate limit tokens",
+    ["bucket", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+class Priority(IntEnum):
+    """Waiters of a lower value are served first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@dataclass
+class _Waiter:
+    tokens: float
+    future: "asyncio.Future[None]"
 
 
 class TokenBucket:
-    """Asynchronous token bucket rate limiter."""
+    """Asynchronous token bucket rate limiter.
 
-    def __init__(self, capacity: int, refill_rate: float) -> None:
+    Waiters are served strictly by priority and first in, first out within a
+    priority. Nothing sleeps while holding a lock: waiters park on futures
+    and a single timer wakes the bucket when the head waiter can be served.
+    """
+
+    def __init__(self, capacity: int, refill_rate: float, name: str = "bucket") -> None:
         self.capacity = capacity
         self.refill_rate = refill_rate
+        self.name = name
         self.tokens = float(capacity)
         self.updated = time.monotonic()
-        self._lock = asyncio.Lock()
+        self._waiters: dict[Priority, deque[_Waiter]] = {p: deque() for p in Priority}
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def waiting(self) -> int:
+        """Number of queued waiters."""
+        return sum(len(queue) for queue in self._waiters.values())
 
-    async def acquire(self, tokens: float = 1) -> None:
-        async with self._lock:
-            await self._add_new_tokens()
-            while self.tokens < tokens:
-                await asyncio.sleep((tokens - self.tokens) / self.refill_rate)
-                await self._add_new_tokens()
-            self.tokens -= tokens
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take *tokens* if available right now and nobody is queued."""
+        self._add_new_tokens()
+        if self.waiting or self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
 
-    async def _add_new_tokens(self) -> None:
+    async def acquire(
+        self, tokens: float = 1, priority: Priority = Priority.NORMAL
+    ) -> None:
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters of a previous event loop can never be served.
+            self._reset(loop)
+        if not self.try_acquire(tokens):
+            waiter = _Waiter(tokens, loop.create_future())
+            self._waiters[priority].append(waiter)
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter in self._waiters[priority]:
+                    self._waiters[priority].remove(waiter)
+                    self._dispatch()
+                elif waiter.future.done() and not waiter.future.cancelled():
+                    # Granted just before the cancellation: give the tokens back.
+                    self.tokens = min(self.capacity, self.tokens + tokens)
+                    self._dispatch()
+                raise
+        rate_limit_wait.labels(self.name, priority.name.lower()).observe(
+            time.perf_counter() - start
+        )
+
+    def _reset(self, loop: asyncio.AbstractEventLoop) -> None:
+        for queue in self._waiters.values():
+            queue.clear()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._loop = loop
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._add_new_tokens()
+        for queue in self._waiters.values():
+            while queue:
+                head = queue[0]
+                if head.future.done():
+                    queue.popleft()
+                    continue
+                if self.tokens < head.tokens:
+                    # Lower priorities wait behind this waiter.
+                    paused = max(0.0, self.updated - time.monotonic())
+                    delay = paused + (head.tokens - self.tokens) / self.refill_rate
+                    loop = cast(asyncio.AbstractEventLoop, self._loop)
+                    self._timer = loop.call_later(delay, self._dispatch)
+                    return
+                queue.popleft()
+                self.tokens -= head.tokens
+                head.future.set_result(None)
+
+    def observe(self, limit: int, remaining: int, reset_after: float) -> None:
+        """Adopt the server's view of this bucket from rate-limit headers.
+
+        The first request of a window reports the window length as
+        *reset_after*, which sets the refill rate. Tokens never exceed what
+        the server says remains.
+        """
+        self._add_new_tokens()
+        self.capacity = max(1, limit)
+        if remaining >= limit - 1 and reset_after > 0:
+            self.refill_rate = limit / reset_after
+        self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0:
+            self.pause(reset_after)
+        elif self.waiting:
+            self._dispatch()
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for *seconds*, e.g. after a 429 response."""
+        self._add_new_tokens()
+        self.tokens = min(self.tokens, 0.0)
+        # Refill resumes once the clock passes ``updated``.
+        self.updated = max(self.updated, time.monotonic() + seconds)
+        if self.waiting:
+            self._dispatch()
+
+    def _add_new_tokens(self) -> None:
         now = time.monotonic()
         delta = now - self.updated
         if delta > 0:
@@ -29,3 +157,126 @@ class TokenBucket:
 
     def get_tokens(self) -> float:
         return self.tokens
+
+
+class KeyedTokenBucket:
+    """One :class:`TokenBucket` per key, such as a channel, guild or account.
+
+    At most ``max_keys`` buckets are kept; the least recently used idle
+    buckets are evicted first. An evicted key starts again with a full
+    bucket, which matches an idle bucket that has refilled anyway.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        refill_rate: float,
+        name: str = "keyed",
+        max_keys: int = 1024,
+    ) -> None:
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.name = name
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.capacity, self.refill_rate, self.name)
+            self._buckets[key] = bucket
+            self._evict()
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def try_acquire(self, key: Hashable, tokens: float = 1) -> bool:
+        return self.bucket(key).try_acquire(tokens)
+
+    async def acquire(
+        self, key: Hashable, tokens: float = 1, priority: Priority = Priority.NORMAL
+    ) -> None:
+        await self.bucket(key).acquire(tokens, priority)
+
+    def _evict(self) -> None:
+        excess = len(self._buckets) - self.max_keys
+        if excess <= 0:
+            return
+        for key in list(self._buckets):
+            if excess <= 0:
+                break
+            if not self._buckets[key].waiting:
+                del self._buckets[key]
+                excess -= 1
+
+
+class LearnedRateLimits(KeyedTokenBucket):
+    """Keyed buckets sized from the server's rate-limit feedback.
+
+    Keys only get a bucket once a response reported their limits; until
+    then :meth:`acquire` returns immediately and the HTTP client's own
+    handling applies. Afterwards callers queue here, by priority, for
+    exactly the budget the server advertises.
+    """
+
+    async def acquire(
+        self, key: Hashable, tokens: float = 1, priority: Priority = Priority.NORMAL
+    ) -> None:
+        if key in self._buckets:
+            await super().acquire(key, tokens, priority)
+
+    def observe(
+        self, key: Hashable, limit: int, remaining: int, reset_after: float
+    ) -> None:
+        self.bucket(key).observe(limit, remaining, reset_after)
+
+    def pause(self, key: Hashable, seconds: float) -> None:
+        self.bucket(key).pause(seconds)
+
+
+_CHANNEL_MESSAGES = re.compile(r"/channels/(\d+)/messages$")
+
+
+def discord_trace(
+    channels: LearnedRateLimits, global_bucket: TokenBucket
+) -> aiohttp.TraceConfig:
+    """Feed Discord rate-limit headers of message sends into the limiters.
+
+    Pass the result as ``http_trace`` to the discord.py client. Message
+    sends update the channel's learned bucket; a global 429 pauses
+    *global_bucket* for the advertised ``Retry-After``.
+    """
+
+    async def on_request_end(
+        session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        headers = params.response.headers
+        if params.response.status == 429 and "Retry-After" in headers:
+            retry_after = float(headers["Retry-After"])
+            if headers.get("X-RateLimit-Global") == "true":
+                global_bucket.pause(retry_after)
+                return
+        else:
+            retry_after = None
+        match = _CHANNEL_MESSAGES.search(params.url.path)
+        if params.method != "POST" or match is None:
+            return
+        channel_id = int(match.group(1))
+        if retry_after is not None:
+            channels.pause(channel_id, retry_after)
+        elif "X-RateLimit-Remaining" in headers:
+            channels.observe(
+                channel_id,
+                int(headers.get("X-RateLimit-Limit", 1)),
+                int(headers["X-RateLimit-Remaining"]),
+                float(headers.get("X-RateLimit-Reset-After", 0)),
+            )
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(on_request_end)
+    return trace
@@ -1,17 +1,93 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, Tuple, cast
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Tuple, TypeVar, cast
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from .db import (
+    TaskScopedSession,
+    async_sessions,
+    get_session as _get_session,
+    hash_credentials,
+    init_db as _init_db,
+)
+from . import models
 
-from sqlalchemy.orm import Session
+# Stay below SQLite's bound-parameter limit for ``IN`` lookups.
+_IN_CHUNK = 900
 
-from .db import init_db as _init_db, hash_credentials
-from . import models
+
+T = TypeVar("T")
+
+# Anything the async call sites accept as a database handle.
+Database = Session | AsyncSession | async_sessionmaker[AsyncSession]
 
 
 def init_db(url: str | None = None) -> Session:
     return _init_db(url)
 
 
+def get_session() -> Session:
+    return _get_session()
+
+
+def init_scoped_db(url: str | None = None) -> TaskScopedSession:
+    session = _init_db(url)
+    try:
+        bind = session.get_bind()
+    finally:
+        session.close()
+    return TaskScopedSession(sessionmaker(bind=bind, autoflush=False))
+
+
+def init_async_db(url: str | None = None) -> async_sessionmaker[AsyncSession]:
+    return async_sessions(url)
+
+
+async def dispose_async_db(sessions: async_sessionmaker[AsyncSession]) -> None:
+    """Close the pooled connections of the engine behind *sessions*.
+
+    Required before exit: the aiosqlite worker threads are not daemonic.
+    """
+    await cast(AsyncEngine, sessions.kw["bind"]).dispose()
+
+
+@asynccontextmanager
+async def session_scope(db: Database) -> AsyncIterator[Session | AsyncSession]:
+    """Yield a session for one unit of work on *db*.
+
+    Sessions are used as-is and left open for their owner; a session
+    factory opens a new session that is closed on exit.
+    """
+    if isinstance(db, async_sessionmaker):
+        async with db() as session:
+            yield session
+    else:
+        yield db
+
+
+async def run(
+    session: Session | AsyncSession, fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Call the sync storage helper ``fn(session, *args, **kwargs)``.
+
+    On an AsyncSession the helper goes through ``run_sync`` so its queries
+    are awaited on the async driver instead of blocking the event loop.
+    """
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(fn, *args, **kwargs)
+    return fn(session, *args, **kwargs)
+
+
+def get_subscription(db: Session, sub_id: int) -> models.Subscription | None:
+    return db.get(models.Subscription, sub_id)
+
+
 def add_subscription(
     db: Session,
     channel_id: int,
@@ -65,6 +141,79 @@ def remove_account(db: Session, account_id: int) -> None:
     db.commit()
 
 
+def delete_subscription(db: Session, sub_id: int) -> None:
+    _delete_subscription_state(db, sub_id)
+    db.query(models.Subscription).filter(models.Subscription.id == sub_id).delete()
+    db.commit()
+
+
+def _delete_subscription_state(db: Session, sub_id: int) -> None:
+    # SQLite does not enforce ON DELETE CASCADE without the foreign_keys pragma.
+    db.query(models.SubscriptionState).filter(
+        models.SubscriptionState.subscription_id == sub_id
+    ).delete()
+    db.query(models.DigestItem).filter(
+        models.DigestItem.subscription_id == sub_id
+    ).delete()
+
+
+def set_subscription_digest(
+    db: Session, sub_id: int, channel_id: int, schedule: str | None
+) -> bool:
+    """Set or clear the digest schedule of a subscription in *channel_id*."""
+    updated = (
+        db.query(models.Subscription)
+        .filter(
+            models.Subscription.id == sub_id,
+            models.Subscription.channel_id == channel_id,
+        )
+        .update({models.Subscription.digest: schedule})
+    )
+    db.commit()
+    return bool(updated)
+
+
+def list_digest_items(
+    db: Session,
+) -> list[Tuple[int, int, int, str, str | None, Dict[str, Any], datetime]]:
+    """Return every buffered digest item with its subscription, oldest first.
+
+    Rows are ``(id, sub_id, channel_id, type, digest, payload, created_at)``;
+    ``digest`` is ``None`` if digest mode was switched off since buffering.
+    """
+    rows = (
+        db.query(
+            models.DigestItem.id,
+            models.DigestItem.subscription_id,
+            models.Subscription.channel_id,
+            models.Subscription.type,
+            models.Subscription.digest,
+            models.DigestItem.payload_json,
+            models.DigestItem.created_at,
+        )
+        .join(
+            models.Subscription,
+            models.Subscription.id == models.DigestItem.subscription_id,
+        )
+        .order_by(models.DigestItem.id)
+        .all()
+    )
+    return [cast(Any, tuple(row)) for row in rows]
+
+
+def delete_digest_items(db: Session, ids: Iterable[int]) -> None:
+    ids = list(ids)
+    try:
+        for start in range(0, len(ids), _IN_CHUNK):
+            db.query(models.DigestItem).filter(
+                models.DigestItem.id.in_(ids[start : start + _IN_CHUNK])
+            ).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
 def list_subscriptions(
     db: Session, channel_id: int
 ) -> Iterable[Tuple[int, str, str, int | None]]:
@@ -82,10 +231,60 @@ def list_subscriptions(
     return cast(list[Tuple[int, str, str, int | None]], rows)
 
 
+def list_all_subscriptions(
+    db: Session,
+) -> list[Tuple[int, str, str, int | None, int | None]]:
+    """Return id, type, target, account and watermark of every subscription."""
+    rows = (
+        db.query(
+            models.Subscription.id,
+            models.Subscription.type,
+            models.Subscription.target_id,
+            models.Subscription.account_id,
+            models.Cursor.high_watermark,
+        )
+        .join(models.Channel, models.Channel.id == models.Subscription.channel_id)
+        .outerjoin(
+            models.Cursor, models.Cursor.subscription_id == models.Subscription.id
+        )
+        .order_by(models.Subscription.id)
+        .all()
+    )
+    return cast(list[Tuple[int, str, str, int | None, int | None]], rows)
+
+
+def list_feed_subscriptions(
+    db: Session, sub_type: str, target_id: str, account_id: int | None
+) -> list[int]:
+    """Return the IDs of subscriptions to one adapter feed.
+
+    Arguments are a :func:`bot.feeds.feed_key`; the messages feed has no
+    target.
+    """
+    query = db.query(models.Subscription.id).filter(
+        models.Subscription.type == sub_type,
+        (
+            models.Subscription.account_id.is_(None)
+            if account_id is None
+            else models.Subscription.account_id == account_id
+        ),
+    )
+    if sub_type != "messages":
+        query = query.filter(models.Subscription.target_id == target_id)
+    return [row[0] for row in query.order_by(models.Subscription.id)]
+
+
 def remove_subscription(db: Session, sub_id: int, channel_id: int) -> None:
-    db.query(models.Subscription).filter(
-        models.Subscription.id == sub_id, models.Subscription.channel_id == channel_id
-    ).delete()
+    removed = (
+        db.query(models.Subscription)
+        .filter(
+            models.Subscription.id == sub_id,
+            models.Subscription.channel_id == channel_id,
+        )
+        .delete()
+    )
+    if removed:
+        _delete_subscription_state(db, sub_id)
     db.commit()
 
 
@@ -148,6 +347,28 @@ def set_channel_settings(db: Session, channel_id: int, **settings: Any) -> None:
     db.commit()
 
 
+def replace_channel_settings(
+    db: Session, channel_id: int, settings: Dict[str, Any]
+) -> bool:
+    channel = db.get(models.Channel, channel_id)
+    if not channel:
+        return False
+    cast(Any, channel).settings_json = settings
+    db.commit()
+    return True
+
+
+def add_timed_message(
+    db: Session, message_id: int, channel_id: int, delete_at: datetime
+) -> None:
+    db.add(
+        models.TimedMessage(
+            message_id=message_id, channel_id=channel_id, delete_at=delete_at
+        )
+    )
+    db.commit()
+
+
 def get_channel_settings(db: Session, channel_id: int) -> Dict[str, Any]:
     channel = db.get(models.Channel, channel_id)
     if channel and isinstance(channel.settings_json, dict):
@@ -187,6 +408,26 @@ def has_relayed(db: Session, sub_id: int, item_id: str) -> bool:
     )
 
 
+def filter_unrelayed(db: Session, sub_id: int, item_ids: Iterable[str]) -> list[str]:
+    """Return the IDs in *item_ids* not yet relayed for *sub_id*, in input order.
+
+    The whole batch is checked with a single ``relay_log`` query (chunked only
+    past ``_IN_CHUNK`` IDs) instead of one lookup per item.
+    """
+    ids = list(dict.fromkeys(item_ids))
+    if not ids:
+        return []
+    seen: set[str] = set()
+    for start in range(0, len(ids), _IN_CHUNK):
+        chunk = ids[start : start + _IN_CHUNK]
+        rows = db.query(models.RelayLog.item_id).filter(
+            models.RelayLog.subscription_id == sub_id,
+            models.RelayLog.item_id.in_(chunk),
+        )
+        seen.update(cast(str, row[0]) for row in rows)
+    return [item_id for item_id in ids if item_id not in seen]
+
+
 def record_relay(
     db: Session, sub_id: int, item_id: str, item_hash: str | None = None
 ) -> None:
@@ -284,3 +525,280 @@ def upsert_rsvp(
         )
         db.add(rsvp)
     db.commit()
+
+
+@dataclass
+class RelayBatch:
+    """Writes collected during one poll cycle for a single subscription.
+
+    Nothing is written until :func:`flush_relay_batch` commits the batch, so an
+    item only counts as relayed once its ``relay_log`` row is committed.
+    """
+
+    sub_id: int
+    relays: list[str] = field(default_factory=list)
+    events: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    profiles: Dict[str, str] = field(default_factory=dict)
+    rsvps: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    digest: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def add_event(
+        self,
+        fl_id: str,
+        title: str,
+        start_at: Any | None = None,
+        permalink: str | None = None,
+    ) -> None:
+        self.events[fl_id] = {
+            "title": title,
+            "city": None,
+            "region": None,
+            "start_at": start_at,
+            "permalink": permalink,
+            "last_populated_at": None,
+        }
+
+    def add_profile(self, fl_id: str, nickname: str) -> None:
+        self.profiles[fl_id] = nickname
+
+    def add_rsvp(self, event_fl_id: str, profile_fl_id: str, status: str) -> None:
+        self.rsvps[(event_fl_id, profile_fl_id)] = status
+
+    def add_relay(self, item_id: str) -> None:
+        self.relays.append(item_id)
+
+    def add_digest(self, item_id: str, item: Dict[str, Any]) -> None:
+        """Buffer *item* for the next digest; it counts as relayed once committed."""
+        self.digest[item_id] = item
+        self.relays.append(item_id)
+
+    def __bool__(self) -> bool:
+        return bool(self.relays or self.events or self.profiles or self.rsvps)
+
+
+def _flush_events(db: Session, events: Dict[str, Dict[str, Any]]) -> None:
+    if not events:
+        return
+    existing = db.query(models.Event).filter(models.Event.fl_id.in_(list(events)))
+    found: set[str] = set()
+    for event in existing:
+        for key, value in events[cast(str, event.fl_id)].items():
+            setattr(event, key, value)
+        found.add(cast(str, event.fl_id))
+    rows = [{"fl_id": k, **v} for k, v in events.items() if k not in found]
+    if rows:
+        db.execute(insert(models.Event), rows)
+
+
+def _flush_profiles(db: Session, profiles: Dict[str, str]) -> None:
+    if not profiles:
+        return
+    existing = db.query(models.Profile).filter(models.Profile.fl_id.in_(list(profiles)))
+    found: set[str] = set()
+    for profile in existing:
+        cast(Any, profile).nickname = profiles[cast(str, profile.fl_id)]
+        found.add(cast(str, profile.fl_id))
+    rows = [{"fl_id": k, "nickname": v} for k, v in profiles.items() if k not in found]
+    if rows:
+        db.execute(insert(models.Profile), rows)
+
+
+def _flush_rsvps(db: Session, rsvps: Dict[Tuple[str, str], str]) -> None:
+    if not rsvps:
+        return
+    event_fl_ids = list({event_fl_id for event_fl_id, _ in rsvps})
+    event_query = db.query(models.Event.fl_id, models.Event.id).filter(
+        models.Event.fl_id.in_(event_fl_ids)
+    )
+    event_ids: Dict[str, int] = {fl_id: id_ for fl_id, id_ in event_query.all()}
+    missing = [fl_id for fl_id in event_fl_ids if fl_id not in event_ids]
+    if missing:
+        db.execute(insert(models.Event), [{"fl_id": m, "title": ""} for m in missing])
+        event_ids = {fl_id: id_ for fl_id, id_ in event_query.all()}
+    wanted = {
+        (event_ids[event_fl_id], profile_fl_id): status
+        for (event_fl_id, profile_fl_id), status in rsvps.items()
+    }
+    existing = db.query(models.RSVP).filter(
+        models.RSVP.event_id.in_(list(event_ids.values())),
+        models.RSVP.profile_fl_id.in_([p for _, p in wanted]),
+    )
+    found: set[Tuple[int, str]] = set()
+    for rsvp in existing:
+        key = (cast(int, rsvp.event_id), cast(str, rsvp.profile_fl_id))
+        if key in wanted:
+            cast(Any, rsvp).status = wanted[key]
+            found.add(key)
+    rows = [
+        {"event_id": event_id, "profile_fl_id": profile_fl_id, "status": status}
+        for (event_id, profile_fl_id), status in wanted.items()
+        if (event_id, profile_fl_id) not in found
+    ]
+    if rows:
+        db.execute(insert(models.RSVP), rows)
+
+
+def flush_relay_batch(
+    db: Session,
+    batch: RelayBatch,
+    last_seen_at: Any | None = None,
+    watermark: int | None = None,
+) -> None:
+    """Persist *batch* in one transaction using bulk INSERTs.
+
+    Entity upserts, buffered digest items, ``relay_log`` rows and the cursor
+    update, including a new *watermark*, are committed together; on error
+    the transaction is rolled back and nothing from the batch counts as
+    relayed.
+    """
+    if not batch and watermark is None:
+        return
+    try:
+        _flush_events(db, batch.events)
+        _flush_profiles(db, batch.profiles)
+        db.flush()
+        _flush_rsvps(db, batch.rsvps)
+        if batch.digest:
+            db.execute(
+                insert(models.DigestItem),
+                [
+                    {
+                        "subscription_id": batch.sub_id,
+                        "item_id": item_id,
+                        "payload_json": item,
+                        "created_at": last_seen_at or datetime.utcnow(),
+                    }
+                    for item_id, item in batch.digest.items()
+                ],
+            )
+        if batch.relays:
+            db.execute(
+                insert(models.RelayLog),
+                [
+                    {"subscription_id": batch.sub_id, "item_id": item_id}
+                    for item_id in batch.relays
+                ],
+            )
+        if batch.relays or watermark is not None:
+            cur = db.get(models.Cursor, batch.sub_id)
+            if not cur:
+                cur = models.Cursor(subscription_id=batch.sub_id)
+                db.add(cur)
+            if batch.relays:
+                cast(Any, cur).last_seen_at = last_seen_at or datetime.utcnow()
+                cast(Any, cur).last_item_ids_json = list(batch.relays)
+            if watermark is not None:
+                cast(Any, cur).high_watermark = watermark
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _state_key(data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the persisted part of a poll job's ``data`` dict."""
+    interval = data.get("interval")
+    if not data.get("failures") and not data.get("paused_until"):
+        # Healthy: backoff is reset to the interval on the next success anyway.
+        return (0, None, None, False, interval)
+    return (
+        int(data.get("failures", 0)),
+        data.get("backoff"),
+        data.get("paused_until"),
+        bool(data.get("notified", False)),
+        interval,
+    )
+
+
+@dataclass
+class SubscriptionStates:
+    """Write-behind buffer for per-subscription poll interval and backoff state.
+
+    ``record`` only marks a subscription dirty when its state differs from
+    what was last loaded or written, and ``flush`` writes all dirty rows in
+    one transaction, so steady polling causes no writes at all.
+    """
+
+    saved: Dict[int, Tuple[Any, ...]] = field(default_factory=dict)
+    dirty: Dict[int, Tuple[Any, ...]] = field(default_factory=dict)
+
+    def load(self, db: Session) -> Dict[int, Dict[str, Any]]:
+        """Return the stored state of every subscription keyed by id."""
+        states: Dict[int, Dict[str, Any]] = {}
+        for row in db.query(models.SubscriptionState).all():
+            paused = cast("datetime | None", row.paused_until)
+            data = {
+                "failures": row.failures,
+                "backoff": row.backoff,
+                "paused_until": (
+                    paused.replace(tzinfo=timezone.utc).timestamp() if paused else None
+                ),
+                "notified": bool(row.notified),
+                "interval": row.interval,
+            }
+            sub_id = cast(int, row.subscription_id)
+            states[sub_id] = data
+            self.saved[sub_id] = _state_key(data)
+        return states
+
+    def record(self, sub_id: int, data: Dict[str, Any]) -> None:
+        state = _state_key(data)
+        if self.saved.get(sub_id, _state_key({})) == state:
+            self.dirty.pop(sub_id, None)
+        else:
+            self.dirty[sub_id] = state
+
+    def flush(self, db: Session) -> int:
+        """Write dirty states in one transaction and return how many."""
+        pending = dict(self.dirty)
+        if not pending:
+            return 0
+        ids = list(pending)
+        present: Dict[int, bool] = {}
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start : start + _IN_CHUNK]
+            rows = (
+                db.query(models.Subscription.id, models.SubscriptionState.failures)
+                .outerjoin(
+                    models.SubscriptionState,
+                    models.SubscriptionState.subscription_id == models.Subscription.id,
+                )
+                .filter(models.Subscription.id.in_(chunk))
+                .all()
+            )
+            present.update({sub_id: failures is not None for sub_id, failures in rows})
+        new: list[Dict[str, Any]] = []
+        changed: list[Dict[str, Any]] = []
+        for sub_id, state in pending.items():
+            if sub_id not in present:
+                continue  # subscription was removed meanwhile
+            failures, backoff, paused_until, notified, interval = state
+            row = {
+                "subscription_id": sub_id,
+                "failures": failures,
+                "backoff": backoff,
+                "paused_until": (
+                    datetime.utcfromtimestamp(paused_until) if paused_until else None
+                ),
+                "notified": notified,
+                "interval": interval,
+            }
+            (changed if present[sub_id] else new).append(row)
+        try:
+            if new:
+                db.execute(insert(models.SubscriptionState), new)
+            if changed:
+                db.execute(update(models.SubscriptionState), changed)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for sub_id, state in pending.items():
+            self.saved[sub_id] = state
+            if self.dirty.get(sub_id) == state:
+                del self.dirty[sub_id]
+        return len(new) + len(changed)
+
+    def clear(self) -> None:
+        self.saved.clear()
+        self.dirty.clear()
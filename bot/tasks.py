@@ -1,10 +1,11 @@
 import asyncio  # for scheduling sleeps
+import time
 from datetime import datetime
 from typing import cast
 
 import discord
 import logging
-from prometheus_client import Counter
+from prometheus_client import Counter, Histogram
 
 from . import models
 
@@ -13,6 +14,11 @@ logger = logging.getLogger(__name__)
 
 
 messages_deleted = Counter("timed_messages_deleted_total", "Timed messages deleted")
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled wake-up and the event loop running it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
 
 
 async def _delete_once(bot: discord.Client) -> None:
@@ -42,3 +48,11 @@ async def delete_expired_messages(bot: discord.Client, interval: int = 5) -> Non
     while not bot.is_closed():
         await _delete_once(bot)
         await asyncio.sleep(interval)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Record how late the event loop wakes up from ``asyncio.sleep``."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, time.perf_counter() - start - interval))
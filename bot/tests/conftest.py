@@ -16,6 +16,7 @@ def _env(monkeypatch, tmp_path):
     monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path}/test.db")
     main.main(require_env=False)
     yield
+    main.feed_coalescer.clear()
     asyncio.run(adapter_client.close_session())
     for collector in list(REGISTRY._collector_to_names):
         REGISTRY.unregister(collector)
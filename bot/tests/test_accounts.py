@@ -44,7 +44,7 @@ def test_poll_adapter_uses_correct_account():
     with (
         patch("bot.main.adapter_client.fetch_events", fetch_mock),
         patch.object(main.bot, "get_channel", return_value=channel),
-        patch.object(main.bot.scheduler, "add_job"),
+        patch.object(main.bot.poller, "add_job"),
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
     ):
@@ -3,12 +3,16 @@ import logging
 import os
 from unittest.mock import patch
 
+import aiohttp
+
+from bot import adapter_client
 from bot.adapter_client import (
     fetch_events,
     fetch_attendees,
     fetch_group_posts,
     fetch_writings,
     fetch_messages,
+    fetch_batch,
     login,
     login_adapter,
     close_session,
@@ -16,9 +20,11 @@ from bot.adapter_client import (
 
 
 class DummyResp:
-    def __init__(self, data, status: int = 200):
+    def __init__(self, data, status: int = 200, headers=None):
         self._data = data
         self.status = status
+        self.headers = headers or {}
+        self.content_length = None
 
     async def __aenter__(self):
         return self
@@ -38,9 +44,11 @@ class DummySession:
         self.data = data
         self.headers = None
         self.closed = False
+        self.gets = 0
 
     def get(self, url, params=None, headers=None):
         self.headers = headers
+        self.gets += 1
         return DummyResp(self.data)
 
     def post(self, url, json=None, headers=None):
@@ -119,9 +127,369 @@ def test_fetch_events_schema_mismatch(caplog):
     assert any(r.message == "adapter_schema_mismatch" for r in caplog.records)
 
 
+def test_schema_mismatch_keeps_valid_items(caplog):
+    good = {"id": 1, "title": "t", "link": "l1", "time": "now"}
+    data = [good, {"id": 2, "link": "l2"}]
+    with caplog.at_level(logging.WARNING):
+        items = asyncio.run(
+            fetch_events(
+                "http://adapter", "cities/1", account_id=1, session=DummySession(data)
+            )
+        )
+    assert items == [good, {"link": "l2"}]
+    record = next(r for r in caplog.records if r.message == "adapter_schema_mismatch")
+    assert record.invalid_items == 1
+
+
+def test_item_validator_cached():
+    assert adapter_client._item_validator(
+        "event.json"
+    ) is adapter_client._item_validator("event.json")
+
+
+def test_validation_in_thread():
+    data = [{"id": 1, "title": "t", "link": "l", "time": "now"}]
+    adapter_client.configure_validation(1)
+    try:
+        with patch(
+            "bot.adapter_client.asyncio.to_thread", wraps=asyncio.to_thread
+        ) as to_thread:
+            items = asyncio.run(
+                fetch_events(
+                    "http://adapter",
+                    "cities/1",
+                    account_id=1,
+                    session=DummySession(data),
+                )
+            )
+    finally:
+        adapter_client.configure_validation(0)
+    assert items == data
+    to_thread.assert_called_once()
+
+
 def test_close_session():
     dummy = DummySession({"ok": True})
     with patch("bot.adapter_client.ClientSession", return_value=dummy):
         asyncio.run(login_adapter("http://adapter"))
     asyncio.run(close_session())
     assert dummy.closed
+
+
+def test_response_cache_hits_within_ttl():
+    data = [{"id": 1, "title": "t", "link": "l", "time": "now"}]
+    sess = DummySession(data)
+    adapter_client.configure_cache({"events": 60})
+    try:
+
+        async def run():
+            for _ in range(3):
+                await fetch_events(
+                    "http://adapter", "cities/1", account_id=1, session=sess
+                )
+            await fetch_events("http://adapter", "cities/1", account_id=2, session=sess)
+            await fetch_writings("http://adapter", "1", account_id=1, session=sess)
+            await fetch_writings("http://adapter", "1", account_id=1, session=sess)
+
+        asyncio.run(run())
+    finally:
+        adapter_client.configure_cache(None)
+    # events cached per account; writings have no TTL so always fetched
+    assert sess.gets == 4
+
+
+class SlowResp(DummyResp):
+    async def json(self):
+        await asyncio.sleep(0.01)
+        return self._data
+
+
+class SlowSession(DummySession):
+    def get(self, url, params=None, headers=None):
+        super().get(url, params, headers)
+        return SlowResp(self.data)
+
+
+def test_response_cache_single_flight():
+    data = [{"id": 1, "nickname": "n", "status": "going", "comment": None}]
+    sess = SlowSession(data)
+    adapter_client.configure_cache({})
+    try:
+
+        async def run():
+            return await asyncio.gather(
+                *(
+                    fetch_attendees("http://adapter", "1", session=sess)
+                    for _ in range(5)
+                )
+            )
+
+        results = asyncio.run(run())
+    finally:
+        adapter_client.configure_cache(None)
+    assert sess.gets == 1
+    assert all(r == data for r in results)
+
+
+def test_response_cache_survives_cancelled_leader():
+    cache = adapter_client.ResponseCache({"events": 60})
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return ["A"], 10
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_fetch("events", "k", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("events", "k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await waiter
+        assert leader.cancelled()
+        return result
+
+    assert asyncio.run(run()) == ["A"]
+    assert cache.lookup("k") == ["A"] and not cache._inflight
+
+
+def test_response_cache_lru_eviction():
+    cache = adapter_client.ResponseCache({"events": 60}, max_entries=2, max_bytes=25)
+
+    def fetcher(value, size):
+        async def fetch():
+            return value, size
+
+        return fetch
+
+    async def run():
+        await cache.get_or_fetch("events", "a", fetcher("A", 10))
+        await cache.get_or_fetch("events", "b", fetcher("B", 10))
+        await cache.get_or_fetch("events", "a", fetcher("X", 10))  # hit, a is MRU
+        await cache.get_or_fetch("events", "c", fetcher("C", 10))  # evicts b
+        return await cache.get_or_fetch("events", "b", fetcher("B2", 10))
+
+    evictions = adapter_client.cache_evictions._value.get()
+    assert asyncio.run(run()) == "B2"
+    assert adapter_client.cache_evictions._value.get() - evictions == 2
+    assert len(cache._entries) == 2 and cache.bytes <= 25
+
+
+class ETagSession(DummySession):
+    etag = '"v1"'
+
+    def get(self, url, params=None, headers=None):
+        super().get(url, params, headers)
+        if headers.get("If-None-Match") == self.etag:
+            return DummyResp(None, status=304)
+        return DummyResp(self.data, headers={"ETag": self.etag})
+
+
+def test_conditional_get_reuses_page_on_304():
+    data = [{"id": 1, "sender": "s", "text": "hi", "sent": "now"}]
+    sess = ETagSession(data)
+
+    async def run():
+        with adapter_client.track_request() as outcome:
+            first = await fetch_messages("http://adapter", account_id=1, session=sess)
+        assert not outcome.reused
+        with adapter_client.track_request() as outcome:
+            second = await fetch_messages("http://adapter", account_id=1, session=sess)
+        assert outcome.reused
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert sess.headers["If-None-Match"] == '"v1"'
+    assert first == second == data
+    assert not first.not_modified and second.not_modified
+    assert first.version == second.version == '"v1"'
+
+
+def test_conditional_get_keeps_validator_per_watermark():
+    data = [{"id": 1, "sender": "s", "text": "hi", "sent": "now"}]
+    sess = ETagSession(data)
+    adapter_client._validators.clear()
+
+    async def fetch(since):
+        return await fetch_messages(
+            "http://adapter", account_id=1, session=sess, since=since
+        )
+
+    async def run():
+        first = await fetch(1)
+        assert "If-None-Match" not in sess.headers and not first.not_modified
+        # Unchanged watermark: the adapter answers 304.
+        repeat = await fetch(1)
+        assert sess.headers["If-None-Match"] == '"v1"' and repeat.not_modified
+        # Moved watermark: fetched in full, and its validator replaces the old.
+        moved = await fetch(2)
+        assert "If-None-Match" not in sess.headers and not moved.not_modified
+        assert (await fetch(2)).not_modified
+
+    asyncio.run(run())
+    # One validator per feed however far the watermark moves.
+    assert len(adapter_client._validators) == 1
+    assert next(iter(adapter_client._validators.values())).since == "2"
+
+
+class BatchSession(DummySession):
+    def __init__(self, data, status=200):
+        super().__init__(data)
+        self.status = status
+        self.posts = []
+        self.params = None
+
+    def get(self, url, params=None, headers=None):
+        self.params = params
+        return super().get(url, params, headers)
+
+    def post(self, url, json=None, headers=None):
+        self.posts.append((url, json))
+        resp = DummyResp(self.data, status=self.status)
+        resp.request_info = resp.history = None
+        if self.status >= 400:
+
+            def fail():
+                raise aiohttp.ClientResponseError(None, (), status=self.status)
+
+            resp.raise_for_status = fail
+        return resp
+
+
+def test_fetch_batch_returns_items_and_errors_per_target():
+    post = {"id": 1, "title": "t", "link": "l", "published": "now"}
+    sess = BatchSession(
+        {
+            "results": {"1": [post], "2": []},
+            "errors": {"3": {"status": 500, "error": "boom"}},
+        }
+    )
+    results = asyncio.run(
+        fetch_batch(
+            "http://adapter",
+            "group_posts",
+            ["1", "2", "3", "4"],
+            1,
+            session=sess,
+            since={"2": 7},
+        )
+    )
+    assert sess.posts == [
+        (
+            "http://adapter/batch/group_posts",
+            {"ids": ["1", "2", "3", "4"], "since": {"2": 7}},
+        )
+    ]
+    assert sess.gets == 0
+    assert results["1"] == [post] and results["2"] == []
+    assert results["3"].status == 500
+    assert results["4"].status == 502
+
+
+def test_fetch_batch_falls_back_to_single_requests():
+    data = [{"id": 1, "title": "t", "link": "l", "published": "now"}]
+    sess = BatchSession(data)
+    results = asyncio.run(
+        fetch_batch("http://adapter", "writings", ["1"], 1, sess, since={"1": 9})
+    )
+    assert results == {"1": data} and not sess.posts and sess.gets == 1
+    assert sess.params == {"since": "9"}
+
+    unsupported = BatchSession(data, status=404)
+
+    async def run():
+        first = await fetch_batch("http://a", "writings", ["1", "2"], 1, unsupported)
+        second = await fetch_batch("http://a", "writings", ["3", "4"], 1, unsupported)
+        await close_session()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == {"1": data, "2": data} and second == {"3": data, "4": data}
+    # The batch endpoint is not tried again once the adapter lacks it.
+    assert len(unsupported.posts) == 1 and unsupported.gets == 4
+
+
+class StreamContent:
+    def __init__(self, body: bytes, size: int):
+        self.chunks = [body[i : i + size] for i in range(0, len(body), size)]
+
+    async def iter_chunked(self, n):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class StreamSession(DummySession):
+    def __init__(self, body: bytes, size: int = 7):
+        super().__init__(None)
+        self.body = body
+        self.size = size
+        self.params = None
+
+    def get(self, url, params=None, headers=None):
+        self.params = params
+        resp = DummyResp(None)
+        resp.content = StreamContent(self.body, self.size)
+        return resp
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_array_decoder_handles_any_split():
+    data = [{"id": i, "text": "ü ,]"} for i in range(20)] + [12, None, "x"]
+    text = adapter_client.json.dumps(data)
+    for size in (1, 5, len(text)):
+        decoder = adapter_client.ArrayDecoder()
+        items = []
+        for i in range(0, len(text), size):
+            items += decoder.feed(text[i : i + size])
+        assert items + decoder.feed("", final=True) == data
+    for bad in ("[1 2]", "[1", "[1]x"):
+        decoder = adapter_client.ArrayDecoder()
+        try:
+            decoder.feed(bad, final=True)
+        except ValueError:
+            continue
+        raise AssertionError(bad)
+
+
+def test_array_decoder_bounds_pending_text():
+    decoder = adapter_client.ArrayDecoder(max_pending=10)
+    assert decoder.feed('[{"a": 1}, {"b": ') == [{"a": 1}]
+    try:
+        decoder.feed('"' + "x" * 20)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("oversized item accepted")
+
+
+def test_stream_feed_validates_items_incrementally(caplog):
+    data = [
+        {"id": i, "sender": "ä", "text": "t", "sent": "now"} for i in range(1, 4)
+    ] + [{"id": 9}]
+    sess = StreamSession(adapter_client.json.dumps(data).encode())
+    with caplog.at_level(logging.WARNING):
+        items = asyncio.run(
+            collect(
+                adapter_client.stream_feed(
+                    "http://adapter", "messages", "", session=sess, since=2
+                )
+            )
+        )
+    assert items == data[:3] + [{"id": 9}]
+    assert sess.params == {"since": "2"}
+    assert "adapter_schema_mismatch" in caplog.text
+
+
+def test_stream_feed_ignores_non_array(caplog):
+    sess = StreamSession(b'{"error": "down"}')
+    with caplog.at_level(logging.WARNING):
+        items = asyncio.run(
+            collect(
+                adapter_client.stream_feed(
+                    "http://adapter", "attendees", "1", session=sess
+                )
+            )
+        )
+    assert items == [] and "adapter_schema_mismatch" in caplog.text
@@ -1,6 +1,11 @@
 import asyncio
+from unittest.mock import patch
+
 import pytest
 
+from bot import adapter_client, main
+from bot.circuit_breaker import CircuitBreakerRegistry
+from bot.concurrency import AIMDLimiter
 from bot.main import adapter_request
 
 
@@ -16,3 +21,26 @@ def test_adapter_request_propagates_cancellation():
             await task
 
     asyncio.run(run())
+
+
+def test_reused_responses_do_not_feed_adaptive_limit():
+    cache = adapter_client.ResponseCache({"events": 60})
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return ["fresh"], 0
+
+    async def cached():
+        return await cache.get_or_fetch("events", "k", fetch)
+
+    limiter = AIMDLimiter(initial=4)
+    with (
+        patch.object(main, "adapter_concurrency", limiter),
+        patch.object(main, "adapter_breakers", CircuitBreakerRegistry(3, 300)),
+    ):
+        assert asyncio.run(adapter_request(cached)) == (["fresh"], True)
+        baseline = limiter.baseline
+        assert baseline is not None and baseline >= 0.01
+        for _ in range(5):
+            assert asyncio.run(adapter_request(cached)) == (["fresh"], True)
+    assert limiter.baseline == baseline
@@ -19,7 +19,7 @@ async def run_poll(db, sub_id: int, items: list[dict]):
     with (
         patch("bot.main.adapter_client.fetch_attendees", AsyncMock(return_value=items)),
         patch.object(main.bot, "get_channel", return_value=channel),
-        patch.object(main.bot.scheduler, "add_job"),
+        patch.object(main.bot.poller, "add_job"),
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
     ):
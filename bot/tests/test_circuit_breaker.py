@@ -1,7 +1,11 @@
 import time
 import pytest
 
-from bot.circuit_breaker import CircuitBreaker, CircuitBreakerOpen
+from bot.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpen,
+    CircuitBreakerRegistry,
+)
 
 
 def test_circuit_breaker_opens_and_resets():
@@ -15,3 +19,48 @@ def test_circuit_breaker_opens_and_resets():
     time.sleep(1.1)
     cb.before_call()
     assert not cb.is_open
+
+
+def test_half_open_allows_limited_probes():
+    cb = CircuitBreaker(max_failures=1, reset_timeout=0.05, half_open_max=2)
+    cb.record_failure()
+    assert cb.state == "open"
+    time.sleep(0.06)
+    assert cb.state == "half_open"
+    cb.before_call()
+    cb.before_call()
+    with pytest.raises(CircuitBreakerOpen):
+        cb.before_call()
+    cb.record_failure()
+    assert cb.state == "open"
+    time.sleep(0.06)
+    cb.before_call()
+    cb.record_success()
+    assert cb.state == "closed" and cb.failures == 0
+    cb.before_call()
+
+
+def test_registry_keeps_one_breaker_per_key():
+    registry = CircuitBreakerRegistry(max_failures=1, reset_timeout=60)
+    registry.get((1, "events")).record_failure()
+    assert registry.get((1, "events")).is_open
+    assert not registry.get((2, "events")).is_open
+    assert len(registry) == 2
+    assert [key for key, _ in registry.items()] == [(1, "events"), (2, "events")]
+
+
+def test_registry_evicts_least_recently_used_closed_breakers():
+    evicted = []
+    registry = CircuitBreakerRegistry(
+        max_failures=1, reset_timeout=60, max_breakers=2, on_evict=evicted.append
+    )
+    registry.get("open").record_failure()
+    registry.get("a")
+    registry.get("b")
+    # "open" is the least recently used but is kept while open.
+    assert evicted == ["a"] and len(registry) == 2
+    registry.get("b")
+    registry.get("c")
+    assert evicted == ["a", "b"]
+    assert [key for key, _ in registry.items()] == ["open", "c"]
+    assert registry.get("open").is_open
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bot.concurrency import AIMDLimiter
+
+
+def test_limit_grows_additively_and_halves_once_per_burst():
+    limiter = AIMDLimiter(initial=4, max_limit=8)
+    for _ in range(4):
+        limiter.on_success(0.1)
+    assert 4.9 < limiter.limit < 5
+    limiter.on_overload()
+    limiter.on_overload()
+    assert 2.4 < limiter.limit < 2.5
+    for _ in range(200):
+        limiter.on_success(0.1)
+    assert limiter.limit == 8
+
+
+def test_rising_latency_cuts_limit():
+    limiter = AIMDLimiter(initial=10)
+    for _ in range(50):
+        limiter.on_success(0.1)
+    grown = limiter.limit
+    limiter.on_success(2.0)
+    assert limiter.limit < grown / 1.9
+
+
+def test_admits_at_most_limit_callers_in_order():
+    peak = 0
+    order = []
+
+    async def call(limiter, n):
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.inflight)
+            order.append(n)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        limiter = AIMDLimiter(initial=2)
+        await asyncio.gather(*(call(limiter, n) for n in range(6)))
+        assert limiter.inflight == 0
+
+    asyncio.run(run())
+    assert peak == 2
+    assert order == list(range(6))
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bot.delivery import ChannelSender, embeds_per_message, pack_embeds
+
+
+def test_channels_deliver_concurrently_in_order():
+    log = []
+
+    def send(channel, n):
+        async def run():
+            log.append((channel, n, "start"))
+            await asyncio.sleep(0.01)
+            log.append((channel, n, "end"))
+
+        return run
+
+    async def run():
+        sender = ChannelSender()
+        counts = await asyncio.gather(
+            sender.deliver(1, [send(1, n) for n in range(3)]),
+            sender.deliver(1, [send(1, n) for n in range(3, 5)]),
+            sender.deliver(2, [send(2, n) for n in range(3)]),
+        )
+        assert sender.depth(1) == 0
+        return counts
+
+    assert asyncio.run(run()) == [3, 2, 3]
+    for channel, count in ((1, 5), (2, 3)):
+        events = [(n, step) for c, n, step in log if c == channel]
+        # One send at a time per channel, in queue order.
+        assert events == [(n, step) for n in range(count) for step in ("start", "end")]
+    # The second channel started before the first one finished.
+    assert log.index((2, 0, "start")) < log.index((1, 2, "end"))
+
+
+def test_failed_send_stops_its_batch_only():
+    sent = []
+
+    def send(n, fail=False):
+        async def run():
+            if fail:
+                raise RuntimeError("boom")
+            sent.append(n)
+
+        return run
+
+    async def run():
+        sender = ChannelSender()
+        first = asyncio.ensure_future(
+            sender.deliver(1, [send(0), send(1, fail=True), send(2)])
+        )
+        second = asyncio.ensure_future(sender.deliver(1, [send(3)]))
+        with pytest.raises(RuntimeError):
+            await first
+        assert await second == 1
+        assert sender.depth(1) == 0
+
+    asyncio.run(run())
+    assert sent == [0, 3]
+
+
+def test_pack_embeds_respects_count_and_size_limits():
+    assert pack_embeds([10] * 25, 10) == [range(0, 10), range(10, 20), range(20, 25)]
+    assert pack_embeds([10] * 3, 1) == [range(0, 1), range(1, 2), range(2, 3)]
+    assert pack_embeds([2500, 2500, 2500, 7000, 10], 10) == [
+        range(0, 2),
+        range(2, 3),
+        range(3, 4),
+        range(4, 5),
+    ]
+    assert pack_embeds([], 10) == []
+
+
+def test_embeds_per_message_setting():
+    assert embeds_per_message({}) == 1
+    assert embeds_per_message({"embeds_per_message": "10"}) == 10
+    assert embeds_per_message({"embeds_per_message": 50}) == 10
+    assert embeds_per_message({"embeds_per_message": "on"}) == 1
@@ -0,0 +1,40 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bot import digest
+
+
+def test_parse_window_normalizes_and_rejects():
+    assert digest.parse_window(" 15M ") == "15m"
+    assert digest.parse_window("9:05") == "09:05"
+    for bad in ("0m", "15", "25:00", "daily"):
+        with pytest.raises(ValueError):
+            digest.parse_window(bad)
+
+
+def test_window_start_for_intervals_and_daily():
+    now = datetime(2025, 1, 2, 10, 7, 30)
+    assert digest.window_start("15m", now) == datetime(2025, 1, 2, 10, 0)
+    assert digest.window_start("2h", now) == datetime(2025, 1, 2, 10, 0)
+    assert digest.window_start("09:00", now) == datetime(2025, 1, 2, 9, 0)
+    assert digest.window_start("11:30", now) == datetime(2025, 1, 1, 11, 30)
+
+
+def test_render_summarizes_and_truncates():
+    items = [{"nickname": f"n{i}", "status": "going"} for i in range(3)]
+    embed = digest.render("attendees", items)
+    assert embed.title == "3 new attendees"
+    assert embed.description.splitlines() == [
+        "• n0 (going)",
+        "• n1 (going)",
+        "• n2 (going)",
+    ]
+    many = [{"title": "x" * 100, "link": "https://e/1"} for _ in range(200)]
+    embed = digest.render("events", many)
+    assert len(embed.description) <= digest.MAX_DESCRIPTION
+    assert embed.description.endswith("more")
@@ -0,0 +1,313 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import discord
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bot import feeds, main, models, storage  # noqa: E402
+from bot.feeds import FeedBatcher, FeedCoalescer, feed_key  # noqa: E402
+from bot.poll_scheduler import PollScheduler  # noqa: E402
+
+
+def test_feed_key_ignores_inbox_target():
+    assert feed_key("messages", "inbox", 1) == feed_key("messages", "", 1)
+    assert feed_key("events", "a", 1) != feed_key("events", "b", 1)
+
+
+def test_coalescer_shares_result_once_per_consumer():
+    fetcher = AsyncMock(return_value=([{"id": 1}], True))
+    coalescer = FeedCoalescer()
+    key = feed_key("events", "cities/1", None)
+
+    async def run():
+        first = await coalescer.fetch(key, 1, fetcher)
+        second = await coalescer.fetch(key, 2, fetcher)
+        third = await coalescer.fetch(key, 1, fetcher)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third == ([{"id": 1}], True)
+    assert fetcher.await_count == 2
+
+
+def test_coalescer_single_flight_and_failures_not_cached():
+    calls = 0
+
+    async def fetcher():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return [], False
+
+    coalescer = FeedCoalescer()
+    key = feed_key("writings", "1", None)
+
+    async def run():
+        results = await asyncio.gather(
+            *(coalescer.fetch(key, i, fetcher) for i in range(5))
+        )
+        await coalescer.fetch(key, 6, fetcher)
+        return results
+
+    results = asyncio.run(run())
+    assert results == [([], False)] * 5
+    assert calls == 2
+
+
+def test_coalescer_window_is_fixed_and_expired_entries_pruned():
+    fetcher = AsyncMock(return_value=([{"id": 1}], True))
+    coalescer = FeedCoalescer(window=30)
+    clock = [1000.0]
+
+    async def run():
+        for i, target in enumerate(("a", "b", "c")):
+            await coalescer.fetch(feed_key("events", target, None), i, fetcher)
+        clock[0] += 31
+        # Past the window a page is stale, whatever the poll interval.
+        await coalescer.fetch(feed_key("events", "a", None), 9, fetcher)
+
+    with patch.object(time, "monotonic", lambda: clock[0]):
+        asyncio.run(run())
+    assert fetcher.await_count == 4
+    assert list(coalescer._entries) == [feed_key("events", "a", None)]
+
+
+def test_coalescer_shares_fetch_across_watermarks():
+    calls = []
+
+    async def fetcher(since):
+        calls.append(since)
+        return [{"id": str(n)} for n in range(1, 8) if since is None or n > since], True
+
+    coalescer = FeedCoalescer()
+    key = feed_key("group_posts", "9", None)
+
+    async def run():
+        first = await coalescer.fetch(key, 1, lambda: fetcher(5), since=5)
+        # A subscription at a higher watermark filters the shared page.
+        second = await coalescer.fetch(key, 2, lambda: fetcher(6), since=6)
+        # One below it would miss item 5, so it fetches on its own.
+        third = await coalescer.fetch(key, 3, lambda: fetcher(4), since=4)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert calls == [5, 4]
+    assert second == first
+    assert [i["id"] for i in third[0]] == ["5", "6", "7"]
+
+
+def test_batcher_groups_targets_and_reports_errors_per_target():
+    calls = []
+
+    async def fetch_batch(sub_type, targets, account_id, since):
+        calls.append((sub_type, targets, account_id, since))
+        return {t: ValueError(t) if t == "bad" else [{"id": t}] for t in targets}
+
+    batcher = FeedBatcher(fetch_batch, window=0.05, max_size=3)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.fetch("writings", "1", 1, since=5),
+            batcher.fetch("writings", "2", 1),
+            batcher.fetch("writings", "bad", 1),
+            batcher.fetch("writings", "3", 1, since=7),
+            batcher.fetch("writings", "1", 1, since=3),
+            batcher.fetch("writings", "4", 2),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert results[:2] == [[{"id": "1"}], [{"id": "2"}]]
+    assert isinstance(results[2], ValueError)
+    assert results[3:] == [[{"id": "3"}], [{"id": "1"}], [{"id": "4"}]]
+    # The first group was sent when full, the rest after the window.
+    assert calls == [
+        ("writings", ["1", "2", "bad"], 1, {"1": 5}),
+        ("writings", ["3", "1"], 1, {"3": 7, "1": 3}),
+        ("writings", ["4"], 2, {}),
+    ]
+
+
+def test_batcher_fails_every_target_of_a_failed_batch():
+    fetch_batch = AsyncMock(side_effect=RuntimeError("down"))
+    batcher = FeedBatcher(fetch_batch, window=0.01)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.fetch("group_posts", "1"),
+            batcher.fetch("group_posts", "2"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    fetch_batch.assert_awaited_once_with("group_posts", ["1", "2"], None, {})
+
+
+def test_batcher_cancelled_send_releases_callers():
+    started = asyncio.Event()
+
+    async def fetch_batch(sub_type, targets, account_id, since):
+        started.set()
+        await asyncio.sleep(60)
+
+    batcher = FeedBatcher(fetch_batch, window=0.01)
+
+    async def run():
+        callers = asyncio.gather(
+            batcher.fetch("writings", "1"),
+            batcher.fetch("writings", "2"),
+            return_exceptions=True,
+        )
+        await started.wait()
+        for task in batcher._tasks:
+            task.cancel()
+        return await asyncio.wait_for(callers, 1)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+
+def test_next_watermark_stops_below_missed_items():
+    assert feeds.next_watermark(None, ["3", "9", "x"], []) == 9
+    assert feeds.next_watermark(4, ["3"], []) == 4
+    # Item 6 failed to send: 7 and 9 must be fetched again with it.
+    assert feeds.next_watermark(4, ["5", "7", "9"], ["6"]) == 5
+    assert feeds.next_watermark(None, [], ["6"]) is None
+
+
+def test_poll_adapter_fans_out_one_fetch_to_all_channels():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_a = storage.add_subscription(db, 1, "events", "location:cities/1")
+    sub_b = storage.add_subscription(db, 2, "events", "location:cities/1")
+    items = [{"id": "1", "title": "t", "link": "l"}]
+    fetch = AsyncMock(return_value=items)
+    channels = {
+        1: AsyncMock(spec=discord.abc.Messageable),
+        2: AsyncMock(spec=discord.abc.Messageable),
+    }
+
+    async def run():
+        with (
+            patch("bot.main.adapter_client.fetch_events", fetch),
+            patch.object(main.bot, "get_channel", side_effect=channels.get),
+            patch.object(main.bot.poller, "add_job"),
+            patch("bot.main.bot_bucket.acquire", AsyncMock()),
+            patch("bot.main.bot_tokens.set"),
+        ):
+            await main.poll_adapter(db, sub_a, {"interval": 60})
+            await main.poll_adapter(db, sub_b, {"interval": 60})
+
+    asyncio.run(run())
+    assert fetch.await_count == 1
+    channels[1].send.assert_called_once()
+    channels[2].send.assert_called_once()
+    assert db.query(models.RelayLog).count() == 2
+
+
+def test_phase_offset_is_stable_and_bounded():
+    key = feeds.feed_key("events", "cities/1", None)
+    offset = feeds.phase_offset(key, 60)
+    assert 0 <= offset < 60
+    assert feeds.phase_offset(key, 60) == offset
+    offsets = {
+        feeds.phase_offset(feeds.feed_key("events", f"cities/{i}", None), 60)
+        for i in range(50)
+    }
+    assert len(offsets) == 50
+
+
+def test_stagger_report_flags_thundering_herd():
+    herd = feeds.stagger_report([1.0] * 20, capacity=5, rate=1)
+    spread = feeds.stagger_report([i * 3.0 for i in range(20)], capacity=5, rate=1)
+    assert herd == (16.0, 20)
+    assert spread == (57.0, 1)
+
+
+def test_interval_controller_backs_off_quiet_feeds():
+    controller = feeds.IntervalController(min_interval=60, max_interval=3600)
+    interval, rate = 60, None
+    seen = []
+    for _ in range(10):
+        interval, rate = controller.update(interval, rate, 0)
+        seen.append(interval)
+    assert seen == [120, 240, 480, 960, 1920, 3600, 3600, 3600, 3600, 3600]
+
+
+def test_interval_controller_tightens_on_burst():
+    controller = feeds.IntervalController(min_interval=60, max_interval=3600)
+    interval, rate = controller.update(3600, 0.0, 12)
+    assert interval == 960
+    interval, rate = controller.update(interval, rate, 20)
+    assert interval == 120
+    # Two items per two-minute poll: one a minute calls for the shortest interval.
+    interval, rate = controller.update(interval, rate, 2)
+    assert interval == 60
+    for _ in range(5):
+        interval, rate = controller.update(interval, rate, 1)
+    assert interval == 60
+
+
+def test_push_tracker_stretches_interval_until_pushes_stop():
+    tracker = feeds.PushTracker(reconcile_interval=900)
+    key = feed_key("group_posts", "9", None)
+    assert tracker.interval(key, 60, now=0) == 60
+    tracker.record(key, now=0)
+    assert tracker.interval(key, 60, now=100) == 900
+    assert tracker.interval(key, 3600, now=100) == 3600
+    assert tracker.interval(key, 60, now=1800) == 60
+    assert not tracker.active(key, now=0)
+
+
+def test_schedule_subscriptions_spreads_first_polls():
+    db = storage.init_db("sqlite:///:memory:")
+    for i in range(20):
+        storage.add_subscription(db, 1, "events", f"cities/{i}")
+    storage.add_subscription(db, 2, "events", "cities/0")
+    queries = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *a: queries.append(1))
+    poller = PollScheduler()
+    with (
+        patch.object(main.bot, "db", db),
+        patch.object(main.bot, "poller", poller),
+    ):
+        steady, peak = main.bot.schedule_subscriptions()
+    # One query for the subscriptions and one for their saved backoff state.
+    assert len(queries) == 2
+    assert poller.depth == 21
+    run_at = sorted(job.run_at for job in poller.get_jobs())
+    assert run_at[-1] - run_at[0] > 30
+    assert peak < 5
+    assert steady < 62
+
+
+def test_schedule_subscriptions_restores_paused_subscription():
+    db = storage.init_db("sqlite:///:memory:")
+    paused = storage.add_subscription(db, 1, "events", "cities/1")
+    storage.add_subscription(db, 1, "events", "cities/2")
+    pause_end = time.time() + 600
+    states = storage.SubscriptionStates()
+    states.record(
+        paused,
+        {"failures": 3, "backoff": 240, "paused_until": pause_end, "notified": True},
+    )
+    states.flush(db)
+    poller = PollScheduler()
+    with (
+        patch.object(main.bot, "db", db),
+        patch.object(main.bot, "poller", poller),
+        patch.object(main, "subscription_states", storage.SubscriptionStates()),
+        patch.dict(main.bot.sub_status, clear=True),
+    ):
+        main.bot.schedule_subscriptions()
+        status = dict(main.bot.sub_status)
+    job = poller.get_job(str(paused))
+    assert job.args[2]["failures"] == 3
+    assert job.args[2]["notified"] is True
+    assert job.run_at - time.monotonic() > 590
+    assert status[paused]["failures"] == 3
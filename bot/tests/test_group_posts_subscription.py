@@ -37,7 +37,7 @@ async def run_poll(db, sub_id: int, items: list[dict]):
             "bot.main.adapter_client.fetch_group_posts", AsyncMock(return_value=items)
         ),
         patch.object(main.bot, "get_channel", return_value=channel),
-        patch.object(main.bot.scheduler, "add_job"),
+        patch.object(main.bot.poller, "add_job"),
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
     ):
@@ -57,7 +57,7 @@ def test_fl_subscribe_group_posts_validates_target():
     assert interaction.response.message == "Target must be group:<id>"
     interaction.response.message = None
     with (
-        patch.object(main.bot.scheduler, "add_job") as add_job,
+        patch.object(main.bot.poller, "add_job") as add_job,
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
     ):
@@ -0,0 +1,77 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import discord
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot import feeds, main, models, storage
+from bot.circuit_breaker import CircuitBreakerRegistry
+
+POST = {
+    "id": 7,
+    "title": "Topic",
+    "link": "https://fetlife.com/groups/9/group_posts/7",
+    "published": "2024-03-01T00:00:00Z",
+}
+
+
+async def push(db, body, token="push-token"):
+    app = main.create_management_app(db, CircuitBreakerRegistry(1, 60))
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    try:
+        resp = await client.post(
+            "/ingest", json=body, headers={"Authorization": f"Bearer {token}"}
+        )
+        return resp.status, await resp.json()
+    finally:
+        await client.close()
+
+
+def test_ingest_relays_pushed_items_once(monkeypatch):
+    monkeypatch.setattr(main, "INGEST_TOKEN", "push-token")
+    db = storage.init_db("sqlite:///:memory:")
+    first = storage.add_subscription(db, 1, "group_posts", "group:9")
+    second = storage.add_subscription(db, 2, "group_posts", "group:9")
+    storage.add_subscription(db, 3, "group_posts", "group:10")
+    channel = AsyncMock(spec=discord.abc.Messageable)
+    channel.send = AsyncMock()
+    body = {"feeds": [{"type": "group_posts", "target_id": "9", "items": [POST]}]}
+
+    with (
+        patch.object(main.bot, "get_channel", return_value=channel),
+        patch("bot.main.bot_bucket.acquire", AsyncMock()),
+    ):
+        assert asyncio.run(push(db, body)) == (200, {"feeds": 1, "relayed": 2})
+        # A repeated push, or the reconciliation poll, finds them relayed.
+        assert asyncio.run(push(db, body)) == (200, {"feeds": 1, "relayed": 0})
+    assert channel.send.call_count == 2
+    assert {r.subscription_id for r in db.query(models.RelayLog)} == {first, second}
+    assert main.push_tracker.active(feeds.feed_key("group_posts", "9", None))
+
+
+def test_ingest_rejects_bad_token_and_body(monkeypatch):
+    db = storage.init_db("sqlite:///:memory:")
+    body = {"feeds": []}
+    monkeypatch.setattr(main, "INGEST_TOKEN", "")
+    assert asyncio.run(push(db, body))[0] == 404
+    monkeypatch.setattr(main, "INGEST_TOKEN", "push-token")
+    assert asyncio.run(push(db, body, token="wrong"))[0] == 401
+    bad = {"feeds": [{"type": "nope", "items": []}]}
+    assert asyncio.run(push(db, bad))[0] == 400
+    assert asyncio.run(push(db, {"feeds": [{"type": "messages"}]}))[0] == 400
+
+
+def test_pushed_feed_polls_at_reconcile_interval(monkeypatch):
+    monkeypatch.setattr(main, "push_tracker", feeds.PushTracker(900))
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "group_posts", "group:9")
+    main.push_tracker.record(feeds.feed_key("group_posts", "9", None))
+    data = {"interval": 60}
+    with (
+        patch.object(main, "fetch_feed", AsyncMock(return_value=([], True))),
+        patch.object(main.bot, "get_channel", return_value=None),
+        patch.object(main.bot.poller, "add_job"),
+    ):
+        asyncio.run(main.poll_adapter(db, sub_id, data))
+    assert data["interval"] == 120 and data["backoff"] == 900
@@ -0,0 +1,53 @@
+import os
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from bot import adapter_client, main, storage
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("MOCK_ADAPTER") != "1", reason="requires mock adapter"
+)
+
+
+def test_batch_fetch_reports_each_target():
+    async def run():
+        try:
+            return await adapter_client.fetch_batch(
+                main.ADAPTER_BASE_URL, "writings", ["1", "2", "missing"]
+            )
+        finally:
+            await adapter_client.close_session()
+
+    results = asyncio.run(run())
+    assert len(results["1"]) == len(results["2"]) == 1
+    assert results["missing"].status == 404
+
+
+def test_due_group_posts_share_one_batch():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_ids = [
+        storage.add_subscription(db, 1, "group_posts", f"group:{i}") for i in range(3)
+    ]
+    channel = AsyncMock()
+    channel.send = AsyncMock()
+    fetch_batch = AsyncMock(wraps=adapter_client.fetch_batch)
+
+    async def run():
+        try:
+            await asyncio.gather(
+                *(main.poll_adapter(db, sid, {"interval": 60}) for sid in sub_ids)
+            )
+        finally:
+            await adapter_client.close_session()
+
+    with (
+        patch.object(main.bot, "get_channel", return_value=channel),
+        patch("bot.main.bot_bucket.acquire", AsyncMock()),
+        patch("bot.main.bot_tokens.set"),
+        patch("bot.main.adapter_client.fetch_batch", fetch_batch),
+    ):
+        asyncio.run(run())
+    fetch_batch.assert_awaited_once()
+    assert channel.send.call_count == 3
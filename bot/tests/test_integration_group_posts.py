@@ -28,3 +28,27 @@ async def run_poll():
 def test_group_posts_flow():
     channel = asyncio.run(run_poll())
     channel.send.assert_called_once()
+
+
+def test_group_posts_since_watermark():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "group_posts", "group:2")
+    channel = AsyncMock()
+    channel.send = AsyncMock()
+    data = {"interval": 60}
+    get_list = AsyncMock(wraps=main.adapter_client._get_list)
+
+    async def run():
+        for _ in range(2):
+            await main.poll_adapter(db, sub_id, data)
+
+    with (
+        patch.object(main.bot, "get_channel", return_value=channel),
+        patch("bot.main.bot_bucket.acquire", AsyncMock()),
+        patch("bot.main.bot_tokens.set"),
+        patch("bot.main.adapter_client._get_list", get_list),
+    ):
+        asyncio.run(run())
+    assert data["since"] == 3
+    assert get_list.await_args.kwargs["params"] == {"since": "3"}
+    channel.send.assert_called_once()
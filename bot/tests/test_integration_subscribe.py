@@ -24,7 +24,7 @@ async def run_flow():
     main.fetlife_requests._value.set(0)
     main.bot.db = storage.init_db("sqlite:///:memory:")
     interaction = DummyInteraction()
-    with patch.object(main.bot.scheduler, "add_job") as add_job:
+    with patch.object(main.bot.poller, "add_job") as add_job:
         await main.fl_subscribe.callback(interaction, "events", "cities/1")
         add_job.assert_called_once()
         _, kwargs = add_job.call_args
@@ -23,7 +23,7 @@ def test_fl_subscribe_invalid_json():
     async def run():
         main.bot.db = storage.init_db("sqlite:///:memory:")
         interaction = DummyInteraction()
-        with patch.object(main.bot.scheduler, "add_job") as add_job:
+        with patch.object(main.bot.poller, "add_job") as add_job:
             await main.fl_subscribe.callback(
                 interaction, "events", "cities/1", filters="{bad"
             )
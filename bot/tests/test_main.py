@@ -4,6 +4,7 @@ import sys
 import io
 import json
 import logging
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from bot.main import JsonFormatter
 
@@ -35,3 +36,18 @@ def test_json_formatter_outputs_extra_fields():
     data = json.loads(output)
     assert data["correlation_id"] == "123"
     assert "msg" not in data
+
+
+def test_run_bot_disposes_async_engine(monkeypatch):
+    m = importlib.import_module("bot.main")
+    monkeypatch.setattr(m, "TOKEN", "x")
+    dispose = AsyncMock()
+    with (
+        patch.object(m.web, "TCPSite", MagicMock(return_value=AsyncMock())),
+        patch.object(m.bot, "start", AsyncMock()),
+        patch.object(m.bot, "bridge", None),
+        patch.object(m, "flush_subscription_states", AsyncMock()),
+        patch.object(m.storage, "dispose_async_db", dispose),
+    ):
+        m.asyncio.run(m.run_bot())
+    dispose.assert_awaited_once_with(m.bot.sessions)
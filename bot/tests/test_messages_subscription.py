@@ -24,7 +24,7 @@ async def run_poll(db, sub_id: int, items: list[dict]):
         patch("bot.main.adapter_client.fetch_messages", AsyncMock(return_value=items)),
         patch.object(main.bot, "get_channel", return_value=channel),
         patch.object(main.bot.bridge, "send_to_telegram", AsyncMock()) as tg_send,
-        patch.object(main.bot.scheduler, "add_job"),
+        patch.object(main.bot.poller, "add_job"),
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
     ):
@@ -6,19 +6,31 @@ from unittest.mock import AsyncMock, patch
 
 import aiohttp
 import discord
+from sqlalchemy import event
 import time
+from datetime import timedelta
 from types import SimpleNamespace
 
 os.environ.setdefault("TELEGRAM_API_ID", "1")
 os.environ.setdefault("TELEGRAM_API_HASH", "hash")
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 from bot import main, storage, models  # noqa: E402
+from bot.concurrency import AIMDLimiter  # noqa: E402
+from bot.rate_limit import LearnedRateLimits  # noqa: E402
 
 
 async def run_poll(
-    db, sub_id, items, data, fetch_fn="fetch_events", error=False, channel=None
+    db,
+    sub_id,
+    items,
+    data,
+    fetch_fn="fetch_events",
+    error=False,
+    channel=None,
+    fetch_mock=None,
 ):
-    fetch_mock = AsyncMock(return_value=items)
+    if fetch_mock is None:
+        fetch_mock = AsyncMock(return_value=items)
     if error:
         fetch_mock = AsyncMock(side_effect=aiohttp.ClientError())
     if channel is None:
@@ -27,7 +39,7 @@ async def run_poll(
     with (
         patch(f"bot.main.adapter_client.{fetch_fn}", fetch_mock),
         patch.object(main.bot, "get_channel", return_value=channel),
-        patch.object(main.bot.scheduler, "add_job"),
+        patch.object(main.bot.poller, "add_job"),
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
     ):
@@ -62,6 +74,402 @@ def test_poll_adapter_dedupes_and_updates_cursor():
     assert channel.send.call_count == 1
 
 
+def test_poll_adapter_with_async_sessions(tmp_path):
+    url = f"sqlite:///{tmp_path}/async.db"
+    db = storage.init_db(url)
+    sub_id = storage.add_subscription(db, 1, "events", "cities/1")
+    items = [{"id": "1", "title": "t", "link": "l", "time": "now"}]
+
+    async def run():
+        sessions = storage.init_async_db(url)
+        channel = await run_poll(sessions, sub_id, items, {"interval": 60})
+        await sessions.kw["bind"].dispose()
+        return channel
+
+    channel = asyncio.run(run())
+    assert channel.send.await_count == 1
+    assert db.query(models.RelayLog).count() == 1
+
+
+def test_poll_adapter_holds_no_connection_across_network_waits(tmp_path):
+    url = f"sqlite:///{tmp_path}/pool.db"
+    db = storage.init_db(url)
+    sub_id = storage.add_subscription(db, 1, "events", "cities/1")
+    items = [{"id": "1", "title": "t", "link": "l", "time": "now"}]
+    checked_out: list[int] = []
+
+    async def run():
+        sessions = storage.init_async_db(url)
+        pool = sessions.kw["bind"].pool
+
+        async def fetch(*args, **kwargs):
+            checked_out.append(pool.checkedout())
+            return items
+
+        async def send(*args, **kwargs):
+            checked_out.append(pool.checkedout())
+
+        channel = AsyncMock(spec=discord.abc.Messageable)
+        channel.send = AsyncMock(side_effect=send)
+        await run_poll(
+            sessions, sub_id, [], {"interval": 60}, channel=channel, fetch_mock=fetch
+        )
+        await sessions.kw["bind"].dispose()
+
+    asyncio.run(run())
+    assert checked_out == [0, 0]
+    assert db.query(models.RelayLog).count() == 1
+
+
+def test_poll_adapter_adapts_interval_to_new_items():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/7")
+    data = {"interval": 240, "item_rate": 0.0}
+    asyncio.run(run_poll(db, sub_id, [], data))
+    assert data["interval"] == 480
+    items = [{"id": str(i), "title": "t", "link": "l"} for i in range(30)]
+    asyncio.run(run_poll(db, sub_id, items, data))
+    assert data["interval"] == 60
+    assert main.bot.sub_status[sub_id]["interval"] == 60
+
+
+def test_poll_adapter_batches_embeds_when_enabled():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "attendees", "event:2")
+    storage.set_channel_settings(db, 1, embeds_per_message="10")
+    items = [{"id": str(i), "nickname": f"n{i}", "status": "going"} for i in range(25)]
+    channel = asyncio.run(
+        run_poll(db, sub_id, items, {"interval": 60}, fetch_fn="fetch_attendees")
+    )
+    sizes = [len(call.kwargs["embeds"]) for call in channel.send.call_args_list]
+    assert sizes == [10, 10, 5]
+    assert db.query(models.RelayLog).count() == 25
+
+
+def test_digest_buffers_items_and_flushes_once_per_window():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "attendees", "event:3")
+    assert storage.set_subscription_digest(db, sub_id, 1, "15m")
+    items = [{"id": str(i), "nickname": f"n{i}", "status": "going"} for i in range(30)]
+    channel = asyncio.run(
+        run_poll(db, sub_id, items, {"interval": 60}, fetch_fn="fetch_attendees")
+    )
+    asyncio.run(
+        run_poll(
+            db,
+            sub_id,
+            items,
+            {"interval": 60},
+            fetch_fn="fetch_attendees",
+            channel=channel,
+        )
+    )
+    channel.send.assert_not_called()
+    assert db.query(models.DigestItem).count() == 30
+    buffered = db.query(models.DigestItem).first().created_at
+    with (
+        patch.object(main.bot, "sessions", db),
+        patch.object(main.bot, "get_channel", return_value=channel),
+        patch("bot.main.bot_bucket.acquire", AsyncMock()),
+        patch("bot.main.bot_tokens.set"),
+    ):
+        assert asyncio.run(main.flush_digests(buffered)) == 0
+        later = buffered + timedelta(minutes=15)
+        assert asyncio.run(main.flush_digests(later)) == 1
+        assert asyncio.run(main.flush_digests(later)) == 0
+    embed = channel.send.call_args.kwargs["embed"]
+    assert embed.title == "30 new attendees"
+    assert db.query(models.DigestItem).count() == 0
+
+
+def test_digest_sends_outside_sessions_and_drops_orphaned_items(tmp_path):
+    url = f"sqlite:///{tmp_path}/digest.db"
+    db = storage.init_db(url)
+    kept = storage.add_subscription(db, 1, "attendees", "event:4")
+    gone = storage.add_subscription(db, 2, "attendees", "event:5")
+    for sub_id, channel_id in ((kept, 1), (gone, 2)):
+        assert storage.set_subscription_digest(db, sub_id, channel_id, "15m")
+        db.add(models.DigestItem(subscription_id=sub_id, item_id="1", payload_json={}))
+    db.commit()
+    buffered = db.query(models.DigestItem).first().created_at
+    checked_out: list[int] = []
+
+    async def run(now):
+        sessions = storage.init_async_db(url)
+        pool = sessions.kw["bind"].pool
+
+        async def send(*args, **kwargs):
+            checked_out.append(pool.checkedout())
+
+        channel = AsyncMock(spec=discord.abc.Messageable)
+        channel.send = AsyncMock(side_effect=send)
+        with (
+            patch.object(main.bot, "sessions", sessions),
+            patch.object(
+                main.bot,
+                "get_channel",
+                side_effect=lambda c: channel if c == 1 else None,
+            ),
+            patch("bot.main.bot_bucket.acquire", AsyncMock()),
+            patch("bot.main.bot_tokens.set"),
+        ):
+            sent = await main.flush_digests(now)
+        await sessions.kw["bind"].dispose()
+        return sent
+
+    assert asyncio.run(run(buffered + timedelta(minutes=15))) == 1
+    assert checked_out == [0]
+    # The missing channel's items are kept until they age out.
+    assert db.query(models.DigestItem).count() == 1
+    late = buffered + timedelta(seconds=main.DIGEST_ORPHAN_AGE + 1)
+    assert asyncio.run(run(late)) == 0
+    assert db.query(models.DigestItem).count() == 0
+
+
+def test_rate_limited_send_pauses_channel():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/9")
+    channel = AsyncMock(spec=discord.abc.Messageable)
+    channel.send = AsyncMock(side_effect=discord.RateLimited(5.0))
+    limits = LearnedRateLimits(5, 1)
+    items = [{"id": "1", "title": "t", "link": "l"}]
+    with patch.object(main, "channel_limits", limits):
+        asyncio.run(run_poll(db, sub_id, items, {"interval": 60}, channel=channel))
+    assert not limits.try_acquire(1)
+    assert storage.filter_unrelayed(db, sub_id, ["1"]) == ["1"]
+
+
+def test_adapter_request_backs_off_on_server_errors():
+    limiter = AIMDLimiter(initial=8)
+    error = aiohttp.ClientResponseError(None, (), status=503)
+    with (
+        patch.object(main, "adapter_concurrency", limiter),
+        patch.object(main, "adapter_breakers", main.CircuitBreakerRegistry(3, 300)),
+    ):
+        result = asyncio.run(
+            main.adapter_request(AsyncMock(side_effect=error), fallback=[])
+        )
+        assert result == ([], False)
+        assert limiter.limit == 4
+        asyncio.run(main.adapter_request(AsyncMock(return_value=[1])))
+    assert limiter.limit == 4.25
+
+
+def test_adapter_breakers_are_keyed_by_account_and_endpoint():
+    breakers = main.CircuitBreakerRegistry(1, 300)
+    failing = AsyncMock(side_effect=aiohttp.ClientResponseError(None, (), status=500))
+    working = AsyncMock(return_value=[1])
+    with patch.object(main, "adapter_breakers", breakers):
+        for _ in range(2):
+            asyncio.run(
+                main.adapter_request(
+                    failing, account_id=1, endpoint="group_posts", fallback=[]
+                )
+            )
+        assert asyncio.run(
+            main.adapter_request(working, account_id=1, endpoint="events")
+        ) == ([1], True)
+        assert asyncio.run(
+            main.adapter_request(working, account_id=2, endpoint="group_posts")
+        ) == ([1], True)
+    assert failing.await_count == 1
+    assert breakers.get((1, "group_posts")).state == "open"
+    assert breakers.get((1, "events")).state == "closed"
+    assert main.breaker_state.labels("1", "group_posts")._value.get() == 1
+
+
+def test_fetch_feed_breakers_are_keyed_by_target():
+    breakers = main.CircuitBreakerRegistry(3, 300)
+    error = aiohttp.ClientResponseError(None, (), status=500)
+
+    async def fetch(base_url, target, **kwargs):
+        if target == "cities/bad":
+            raise error
+        return [{"id": "1"}]
+
+    with (
+        patch.object(main, "adapter_breakers", breakers),
+        patch.object(main.adapter_client, "fetch_events", fetch),
+        patch("bot.main.adapter_bucket.acquire", AsyncMock()),
+    ):
+        for _ in range(3):
+            assert asyncio.run(main.fetch_feed("events", "cities/bad", 1)) == (
+                [],
+                False,
+            )
+        assert asyncio.run(main.fetch_feed("events", "cities/2", 1))[1]
+    assert breakers.get((1, "events/cities/bad")).state == "open"
+    assert breakers.get((1, "events/cities/2")).state == "closed"
+
+
+def test_poll_adapter_tracks_high_watermark():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/3")
+    data = {"interval": 60}
+    items = [{"id": str(i), "title": "t", "link": "l"} for i in (3, 1, 2)]
+    asyncio.run(run_poll(db, sub_id, items, data))
+    assert data["since"] == 3
+    assert storage.list_all_subscriptions(db)[0][-1] == 3
+
+    fetch = AsyncMock(return_value=items + [{"id": "4", "title": "t", "link": "l"}])
+    lookups: list[list[str]] = []
+    real_filter = storage.filter_unrelayed
+
+    def filter_unrelayed(db, sub_id, ids):
+        lookups.append(ids)
+        return real_filter(db, sub_id, ids)
+
+    with patch.object(storage, "filter_unrelayed", filter_unrelayed):
+        channel = asyncio.run(run_poll(db, sub_id, [], data, fetch_mock=fetch))
+    assert fetch.await_args.kwargs["since"] == 3
+    # Items at or below the watermark never reach the relay_log lookup.
+    assert lookups == [["4"]]
+    assert channel.send.call_count == 1
+    assert data["since"] == 4
+
+
+def test_failed_send_holds_back_watermark():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/4")
+    data = {"interval": 60, "since": 4}
+    channel = AsyncMock(spec=discord.abc.Messageable)
+    channel.send = AsyncMock(side_effect=[None, RuntimeError("down")])
+    items = [{"id": str(i), "title": "t", "link": "l"} for i in (5, 6, 7)]
+    asyncio.run(run_poll(db, sub_id, items, data, channel=channel))
+    assert data["since"] == 5
+    assert storage.filter_unrelayed(db, sub_id, ["6", "7"]) == ["6", "7"]
+
+
+def test_poll_adapter_applies_subscription_filters():
+    db = storage.init_db("sqlite:///:memory:")
+    filters = {"keywords": ["rope"], "min_attendees": 5}
+    sub_id = storage.add_subscription(db, 1, "events", "cities/5", filters)
+    data = {"interval": 60}
+    items = [
+        {"id": "1", "title": "Rope Night", "link": "l", "attendees": 10},
+        {"id": "2", "title": "Munch", "link": "l", "attendees": 10},
+        {"id": "3", "title": "Rope 101", "link": "l", "attendees": 2},
+    ]
+    lookups: list[list[str]] = []
+    real_filter = storage.filter_unrelayed
+
+    def filter_unrelayed(db, sub_id, ids):
+        lookups.append(ids)
+        return real_filter(db, sub_id, ids)
+
+    with patch.object(storage, "filter_unrelayed", filter_unrelayed):
+        channel = asyncio.run(run_poll(db, sub_id, items, data))
+    # Filtered items never reach the relay_log lookup, a write or a send.
+    assert lookups == [["1"]]
+    assert channel.send.call_count == 1
+    assert [r.item_id for r in db.query(models.RelayLog)] == ["1"]
+    assert data["since"] == 3
+
+
+def test_streamed_poll_relays_in_chunks(monkeypatch):
+    monkeypatch.setattr(main, "stream_feeds", frozenset({"messages"}))
+    monkeypatch.setattr(main, "STREAM_CHUNK", 2)
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "messages", "inbox")
+    storage.record_relay(db, sub_id, "4")
+    chunks: list[list[str]] = []
+    real_relay = main.relay_new_items
+
+    async def relay_new_items(session, sub, channel, items, data=None):
+        chunks.append([str(i["id"]) for i in items])
+        return await real_relay(session, sub, channel, items, data)
+
+    async def stream_feed(base_url, sub_type, target_id, account_id=None, since=None):
+        # Newest first, so the watermark must wait for the whole stream.
+        for i in (5, 4, 3, 2, 1):
+            yield {"id": i, "sender": "a", "text": "t", "sent": "now"}
+            if fail and i == 3:
+                raise aiohttp.ClientError()
+
+    channel = AsyncMock(spec=discord.abc.Messageable)
+    channel.send = AsyncMock()
+    data = {"interval": 60, "since": 1}
+    with (
+        patch.object(main, "relay_new_items", relay_new_items),
+        patch.object(main.adapter_client, "stream_feed", stream_feed),
+    ):
+        fail = True
+        asyncio.run(run_poll(db, sub_id, [], data, channel=channel))
+        assert chunks == [["5", "4"]] and data["since"] == 1
+        assert data["failures"] == 1
+        fail = False
+        asyncio.run(run_poll(db, sub_id, [], data, channel=channel))
+    assert chunks[1:] == [["5", "4"], ["3", "2"], []]
+    assert channel.send.call_count == 3
+    assert data["since"] == 5 and data["failures"] == 0
+    assert storage.list_all_subscriptions(db)[0][-1] == 5
+
+
+def test_poll_adapter_dedupes_batch_with_single_query():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/1")
+    storage.record_relay(db, sub_id, "0")
+    items = [{"id": str(i), "title": "t", "link": "l"} for i in range(50)]
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "relay_log" in statement:
+            statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        channel = asyncio.run(run_poll(db, sub_id, items, {"interval": 60}))
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert len(statements) == 1
+    assert channel.send.call_count == 49
+    assert db.query(models.RelayLog).count() == 50
+
+
+def test_poll_adapter_commits_once_per_cycle():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "attendees", "event:1")
+    items = [{"id": str(i), "nickname": f"n{i}", "status": "going"} for i in range(20)]
+    commits: list[object] = []
+    event.listen(db, "after_commit", commits.append)
+    asyncio.run(
+        run_poll(db, sub_id, items, {"interval": 60}, fetch_fn="fetch_attendees")
+    )
+    assert len(commits) == 1
+    assert db.query(models.RelayLog).count() == 20
+    assert db.query(models.RSVP).count() == 20
+
+
+def test_poll_adapter_only_records_delivered_items():
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/1")
+    items = [{"id": str(i), "title": "t", "link": "l"} for i in range(3)]
+    channel = AsyncMock(spec=discord.abc.Messageable)
+    channel.send = AsyncMock(side_effect=[None, RuntimeError("boom"), None])
+    asyncio.run(run_poll(db, sub_id, items, {"interval": 60}, channel=channel))
+    assert storage.filter_unrelayed(db, sub_id, ["0", "1", "2"]) == ["1", "2"]
+    _, ids = storage.get_cursor(db, sub_id)
+    assert ids == ["0"]
+
+
+def test_poll_adapter_skips_unchanged_page():
+    from bot.adapter_client import FeedPage
+
+    db = storage.init_db("sqlite:///:memory:")
+    sub_id = storage.add_subscription(db, 1, "events", "cities/1")
+    items = [{"id": "1", "title": "t", "link": "l"}]
+    data = {"interval": 60}
+    asyncio.run(run_poll(db, sub_id, FeedPage(items, '"v1"'), data))
+    assert data["version"] == '"v1"'
+    with patch("bot.main.storage.filter_unrelayed") as dedupe:
+        channel = asyncio.run(
+            run_poll(db, sub_id, FeedPage(items, '"v1"', not_modified=True), data)
+        )
+    dedupe.assert_not_called()
+    channel.send.assert_not_called()
+
+
 def test_poll_adapter_caches_events():
     db = storage.init_db("sqlite:///:memory:")
     sub_id = storage.add_subscription(db, 1, "events", "cities/1")
@@ -88,7 +496,7 @@ def test_poll_adapter_backoff_on_http_error():
             AsyncMock(side_effect=aiohttp.ClientError()),
         ),
         patch.object(
-            main.bot.scheduler,
+            main.bot.poller,
             "add_job",
         ) as add_job,
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
@@ -167,7 +575,7 @@ def test_fl_health_reports_and_resumes():
     with (
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
-        patch.object(main.bot.scheduler, "get_jobs", return_value=[]),
+        patch.object(main.bot.poller, "get_jobs", return_value=[]),
     ):
         asyncio.run(main.fl_health.callback(interaction))
     msg = interaction.response.send_message.call_args[0][0]
@@ -178,8 +586,8 @@ def test_fl_health_reports_and_resumes():
     with (
         patch("bot.main.bot_bucket.acquire", AsyncMock()),
         patch("bot.main.bot_tokens.set"),
-        patch.object(main.bot.scheduler, "get_job", return_value=job),
-        patch.object(main.bot.scheduler, "add_job") as add_job,
+        patch.object(main.bot.poller, "get_job", return_value=job),
+        patch.object(main.bot.poller, "add_job") as add_job,
     ):
         asyncio.run(main.fl_health.callback(interaction2, resume=sub_id))
     assert data["failures"] == 0
@@ -0,0 +1,81 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bot.poll_scheduler import PollScheduler
+
+
+def _past(seconds: float = 1) -> datetime:
+    return datetime.utcnow() - timedelta(seconds=seconds)
+
+
+def test_replacing_job_keeps_latest_only():
+    ran = []
+
+    async def job(tag):
+        ran.append(tag)
+
+    async def run():
+        sched = PollScheduler()
+        sched.add_job(job, args=["old"], id="1", run_date=_past())
+        sched.add_job(job, args=["new"], id="1", run_date=_past())
+        assert sched.depth == 1
+        assert sched.run_due() == 1
+        await asyncio.sleep(0)
+        return sched
+
+    sched = asyncio.run(run())
+    assert ran == ["new"]
+    assert sched.depth == 0
+
+
+def test_run_due_in_planned_order_and_leaves_future_jobs():
+    ran = []
+
+    async def job(tag):
+        ran.append(tag)
+
+    async def run():
+        sched = PollScheduler()
+        sched.add_job(job, args=["later"], id="a", run_date=_past(1))
+        sched.add_job(job, args=["first"], id="b", run_date=_past(5))
+        sched.add_job(job, args=["future"], id="c", run_date=_past(-60))
+        sched.add_job(job, args=["removed"], id="d", run_date=_past(2))
+        sched.remove_job("d")
+        sched.run_due()
+        await asyncio.sleep(0)
+        return sched
+
+    sched = asyncio.run(run())
+    assert ran == ["first", "later"]
+    assert [job.id for job in sched.get_jobs()] == ["c"]
+
+
+def test_rescheduling_compacts_stale_entries():
+    async def job():
+        pass
+
+    sched = PollScheduler()
+    for _ in range(1000):
+        sched.add_job(job, id="1", run_date=_past(-60))
+    assert sched.depth == 1
+    assert len(sched._heap) <= 2 * sched.depth + 65
+
+
+def test_runner_starts_due_jobs():
+    async def run():
+        finished = asyncio.Event()
+
+        async def job():
+            finished.set()
+
+        sched = PollScheduler()
+        sched.start()
+        sched.add_job(job, id="1")
+        await asyncio.wait_for(finished.wait(), 1)
+        sched.shutdown()
+
+    asyncio.run(run())
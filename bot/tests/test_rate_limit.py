@@ -2,10 +2,19 @@ import asyncio
 import time
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+
+from yarl import URL
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-from bot.rate_limit import TokenBucket  # noqa: E402
+from bot.rate_limit import (  # noqa: E402
+    KeyedTokenBucket,
+    LearnedRateLimits,
+    Priority,
+    TokenBucket,
+    discord_trace,
+)
 
 
 def test_token_bucket_refill():
@@ -19,3 +28,114 @@ def test_token_bucket_refill():
         assert elapsed >= 1
 
     asyncio.run(run())
+
+
+def test_waiters_served_by_priority_then_fifo():
+    order = []
+
+    async def take(bucket, tag, priority):
+        await bucket.acquire(priority=priority)
+        order.append(tag)
+
+    async def run():
+        bucket = TokenBucket(1, 50)
+        await bucket.acquire()
+        tasks = [
+            asyncio.create_task(take(bucket, "low1", Priority.LOW)),
+            asyncio.create_task(take(bucket, "low2", Priority.LOW)),
+            asyncio.create_task(take(bucket, "high", Priority.HIGH)),
+            asyncio.create_task(take(bucket, "normal", Priority.NORMAL)),
+        ]
+        await asyncio.sleep(0)
+        assert bucket.waiting == 4
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["high", "normal", "low1", "low2"]
+
+
+def test_try_acquire_does_not_jump_the_queue():
+    async def run():
+        bucket = TokenBucket(1, 20)
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.06)
+        # A token is back, but it belongs to the queued waiter.
+        assert not bucket.try_acquire()
+        await waiter
+        assert bucket.waiting == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_block_others():
+    async def run():
+        bucket = TokenBucket(1, 20)
+        await bucket.acquire(1)
+        big = asyncio.create_task(bucket.acquire(1))
+        await asyncio.sleep(0)
+        big.cancel()
+        start = time.perf_counter()
+        await bucket.acquire()
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 0.2
+
+
+def test_keyed_buckets_evict_idle_keys_lru():
+    buckets = KeyedTokenBucket(1, 1, max_keys=2)
+    assert buckets.try_acquire("a")
+    assert buckets.try_acquire("b")
+    assert not buckets.try_acquire("a")
+    buckets.try_acquire("c")
+    # "b" was used least recently and is evicted; "a" keeps its empty bucket.
+    assert len(buckets) == 2
+    assert not buckets.try_acquire("a")
+    assert buckets.try_acquire("b")
+
+
+def test_learned_limits_only_apply_after_feedback():
+    async def run():
+        limits = LearnedRateLimits(5, 1)
+        start = time.perf_counter()
+        for _ in range(20):
+            await limits.acquire(1)
+        assert time.perf_counter() - start < 0.05
+        limits.observe(1, 5, 0, 0.2)
+        start = time.perf_counter()
+        await limits.acquire(1)
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_discord_trace_learns_channel_limits_and_global_pauses():
+    limits = LearnedRateLimits(5, 1)
+    global_bucket = TokenBucket(50, 50)
+    hook = discord_trace(limits, global_bucket).on_request_end[0]
+
+    def response(status, headers, path, method="POST"):
+        params = SimpleNamespace(
+            response=SimpleNamespace(status=status, headers=headers),
+            url=URL(f"https://discord.com/api/v10{path}"),
+            method=method,
+        )
+        asyncio.run(hook(None, None, params))
+
+    response(
+        200,
+        {
+            "X-RateLimit-Limit": "10",
+            "X-RateLimit-Remaining": "9",
+            "X-RateLimit-Reset-After": "2.0",
+        },
+        "/channels/42/messages",
+    )
+    bucket = limits.bucket(42)
+    assert (bucket.capacity, bucket.refill_rate) == (10, 5.0)
+    assert bucket.tokens <= 9
+    response(200, {"X-RateLimit-Remaining": "0"}, "/channels/42/messages", "GET")
+    assert bucket.tokens > 0
+    response(429, {"Retry-After": "3", "X-RateLimit-Global": "true"}, "/users/@me")
+    assert not global_bucket.try_acquire()
@@ -0,0 +1,39 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from bot import models, storage
+
+
+def test_tasks_get_separate_sessions(tmp_path):
+    db = storage.init_scoped_db(f"sqlite:///{tmp_path}/scoped.db")
+
+    async def unit():
+        first = db.session
+        await asyncio.sleep(0)
+        assert db.session is first
+        return first
+
+    async def run():
+        return await asyncio.gather(unit(), unit())
+
+    a, b = asyncio.run(run())
+    assert a is not b
+    assert db.active == 0
+
+
+def test_session_closed_when_task_ends(tmp_path):
+    db = storage.init_scoped_db(f"sqlite:///{tmp_path}/scoped.db")
+
+    async def run():
+        storage.set_channel_settings(db, 1, autodelete=5)
+        return db.session
+
+    session = asyncio.run(run())
+    assert db.active == 0
+    assert not session.in_transaction()
+    assert db.get(models.Channel, 1).settings_json == {"autodelete": 5}
+    db.remove()
+    assert db.active == 0
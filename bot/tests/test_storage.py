@@ -1,6 +1,9 @@
+import asyncio
 import sys
 from pathlib import Path
 
+from sqlalchemy import event
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from bot import storage
@@ -30,3 +33,126 @@ def test_channel_settings():
     storage.set_channel_settings(db, 1, thread_per_event="on")
     settings = storage.get_channel_settings(db, 1)
     assert settings["thread_per_event"] == "on"
+
+
+def test_filter_unrelayed_returns_unseen_in_order():
+    db = setup_db()
+    sub_id = storage.add_subscription(db, 1, "events", "target")
+    storage.record_relay(db, sub_id, "b")
+    assert storage.filter_unrelayed(db, sub_id, ["a", "b", "c", "a"]) == ["a", "c"]
+    assert storage.filter_unrelayed(db, sub_id, []) == []
+
+
+def test_flush_relay_batch_writes_everything_in_one_commit():
+    from sqlalchemy import event
+
+    from bot import models
+
+    db = setup_db()
+    sub_id = storage.add_subscription(db, 1, "attendees", "event:7")
+    storage.upsert_profile(db, "p1", "old")
+    batch = storage.RelayBatch(sub_id)
+    for fl_id in ("p1", "p2"):
+        batch.add_profile(fl_id, f"nick-{fl_id}")
+        batch.add_rsvp("7", fl_id, "going")
+        batch.add_relay(fl_id)
+    commits: list[object] = []
+    event.listen(db, "after_commit", commits.append)
+    storage.flush_relay_batch(db, batch)
+    assert len(commits) == 1
+    assert storage.filter_unrelayed(db, sub_id, ["p1", "p2", "p3"]) == ["p3"]
+    assert db.query(models.Profile).filter_by(fl_id="p1").one().nickname == "nick-p1"
+    assert db.query(models.RSVP).count() == 2
+    _, ids = storage.get_cursor(db, sub_id)
+    assert ids == ["p1", "p2"]
+
+
+def test_run_on_async_session(tmp_path):
+    url = f"sqlite:///{tmp_path}/async.db"
+    db = storage.init_db(url)
+    sub_id = storage.add_subscription(db, 1, "events", "target")
+    storage.record_relay(db, sub_id, "b")
+
+    async def run():
+        sessions = storage.init_async_db(url)
+        async with storage.session_scope(sessions) as session:
+            unseen = await storage.run(
+                session, storage.filter_unrelayed, sub_id, ["a", "b"]
+            )
+        await storage.dispose_async_db(sessions)
+        assert sessions.kw["bind"].pool.checkedin() == 0
+        return unseen
+
+    assert asyncio.run(run()) == ["a"]
+
+
+def test_schema_created_once_per_engine(tmp_path):
+    db = storage.init_db(f"sqlite:///{tmp_path}/schema.db")
+    queries = []
+    event.listen(
+        db.get_bind(), "before_cursor_execute", lambda *a: queries.append(a[2])
+    )
+    storage.init_db().close()
+    session = storage.get_session()
+    assert session.get_bind() is db.get_bind()
+    session.close()
+    assert queries == []
+
+
+def test_subscription_states_round_trip():
+    db = setup_db()
+    sub_id = storage.add_subscription(db, 1, "events", "target")
+    healthy = storage.add_subscription(db, 1, "events", "other")
+    states = storage.SubscriptionStates()
+    states.record(healthy, {})
+    states.record(
+        sub_id,
+        {"failures": 2, "backoff": 120, "paused_until": 1700000000.0},
+    )
+    assert states.flush(db) == 1
+    loaded = storage.SubscriptionStates().load(db)
+    assert loaded == {
+        sub_id: {
+            "failures": 2,
+            "backoff": 120,
+            "paused_until": 1700000000.0,
+            "notified": False,
+            "interval": None,
+        }
+    }
+    # Recovery is written once; unchanged state is not written again.
+    states.record(sub_id, {"failures": 0, "backoff": None})
+    states.record(sub_id, {"failures": 0, "backoff": None})
+    assert states.flush(db) == 1
+    assert states.flush(db) == 0
+
+
+def test_subscription_states_skip_removed_subscriptions():
+    db = setup_db()
+    sub_id = storage.add_subscription(db, 1, "events", "target")
+    states = storage.SubscriptionStates()
+    states.record(sub_id, {"failures": 1, "backoff": 60})
+    storage.remove_subscription(db, sub_id, 1)
+    assert states.flush(db) == 0
+    assert states.dirty == {}
+
+
+def test_remove_subscription_drops_saved_state():
+    db = setup_db()
+    sub_id = storage.add_subscription(db, 1, "events", "target")
+    states = storage.SubscriptionStates()
+    states.record(sub_id, {"failures": 1, "backoff": 60})
+    states.flush(db)
+    storage.remove_subscription(db, sub_id, 1)
+    assert storage.SubscriptionStates().load(db) == {}
+
+
+def test_subscription_states_persist_interval_changes_only():
+    db = setup_db()
+    sub_id = storage.add_subscription(db, 1, "events", "target")
+    states = storage.SubscriptionStates()
+    states.record(sub_id, {"interval": 120, "item_rate": 0.01})
+    assert states.flush(db) == 1
+    states.record(sub_id, {"interval": 120, "item_rate": 0.002})
+    assert states.flush(db) == 0
+    assert storage.SubscriptionStates().load(db)[sub_id]["interval"] == 120
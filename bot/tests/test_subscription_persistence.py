@@ -37,10 +37,10 @@ def test_subscriptions_persist_across_restarts(tmp_path, monkeypatch):
     bot1 = main.FLBot()
     main.bot = bot1
     asyncio.run(bot1.setup_hook())
-    assert str(sub_id) in [job.id for job in bot1.scheduler.get_jobs()]
+    assert str(sub_id) in [job.id for job in bot1.poller.get_jobs()]
 
     main = _reload_main()
     bot2 = main.FLBot()
     main.bot = bot2
     asyncio.run(bot2.setup_hook())
-    assert str(sub_id) in [job.id for job in bot2.scheduler.get_jobs()]
+    assert str(sub_id) in [job.id for job in bot2.poller.get_jobs()]
@@ -4,6 +4,7 @@ import discord
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+from bot.filters import compile_filters, keyword_pattern, matcher_for  # noqa: E402
 from bot.utils import (  # noqa: E402
     format_event_embed,
     matches_filters,
@@ -37,6 +38,34 @@ def test_matches_filters():
     assert not matches_filters(item2, filters)
 
 
+def test_keyword_pattern_merges_shared_prefixes():
+    pattern = keyword_pattern(["rope", "Ropes", "rose", "a.b"])
+    assert pattern is not None
+    assert pattern.pattern == r"(?:a\.b|ro(?:pe(?:s)?|se))"
+    assert pattern.search("a rose garden") and not pattern.search("axb")
+    assert keyword_pattern(["", ""]) is None
+
+
+def test_compiled_filters():
+    assert compile_filters({}) is None
+    assert compile_filters({"options": "chips"}) is None
+    matcher = compile_filters({"keywords": "consent", "city": "Berlin"})
+    assert matcher is not None
+    assert matcher({"title": "Consent 101", "city": "berlin"})
+    assert not matcher({"title": "Consent 101", "city": None})
+    assert not matcher({"title": "Munch", "city": "Berlin"})
+    # Each value is searched on its own.
+    words = compile_filters({"keywords": ["rope night"]})
+    assert words is not None and words({"title": "ROPE Night", "id": 1})
+    assert not words({"title": "rope", "description": "night"})
+    min_attendees = compile_filters({"min_attendees": 5})
+    assert min_attendees is not None and not min_attendees({"attendees": "n/a"})
+    # Equal filter sets share one compiled matcher.
+    assert matcher_for({"city": "x", "keywords": ["a"]}) is matcher_for(
+        {"keywords": ["a"], "city": "x"}
+    )
+
+
 def test_format_event_embed():
     event = {
         "title": "Party",
@@ -2,7 +2,7 @@ import asyncio
 from aiohttp.test_utils import TestServer, TestClient
 
 from bot import main, storage, models, polling, welcome, birthday, moderation
-from bot.circuit_breaker import CircuitBreaker
+from bot.circuit_breaker import CircuitBreakerRegistry
 
 
 def test_management_ui(monkeypatch):
@@ -30,10 +30,11 @@ def test_management_ui(monkeypatch):
     monkeypatch.setattr(moderation, "warn", fake_warn)
     monkeypatch.setattr(moderation, "mute", fake_mute)
 
-    breaker = CircuitBreaker(1, 1)
+    breakers = CircuitBreakerRegistry(1, 60)
+    breakers.get((1, "group_posts")).record_failure()
 
     async def run():
-        app = main.create_management_app(db, breaker)
+        app = main.create_management_app(db, breakers)
         server = TestServer(app)
         client = TestClient(server)
         await client.start_server()
@@ -41,6 +42,9 @@ def test_management_ui(monkeypatch):
         assert resp.status == 302
         cookie = main.sign_session({"id": "1", "username": "admin"}, secret="secret")
         client.session.cookie_jar.update_cookies({"session": cookie})
+        resp = await client.get("/")
+        text = await resp.text()
+        assert "Circuit breaker: open" in text and "1 group_posts: open" in text
         resp = await client.get("/subscriptions")
         text = await resp.text()
         assert "<h1>Subscriptions" in text and "events" in text and "<form" in text
@@ -3,11 +3,13 @@ from __future__ import annotations
 import contextvars
 import uuid
 from contextlib import contextmanager
-from typing import Any, Dict, Iterator, List, Tuple
+from typing import Any, Dict, Iterator, Tuple
 
 import discord
 import shlex
 
+from .filters import matcher_for
+
 
 correlation_id_var: contextvars.ContextVar[str] = contextvars.ContextVar(
     "correlation_id", default=""
@@ -67,19 +69,10 @@ def matches_filters(item: Dict[str, Any], filters: Dict[str, Any]) -> bool:
     """Return True if *item* satisfies *filters*.
 
     Supported filters: keywords (list), city (str), min_attendees (int).
+    Filters are compiled once per distinct set, see :mod:`bot.filters`.
     """
-    keywords: List[str] = filters.get("keywords", [])
-    if keywords:
-        haystack = " ".join(str(v) for v in item.values()).lower()
-        if not any(k.lower() in haystack for k in keywords):
-            return False
-    city = filters.get("city")
-    if city and item.get("city", "").lower() != str(city).lower():
-        return False
-    min_attendees = filters.get("min_attendees")
-    if isinstance(min_attendees, int) and int(item.get("attendees", 0)) < min_attendees:
-        return False
-    return True
+    matcher = matcher_for(filters)
+    return matcher is None or matcher(item)
 
 
 def format_event_embed(event: Dict[str, Any]) -> discord.Embed:
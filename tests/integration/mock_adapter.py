@@ -1,8 +1,19 @@
 #!/usr/bin/env python3
+import hashlib
 import json
+import urllib.request
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
 
 EVENTS = [{"id": "1", "title": "Test Event"}]
+WRITINGS = [
+    {
+        "id": 2,
+        "title": "Test Writing",
+        "link": "https://fetlife.com/users/1/posts/2",
+        "published": "2024-02-01T00:00:00Z",
+    }
+]
 GROUP_POSTS = [
     {
         "id": 3,
@@ -20,14 +31,90 @@ MESSAGES = [
     }
 ]
 
+BATCH = {"writings": WRITINGS, "group_posts": GROUP_POSTS}
+FEEDS = {"events": EVENTS, "messages": MESSAGES, **BATCH}
+# HTTP requests served, for comparing single and batch fetches.
+REQUESTS = {"count": 0}
+# The bot's ingestion route and token; new items are pushed there when set.
+PUSH = {"url": None, "token": None}
+
+
+def newer(items, since):
+    """Return *items* with an ID above the ``since`` high-watermark."""
+    if since is None:
+        return items
+    return [item for item in items if int(item["id"]) > int(since)]
+
+
+def publish(feed, item, target_id="", account_id=None):
+    """Add *item* to *feed* and push it to the bot if ``PUSH`` is configured."""
+    FEEDS[feed].append(item)
+    if not PUSH["url"]:
+        return
+    body = {
+        "feeds": [
+            {
+                "type": feed,
+                "target_id": target_id,
+                "account_id": account_id,
+                "items": [item],
+            }
+        ]
+    }
+    request = urllib.request.Request(
+        PUSH["url"],
+        data=json.dumps(body).encode(),
+        headers={
+            "Authorization": f"Bearer {PUSH['token']}",
+            "Content-Type": "application/json",
+        },
+    )
+    with urllib.request.urlopen(request, timeout=10):
+        pass
+
 
 class Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        REQUESTS["count"] += 1
+        feed = self.path.removeprefix("/batch/")
+        if not self.path.startswith("/batch/") or feed not in BATCH:
+            self.send_response(404)
+            self.end_headers()
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        ids = request.get("ids", [])
+        since = request.get("since", {})
+        body = {
+            "results": {
+                str(i): newer(BATCH[feed], since.get(str(i)))
+                for i in ids
+                if str(i) != "missing"
+            },
+            "errors": (
+                {"missing": {"status": 404, "error": "not found"}}
+                if "missing" in ids
+                else {}
+            ),
+        }
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
     def do_GET(self):
-        if self.path.startswith("/events"):
+        REQUESTS["count"] += 1
+        url = urlsplit(self.path)
+        since = parse_qs(url.query).get("since", [None])[0]
+        if url.path.startswith("/events"):
             body = EVENTS
-        elif self.path.startswith("/groups") and self.path.endswith("/posts"):
+        elif url.path.startswith("/users") and url.path.endswith("/writings"):
+            body = WRITINGS
+        elif url.path.startswith("/groups") and url.path.endswith("/posts"):
             body = GROUP_POSTS
-        elif self.path.startswith("/messages"):
+        elif url.path.startswith("/messages"):
             body = MESSAGES
         else:
             body = None
@@ -35,10 +122,20 @@ class Handler(BaseHTTPRequestHandler):
             self.send_response(404)
             self.end_headers()
             return
+        body = newer(body, since)
+        payload = json.dumps(body).encode()
+        etag = f'"{hashlib.sha256(payload).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
         self.send_response(200)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
         self.end_headers()
-        self.wfile.write(json.dumps(body).encode())
+        self.wfile.write(payload)
 
     def log_message(self, format, *args):
         return